@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""Benchmark the import (and first access) of the components repositories, with and without snapshots"""
+
+import os
+import subprocess
+import sys
+
+BENCHMARK = """
+import time
+start = time.perf_counter()
+from symbench_athens_client.models.{corpus}_components import Batteries, Propellers, Tubes
+imported = time.perf_counter()
+len(Batteries), len(Propellers), len(Tubes)
+accessed = time.perf_counter()
+print(imported - start, accessed - start)
+"""
+
+
+def time_import(corpus, snapshots):
+    env = os.environ.copy()
+    if snapshots is None:
+        env["SYMBENCH_ATHENS_COMPONENT_SNAPSHOTS"] = "0"
+    else:
+        env["SYMBENCH_ATHENS_COMPONENT_SNAPSHOTS"] = snapshots
+    output = subprocess.run(
+        [sys.executable, "-c", BENCHMARK.format(corpus=corpus)],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return tuple(float(time) for time in output.split())
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser("The import benchmark for components")
+    parser.add_argument(
+        "-c",
+        "--corpus",
+        choices={"uav", "uam"},
+        default="uav",
+        help="The corpus to import",
+        type=str,
+    )
+
+    parser.add_argument(
+        "-n",
+        "--repeat",
+        default=5,
+        help="The number of imports to time",
+        type=int,
+    )
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as snapshots_dir:
+        time_import(args.corpus, snapshots_dir)  # Create the snapshots
+        for label, snapshots in (
+            ("Without snapshots", None),
+            ("With snapshots", snapshots_dir),
+        ):
+            timings = [time_import(args.corpus, snapshots) for _ in range(args.repeat)]
+            import_time = min(imported for imported, _ in timings)
+            access_time = min(accessed for _, accessed in timings)
+            print(
+                f"{label}: import {import_time:.3f}s, "
+                f"import and first access {access_time:.3f}s"
+            )
@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+"""Compile the propeller performance files (PER3_*.dat) into a memory mapped propeller database"""
+
+from symbench_athens_client.propeller_db import compile_propeller_database
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser("The propeller performance database compiler")
+    parser.add_argument(
+        "propellers_dir",
+        help="The directory with the propeller performance files",
+        type=str,
+    )
+
+    parser.add_argument(
+        "-d",
+        "--db-dir",
+        default=None,
+        help="The directory to save the database in (default: the user's cache directory)",
+        type=str,
+    )
+
+    args = parser.parse_args()
+
+    db = compile_propeller_database(args.propellers_dir, args.db_dir)
+    print(db)
@@ -1,4 +1,8 @@
+import contextlib
 import logging
+import threading
+import time
+from functools import lru_cache, partial
 
 from gremlin_python.driver.client import Client
 
@@ -9,23 +13,54 @@ from symbench_athens_client.graphdb_queries import (
 from symbench_athens_client.utils import get_logger
 
 
-class GraphDBDriver:
-    def __init__(self, gremlin_url="ws://localhost:8182/gremlin", log_level=None):
-        import nest_asyncio  # Hack to make it work in jupyter notebook. Further Investigating necessary
+@lru_cache(maxsize=None)
+def _apply_nest_asyncio():
+    import nest_asyncio  # Hack to make it work in jupyter notebook. Further Investigating necessary
+
+    nest_asyncio.apply()
+
 
-        nest_asyncio.apply()
+class GraphDBDriver:
+    def __init__(
+        self, gremlin_url="ws://localhost:8182/gremlin", log_level=None, pool_size=None
+    ):
+        _apply_nest_asyncio()
         self.gremlin_url = gremlin_url
+        self.pool_size = pool_size
         self.logger = get_logger(
             self.__class__.__name__, level=log_level or logging.DEBUG
         )
 
-        self.client = Client(gremlin_url, "g")
+        self.client = self._connect()
+
+    def _connect(self):
+        client = Client(self.gremlin_url, "g", pool_size=self.pool_size)
         self.logger.info(f"Connected to gremlin server at {self.gremlin_url}")
+        return client
 
     def close(self):
         self.client.close()
         self.logger.info(f"Closed connection to gremlin server at {self.gremlin_url}")
 
+    def is_healthy(self, timeout=5.0):
+        """Check whether the connection to the gremlin server works, with a trivial query"""
+        try:
+            self.client.submit("g.inject(0)").all().result(timeout=timeout)
+            return True
+        except Exception as e:
+            self.logger.warning(
+                f"The connection to gremlin server at {self.gremlin_url} is broken: {e}"
+            )
+            return False
+
+    def reconnect(self):
+        """Replace the connection to the gremlin server with a new one"""
+        try:
+            self.client.close()
+        except Exception as e:
+            self.logger.debug(f"Failed to close the broken connection: {e}")
+        self.client = self._connect()
+
     def run_queries(self, queries, commit=False):
         request_options = {"evaluationTimeout": 0}
         for query in queries:
@@ -43,19 +78,36 @@ class GraphDBDriver:
             f"commit=False will not save any changes to the DB"
         )
 
+    def run_script(self, script, bindings=None):
+        """Run a gremlin script (many statements) in a single request, returning the results of its last statement
+
+        Parameters
+        ----------
+        script: str
+            The script to run, which should commit its changes (g.tx().commit())
+        bindings: dict, default=None
+            The values of the script's variables
+        """
+        result_set = self.client.submit(
+            script, bindings=bindings, request_options={"evaluationTimeout": 0}
+        )
+        results = result_set.all().result()
+        self.logger.debug(f"Successfully ran script with bindings {bindings}")
+        return results
+
 
 class SymbenchAthensGraphDBClient(GraphDBDriver):
     """Client for cloning/clearing designs in the Graph Database."""
 
     def _clone(self, src_name, dst_name):
         """Clone a design in the graph database."""
-        clone_query = CLONE_DESIGN_QUERY.format(src_name=src_name, dst_name=dst_name)
-        self.run_queries(clone_query.split("\n"), commit=True)
+        self.run_script(
+            CLONE_DESIGN_QUERY, bindings={"src_name": src_name, "dst_name": dst_name}
+        )
 
     def _clear(self, name):
         """Clear a design in the graph database."""
-        clear_query = CLEAR_DESIGN_QUERY.format(src_name=name)
-        self.run_queries(clear_query.split("\n"), commit=True)
+        self.run_script(CLEAR_DESIGN_QUERY, bindings={"src_name": name})
 
     def get_all_design_names(self):
         """Get all the design names in the graph database."""
@@ -119,3 +171,144 @@ class SymbenchAthensGraphDBClient(GraphDBDriver):
             design.name not in self.get_all_design_names()
         ), f"Something went wrong while clearing the design {design.name}"
         self.logger.info(f"Successfully cleared design {design.name}")
+
+
+class GraphDBClientPool:
+    """A pool of long lived graph database clients, shared by concurrent workflows.
+
+    Clients are connected on demand (up to pool_size) and reused, so that operations
+    don't pay for a new connection. A client idle for longer than the health check
+    interval is checked before it's handed out, as is a client whose operation failed,
+    and reconnected if its connection is broken.
+
+    Parameters
+    ----------
+    gremlin_url: str
+        The URL for the graph-database
+    pool_size: int, default=4
+        The maximum number of clients (connections)
+    health_check_interval: float, default=30.0
+        The seconds a client can be idle before it's checked again
+    log_level: int, default=None
+        The log verbosity of the clients
+    client_factory: callable, default=SymbenchAthensGraphDBClient
+        Creates a client from the gremlin_url and log_level
+
+    Examples
+    --------
+    >>> pool = GraphDBClientPool("ws://localhost:8182/gremlin", pool_size=2)
+    >>> with pool.client() as g:
+    ...     g.get_all_design_names()
+    """
+
+    def __init__(
+        self,
+        gremlin_url,
+        pool_size=4,
+        health_check_interval=30.0,
+        log_level=None,
+        client_factory=None,
+    ):
+        if pool_size < 1:
+            raise ValueError("pool_size should be a positive integer")
+        self.gremlin_url = gremlin_url
+        self.pool_size = pool_size
+        self.health_check_interval = health_check_interval
+        self.log_level = log_level
+        # A client of the pool is a single connection
+        self.client_factory = client_factory or partial(
+            SymbenchAthensGraphDBClient, pool_size=1
+        )
+        self.logger = get_logger(
+            self.__class__.__name__, level=log_level or logging.DEBUG
+        )
+        self._idle = []  # (client, last used)
+        self._num_clients = 0
+        self._condition = threading.Condition()
+        self._closed = False
+
+    @contextlib.contextmanager
+    def client(self):
+        """Borrow a client from the pool (waiting for one if all of them are in use)"""
+        client = self._acquire()
+        try:
+            yield client
+        except Exception:
+            self._release(client, check=True)
+            raise
+        else:
+            self._release(client)
+
+    def close(self):
+        """Close the idle clients, the ones in use are closed when they are returned"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._num_clients -= len(idle)
+            self._condition.notify_all()
+        for client, _ in idle:
+            client.close()
+
+    def _acquire(self):
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("The graph database client pool is closed")
+                if self._idle:
+                    client, last_used = self._idle.pop()
+                    break
+                if self._num_clients < self.pool_size:
+                    self._num_clients += 1
+                    client = None
+                    break
+                self._condition.wait()
+
+        try:
+            if client is None:
+                return self.client_factory(
+                    gremlin_url=self.gremlin_url, log_level=self.log_level
+                )
+            if time.monotonic() - last_used > self.health_check_interval:
+                self._ensure_healthy(client)
+            return client
+        except Exception:
+            self._discard(client)
+            raise
+
+    def _release(self, client, check=False):
+        try:
+            if check:
+                self._ensure_healthy(client)
+        except Exception as e:
+            self.logger.error(f"Failed to reconnect to {self.gremlin_url}: {e}")
+            self._discard(client)
+            return
+
+        with self._condition:
+            if not self._closed:
+                self._idle.append((client, time.monotonic()))
+                self._condition.notify()
+                return
+            self._num_clients -= 1
+        client.close()
+
+    def _ensure_healthy(self, client):
+        if not client.is_healthy():
+            self.logger.info(f"Reconnecting to gremlin server at {self.gremlin_url}")
+            client.reconnect()
+
+    def _discard(self, client):
+        with self._condition:
+            self._num_clients -= 1
+            self._condition.notify()
+        if client is not None:
+            try:
+                client.close()
+            except Exception as e:
+                self.logger.debug(f"Failed to close a broken client: {e}")
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__}, URL: {self.gremlin_url}, "
+            f"Clients: {self._num_clients}/{self.pool_size}>"
+        )
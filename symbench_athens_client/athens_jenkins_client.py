@@ -1,13 +1,301 @@
 import logging
+import random
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
 
 import api4jenkins
+import api4jenkins.build
 from api4jenkins.exceptions import ItemNotFoundError
 
 from symbench_athens_client.exceptions import JobFailedError
 from symbench_athens_client.utils import get_logger
 
-__all__ = ["SymbenchAthensJenkinsClient"]
+__all__ = ["BuildPoller", "SymbenchAthensJenkinsClient", "SubmittedBuild"]
+
+# The fields of a job's builds fetched on every poll
+BUILDS_TREE = "builds[_class,number,url,queueId,result,timestamp,estimatedDuration]"
+
+# The fields of a build fetched when it's no longer among its job's (most recent) builds
+BUILD_TREE = "number,url,result,timestamp,estimatedDuration"
+
+
+class SubmittedBuild:
+    """A build submitted with SymbenchAthensJenkinsClient.submit_many, tracked from the queue to its result.
+
+    Attributes
+    ----------
+    job_name: str
+        The name of the job
+    parameters: dict
+        The parameters of the build
+    index: int
+        The position of the parameters in the submitted parameter sets
+    item: api4jenkins.queue.QueueItem
+        The queue item of the build (None if it couldn't be queued)
+    build: api4jenkins.build.Build
+        The build, once it leaves the queue
+    number: int
+        The number of the build, once it leaves the queue
+    result: str
+        The result of the build (e.g. SUCCESS or FAILURE), once it's finished
+    error: Exception
+        Why the build failed (a JobFailedError for builds which didn't succeed), None if it succeeded
+    future: concurrent.futures.Future
+        Resolved (to the SubmittedBuild) when the build finishes, with the error if it failed
+    """
+
+    def __init__(self, job_name, parameters, index):
+        self.job_name = job_name
+        self.parameters = parameters
+        self.index = index
+        self.item = None
+        self.build = None
+        self.number = None
+        self.result = None
+        self.error = None
+        self.future = None
+
+    @property
+    def succeeded(self):
+        return self.result == "SUCCESS" and self.error is None
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__}, Job: {self.job_name}, Build: {self.number}, "
+            f"Result: {self.result}>"
+        )
+
+
+class BuildPoller:
+    """Track Jenkins builds until they finish, with a single shared polling thread.
+
+    Every poll fetches the status of all the tracked builds of a job in a single
+    (tree filtered) api/json request, along with a request to the queue while some
+    builds are still queued. The interval between polls starts at min_interval and
+    backs off exponentially (with jitter) while nothing changes, up to max_interval,
+    but never past the time a running build is expected to finish (from its estimated
+    duration). Once a build overruns its estimated duration, it's polled every
+    min_interval. The thread only runs while builds are tracked.
+
+    Parameters
+    ----------
+    server: api4jenkins.Jenkins
+        The jenkins server
+    min_interval: float, default=1.0
+        The minimum seconds between polls
+    max_interval: float, default=5.0
+        The maximum seconds between polls
+    backoff: float, default=2.0
+        The factor to increase the interval by, after a poll without changes
+    jitter: float, default=0.1
+        The relative amount to randomly vary the interval by
+    logger: logging.Logger, default=None
+        The logger to use
+    """
+
+    def __init__(
+        self,
+        server,
+        min_interval=1.0,
+        max_interval=5.0,
+        backoff=2.0,
+        jitter=0.1,
+        logger=None,
+    ):
+        self.server = server
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.backoff = backoff
+        self.jitter = jitter
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self._tracked = {}
+        self._condition = threading.Condition()
+        self._interval = min_interval
+        self._thread = None
+
+    def track(self, job, submitted, callback=None):
+        """Track a queued build (with its item set) until it finishes.
+
+        Parameters
+        ----------
+        job: api4jenkins.job.Job
+            The job of the build
+        submitted: SubmittedBuild
+            The build to track
+        callback: callable, default=None
+            Called with the build's future when it finishes (in the poller's thread)
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Resolved to the SubmittedBuild when it finishes, with its error if it failed
+        """
+        submitted.future = Future()
+        if callback is not None:
+            submitted.future.add_done_callback(callback)
+
+        with self._condition:
+            self._tracked.setdefault(job.url, (job, []))[1].append(submitted)
+            self._interval = self.min_interval
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=self.__class__.__name__, daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+
+        return submitted.future
+
+    def poll(self):
+        """Poll the tracked builds once, finishing the ones which are done.
+
+        Returns
+        -------
+        tuple of (int, float)
+            The number of builds which changed (left the queue or finished) and the seconds
+            until the earliest expected finish of a running build (0 if a build is overdue,
+            None if unknown)
+        """
+        with self._condition:
+            tracked = [(job, list(builds)) for job, builds in self._tracked.values()]
+
+        queued_ids = None
+        if any(
+            submitted.build is None for _, builds in tracked for submitted in builds
+        ):
+            try:
+                queued_ids = {
+                    item["id"]
+                    for item in self.server.queue.api_json(tree="items[id]")["items"]
+                }
+            except Exception as e:
+                self.logger.warning(f"Failed to poll the jenkins queue: {e}")
+
+        num_changes, next_finish = 0, None
+        for job, builds in tracked:
+            try:
+                job_builds = job.api_json(tree=BUILDS_TREE)["builds"]
+            except Exception as e:
+                self.logger.warning(f"Failed to poll the builds of {job.url}: {e}")
+                continue
+
+            by_queue_id = {entry.get("queueId"): entry for entry in job_builds}
+            for submitted in builds:
+                entry = by_queue_id.get(submitted.item.id)
+                if entry is None and submitted.build is not None:
+                    # Jenkins lists a job's most recent builds only, a long build can drop out of them
+                    try:
+                        entry = submitted.build.api_json(tree=BUILD_TREE)
+                    except Exception as e:
+                        self.logger.warning(
+                            f"Failed to poll the build {submitted.build.url}: {e}"
+                        )
+                        continue
+                if entry is None:
+                    # The queue is fetched before the builds, so an item missing from both was cancelled
+                    if queued_ids is not None and submitted.item.id not in queued_ids:
+                        submitted.error = JobFailedError(
+                            f"Job {submitted.job_name} was removed from the queue"
+                        )
+                        self._finish(job, submitted)
+                        num_changes += 1
+                    continue
+
+                if submitted.build is None:
+                    submitted.build = _new_build(job, entry)
+                    submitted.number = entry["number"]
+                    num_changes += 1
+                    self.logger.info(
+                        f"Job {submitted.job_name} is running. "
+                        f"The build number is {submitted.number}."
+                    )
+
+                if entry.get("result"):
+                    submitted.result = entry["result"]
+                    self._finish(job, submitted)
+                    num_changes += 1
+                elif entry.get("estimatedDuration", -1) > 0 and entry.get("timestamp"):
+                    remaining = max(
+                        (entry["timestamp"] + entry["estimatedDuration"]) / 1000
+                        - time.time(),
+                        0.0,
+                    )
+                    if next_finish is None or remaining < next_finish:
+                        next_finish = remaining
+
+        return num_changes, next_finish
+
+    def close(self):
+        """Stop tracking the builds, cancelling their futures"""
+        with self._condition:
+            tracked, self._tracked = self._tracked, {}
+            thread = self._thread
+            self._condition.notify()
+        for _, builds in tracked.values():
+            for submitted in builds:
+                submitted.future.cancel()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _finish(self, job, submitted):
+        if submitted.error is None and submitted.result != "SUCCESS":
+            submitted.error = JobFailedError(
+                f"Job {submitted.job_name} (build {submitted.number}) failed "
+                f"with {submitted.result}. Please check the build parameters among others"
+            )
+        with self._condition:
+            _, builds = self._tracked.get(job.url, (job, []))
+            if submitted not in builds:  # No longer tracked (closed)
+                return
+            builds.remove(submitted)
+            if not builds:
+                del self._tracked[job.url]
+
+        self.logger.info(
+            f"Job {submitted.job_name} (build {submitted.number}) is finished. "
+            f"The result is {submitted.result}"
+        )
+        if submitted.error is None:
+            submitted.future.set_result(submitted)
+        else:
+            submitted.future.set_exception(submitted.error)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._tracked:
+                    self._thread = None
+                    return
+
+            try:
+                num_changes, next_finish = self.poll()
+            except Exception as e:
+                self.logger.warning(f"Failed to poll the jenkins builds: {e}")
+                num_changes, next_finish = 0, None
+
+            with self._condition:
+                if num_changes:
+                    self._interval = self.min_interval
+                interval = self._interval
+                self._interval = min(self._interval * self.backoff, self.max_interval)
+                if next_finish is not None:
+                    interval = min(interval, next_finish)
+                interval *= random.uniform(1 - self.jitter, 1 + self.jitter)
+                if self._tracked:
+                    self._condition.wait(max(interval, self.min_interval))
+
+
+def _new_build(job, entry):
+    """The build (of its class, e.g. a WorkflowRun for pipelines) for an entry in a job's builds"""
+    class_name = entry.get("_class", "").split(".")[-1].split("$")[-1]
+    build_class = getattr(api4jenkins.build, class_name, None)
+    if not (
+        isinstance(build_class, type)
+        and issubclass(build_class, api4jenkins.build.Build)
+    ):
+        build_class = api4jenkins.build.Build
+    return build_class(job.jenkins, entry["url"])
 
 
 class SymbenchAthensJenkinsClient:
@@ -21,18 +309,40 @@ class SymbenchAthensJenkinsClient:
         The username to login with
     password: str
         The password to login with
+    log_level: int, default=10
+        The log verbosity
+    min_poll_interval: float, default=1.0
+        The minimum seconds between polls of the builds in flight
+    max_poll_interval: float, default=5.0
+        The maximum seconds between polls of the builds in flight
 
     Attributes
     ----------
     server: api4jenkins.Jenkins
         The python interface for the jenkins server
+    poller: BuildPoller
+        The poller tracking the builds of this client
     """
 
-    def __init__(self, jenkins_url, username, password, log_level=logging.DEBUG):
+    def __init__(
+        self,
+        jenkins_url,
+        username,
+        password,
+        log_level=logging.DEBUG,
+        min_poll_interval=1.0,
+        max_poll_interval=5.0,
+    ):
         self.username = username
         self.password = password
         self.server = api4jenkins.Jenkins(jenkins_url, auth=(username, password))
         self.logger = get_logger(self.__class__.__name__, log_level)
+        self.poller = BuildPoller(
+            self.server,
+            min_interval=min_poll_interval,
+            max_interval=max_poll_interval,
+            logger=self.logger,
+        )
         self.logger.info(f"User with username {username} successfully logged in")
 
     def get_user_info(self):
@@ -76,6 +386,27 @@ class SymbenchAthensJenkinsClient:
 
         return not all(node.offline for node in executor_nodes)
 
+    def build_async(self, job_name, parameters, callback=None):
+        """Build a job, returning a future for the build
+
+        Parameters
+        ----------
+        job_name: str
+            Name of the job
+        parameters: dict
+            Parameters for this build
+        callback: callable, default=None
+            Called with the future when the build finishes
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Resolved to the SubmittedBuild when the build finishes, with a JobFailedError if it failed
+        """
+        return self._submit(
+            self._get_job(job_name), job_name, parameters, 0, callback
+        ).future
+
     def build_and_wait(self, job_name, parameters):
         """Build a job and wait
 
@@ -86,28 +417,76 @@ class SymbenchAthensJenkinsClient:
         parameters: dict
             Parameters for this build
         """
+        submitted = self.build_async(job_name, parameters).result()
+        return submitted.build
+
+    def submit_many(self, job_name, parameter_sets, max_in_flight=4):
+        """Build a job for many parameter sets, keeping up to max_in_flight builds queued or running.
+
+        The builds are queued as earlier ones finish and are all tracked by the client's
+        poller. A failing build doesn't stop the others, its error is recorded in the
+        yielded SubmittedBuild. Closing the iterator stops queueing builds, but doesn't
+        abort the ones in flight.
+
+        Parameters
+        ----------
+        job_name: str
+            Name of the job
+        parameter_sets: iterable of dict
+            The parameters of every build
+        max_in_flight: int, default=4
+            The maximum number of builds queued or running at once
+
+        Yields
+        ------
+        SubmittedBuild
+            The builds, in the order they finish
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight should be a positive integer")
+        job = self._get_job(job_name)
+
+        parameter_sets = iter(enumerate(parameter_sets))
+        in_flight = {}
+        exhausted = False
+        while True:
+            while not exhausted and len(in_flight) < max_in_flight:
+                index, parameters = next(parameter_sets, (None, None))
+                if index is None:
+                    exhausted = True
+                    break
+                try:
+                    submitted = self._submit(job, job_name, parameters, index)
+                except Exception as e:
+                    self.logger.error(f"Failed to queue job {job_name}: {e}")
+                    submitted = SubmittedBuild(job_name, parameters, index)
+                    submitted.error = e
+                    yield submitted
+                    continue
+                in_flight[submitted.future] = submitted
+
+            if not in_flight:
+                return
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield in_flight.pop(future)
+
+    def close(self):
+        """Stop tracking the builds in flight"""
+        self.poller.close()
+
+    def _get_job(self, job_name):
         job = self.server.get_job(job_name)
         if job is None:
             raise ItemNotFoundError(f"Job with name {job_name} doesn't exist")
-        item = job.build(**parameters)
-        self.logger.info(f"Job {job_name} is waiting to be built")
-
-        while not item.get_build():
-            time.sleep(1)
+        return job
 
-        self.logger.info(f"Job {job_name} is built")
-
-        build = item.get_build()
+    def _submit(self, job, job_name, parameters, index, callback=None):
+        submitted = SubmittedBuild(job_name, parameters, index)
+        submitted.item = job.build(**parameters)
         self.logger.info(
-            f"Job {job_name} is running. The build number is {build.number}."
-            f"\nThe build parameters are {parameters}"
+            f"Job {job_name} is waiting to be built, parameters: {parameters}"
         )
-        while not build.result:
-            time.sleep(5)
-            self.logger.debug(f"Still running the job {job_name}")
-        self.logger.info(f"Job {job_name} is finished. The result is {build.result}")
-        if build.result != "SUCCESS":
-            raise JobFailedError(
-                "Job Failed. Please check the build parameters among others"
-            )
-        return build
+        self.poller.track(job, submitted, callback)
+        return submitted
@@ -0,0 +1,216 @@
+import gzip
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+from symbench_athens_client.models.fd_metrics import (
+    FDMFlightMetric,
+    FDMFlightPathMetric,
+    FDMInputMetric,
+)
+from symbench_athens_client.utils import get_cache_dir, get_logger
+
+__all__ = ["FDMResultCache"]
+
+
+class FDMResultCache:
+    """A persistent, content-addressed cache of FDM results.
+
+    The results of a flight dynamics run are keyed by a hash of the
+    (whitespace normalized) input file, the contents of the propeller
+    performance files it references and the identity of the FDM
+    executable. Along with the metrics, the FDM report and the
+    metrics.out are stored, so that a cache hit can reproduce the
+    files of a run without spawning the FDM process.
+
+    Parameters
+    ----------
+    cache_dir: str, pathlib.Path, default=None
+        The directory to save the cached results in, if None the user's cache directory is used
+    max_size: int, default=1073741824
+        The maximum size (in bytes) of the cache, least recently used entries are evicted beyond this
+
+    Attributes
+    ----------
+    hits: int
+        The number of cache hits
+    misses: int
+        The number of cache misses
+    """
+
+    def __init__(self, cache_dir=None, max_size=1024**3):
+        self.cache_dir = Path(cache_dir or get_cache_dir("fdm_results")).resolve()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.logger = get_logger(self.__class__.__name__)
+        self._file_digests = {}
+        self._size = sum(entry.stat().st_size for entry in self._entries())
+
+    def key(self, input_file, fdm_path, cwd=None):
+        """Get the cache key for an FDM run.
+
+        Parameters
+        ----------
+        input_file: str, pathlib.Path
+            The input file for the flight dynamics software
+        fdm_path: str, pathlib.Path
+            The FDM executable for this run
+        cwd: str, pathlib.Path, default=None
+            The directory the FDM runs in (used to resolve the propeller performance files)
+
+        Returns
+        -------
+        str
+            The hex digest for this run
+        """
+        run_dir = Path(cwd) if cwd is not None else Path(os.getcwd())
+        digest = hashlib.sha256()
+        digest.update(self._executable_digest(fdm_path).encode())
+
+        with open(run_dir / input_file) as fd_input:
+            for line in fd_input:
+                line = " ".join(line.split())
+                if not line:
+                    continue
+                key, _, value = line.partition("=")
+                if key.strip().endswith("%prop_fname"):
+                    value = self._cached_file_digest(run_dir / value.strip().strip("'"))
+                    line = f"{key.strip()} = {value}"
+                digest.update(line.encode())
+                digest.update(b"\n")
+
+        return digest.hexdigest()
+
+    def load(self, key, output_file=None, metrics_file=None):
+        """Load the results for a key, writing its report and metrics.out if requested.
+
+        Returns
+        -------
+        tuple of (FDMInputMetric, FDMFlightMetric, FDMFlightPathMetric) or None
+            The cached results, None if the key is not present in the cache
+        """
+        entry = self._entry_path(key)
+        try:
+            with gzip.open(entry, "rt") as entry_file:
+                cached = json.load(entry_file)
+        except (FileNotFoundError, EOFError, OSError, ValueError):
+            self.misses += 1
+            return None
+
+        os.utime(entry)  # Mark as recently used
+        self.hits += 1
+
+        if output_file is not None:
+            Path(output_file).write_text(cached["report"])
+        if metrics_file is not None:
+            Path(metrics_file).write_text(cached["metrics"])
+
+        return (
+            FDMInputMetric.parse_obj(cached["input_metrics"]),
+            FDMFlightMetric.parse_obj(cached["flight_metrics"]),
+            FDMFlightPathMetric.parse_obj(cached["path_metrics"]),
+        )
+
+    def store(self, key, results, output_file, metrics_file):
+        """Store the results of an FDM run (along with its report and metrics.out) for a key."""
+        input_metrics, flight_metrics, path_metrics = results
+        cached = {
+            "input_metrics": input_metrics.dict(),
+            "flight_metrics": flight_metrics.dict(),
+            "path_metrics": path_metrics.dict(),
+            "report": Path(output_file).read_text(),
+            "metrics": Path(metrics_file).read_text(),
+        }
+
+        entry = self._entry_path(key)
+        os.makedirs(entry.parent, exist_ok=True)
+        try:
+            replaced_size = entry.stat().st_size
+        except FileNotFoundError:
+            replaced_size = 0
+        tmp_entry = entry.with_suffix(f".{os.getpid()}.tmp")
+        with gzip.open(tmp_entry, "wt") as entry_file:
+            json.dump(cached, entry_file)
+        os.replace(tmp_entry, entry)
+
+        self._size += entry.stat().st_size - replaced_size
+        if self._size > self.max_size:
+            self._evict()
+
+    def stats(self):
+        """Return the hit/miss counters and the size of this cache.
+
+        The size is read from the disk, entries may be stored by other processes
+        (e.g. by the workers of a ParallelFDMExecutor) using a copy of this cache.
+        """
+        sizes = [entry.stat().st_size for entry in self._entries()]
+        self._size = sum(sizes)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(sizes),
+            "size": self._size,
+        }
+
+    def clear(self):
+        """Remove every entry from this cache."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._size = 0
+
+    def _evict(self):
+        """Evict the least recently used entries, until the cache is within its size"""
+        entries = sorted(
+            ((entry.stat(), entry) for entry in self._entries()),
+            key=lambda stat_entry: stat_entry[0].st_mtime,
+        )
+        self._size = sum(stat.st_size for stat, _ in entries)
+        for stat, entry in entries:
+            if self._size <= self.max_size:
+                break
+            try:
+                os.unlink(entry)
+            except FileNotFoundError:
+                pass
+            self._size -= stat.st_size
+            self.logger.debug(f"Evicted {entry.name} from the cache")
+
+    def _entries(self):
+        return self.cache_dir.glob("*/*.json.gz")
+
+    def _entry_path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.json.gz"
+
+    def _executable_digest(self, fdm_path):
+        executable = shutil.which(str(fdm_path)) or str(fdm_path)
+        os.stat(executable)  # The executable must exist
+        return self._cached_file_digest(executable)
+
+    def _cached_file_digest(self, filename):
+        """The digest of a file, memoized by its path, size and modification time"""
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            return self._file_digest(filename)
+        identity = (os.path.realpath(filename), stat.st_size, stat.st_mtime_ns)
+        if identity not in self._file_digests:
+            self._file_digests[identity] = self._file_digest(filename)
+        return self._file_digests[identity]
+
+    @staticmethod
+    def _file_digest(filename):
+        digest = hashlib.sha256()
+        try:
+            with open(filename, "rb") as file:
+                for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                    digest.update(chunk)
+        except FileNotFoundError:
+            digest.update(str(filename).encode())
+        return digest.hexdigest()
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}, Location: {self.cache_dir}, Hits: {self.hits}, Misses: {self.misses}>"
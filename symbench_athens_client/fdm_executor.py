@@ -1,35 +1,47 @@
+import asyncio
+import functools
 import math
 import os
+import shutil
 import subprocess
-from csv import DictWriter
-from glob import glob
+import tempfile
+import threading
+import weakref
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
 from pathlib import Path
 from shutil import move
 from uuid import uuid4
 
 from symbench_athens_client.exceptions import FDMFailedException
-from symbench_athens_client.models.fd_metrics import (
-    FDMFlightMetric,
-    FDMFlightPathMetric,
-    FDMInputMetric,
-)
+from symbench_athens_client.models.fd_metrics import FDMInputMetric, parse_fd_metrics
 from symbench_athens_client.models.uav_designs import QuadCopter
-from symbench_athens_client.utils import extract_from_zip, get_logger
+from symbench_athens_client.results_store import RESULTS_FILE, ResultsStore
+from symbench_athens_client.utils import (
+    extract_from_zip,
+    get_logger,
+    relative_path,
+)
+
+FLIGHT_PATHS = (1, 3, 4, 5)
 
 
 class FDMExecutor:
-    def __init__(self, fdm_path=None):
+    def __init__(self, fdm_path=None, cache=None):
         """The executor for fdm process.
 
         Parameters
         ----------
         fdm_path: str, default=None
-            The full path of the new_fdm.exe or new_fdm compiled on a linux system (can be none if its already in your path)
+            The path of the new_fdm.exe or new_fdm compiled on a linux system (can be none if its already in your path),
+            a relative path is resolved against the current working directory
+        cache: symbench_athens_client.fdm_cache.FDMResultCache, default=None
+            If provided, results for previously executed inputs are returned from this cache
         """
-        self.fdm_path = fdm_path or "new_fdm"
+        self.fdm_path = _resolve_executable(fdm_path)
+        self.cache = cache
         self.logger = get_logger(self.__class__.__name__)
 
-    def execute(self, input_file, output_file):
+    def execute(self, input_file, output_file, cwd=None, fd_params=None):
         """Execute the FDM process.
 
         Parameters
@@ -38,12 +50,39 @@ class FDMExecutor:
             The input file path for the flight dynamics software
         output_file: str
             The output file path for the flight dynamics software
+        cwd: str, pathlib.Path, default=None
+            The directory to run the FDM process in. The flight dynamics software
+            writes metrics.out (and other score files) here and relative input/output
+            paths are resolved against it. If None, the current working directory is used
+        fd_params: dict, default=None
+            The parameters the input file was generated from (as returned by to_fd_input).
+            If provided, the input metrics are built from these instead of re-reading the input file
         """
+        run_dir = Path(cwd) if cwd is not None else Path(os.getcwd())
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(input_file, self.fdm_path, cwd=run_dir)
+            results = self.cache.load(
+                cache_key, run_dir / output_file, run_dir / "metrics.out"
+            )
+            if results is not None:
+                self.logger.info(f"Using cached FDM results for {input_file}")
+                return results
+
+        results = self._run(input_file, output_file, run_dir, fd_params)
+        if cache_key is not None:
+            self.cache.store(
+                cache_key, results, run_dir / output_file, run_dir / "metrics.out"
+            )
+
+        return results
+
+    def _run(self, input_file, output_file, run_dir, fd_params=None):
         fdm_cmd = f"{self.fdm_path} < {input_file} > {output_file}"
         self.logger.info(
-            f"Opening the FDM execution process as {fdm_cmd}, PID: {os.getpid()}"
+            f"Opening the FDM execution process as {fdm_cmd} in {run_dir}, PID: {os.getpid()}"
         )
-        with subprocess.Popen(fdm_cmd, shell=True) as fdm_process:
+        with subprocess.Popen(fdm_cmd, shell=True, cwd=run_dir) as fdm_process:
             try:
                 fdm_process.wait(300)
                 if fdm_process.returncode != 0:
@@ -51,16 +90,430 @@ class FDMExecutor:
                         f"The FDM executable failed. The stderr is:\n{fdm_process.stderr}"
                     )
 
-                return (
-                    FDMInputMetric.from_fd_input(input_file),
-                    FDMFlightMetric.from_fd_metrics("./metrics.out"),
-                    FDMFlightPathMetric.from_fd_metrics("./metrics.out"),
+                return _read_results(
+                    run_dir / input_file, run_dir / "metrics.out", fd_params
                 )
 
             except subprocess.TimeoutExpired:
                 raise FDMFailedException("The FDM Process timed-out. Exiting.")
 
 
+def _resolve_executable(fdm_path):
+    """The FDM executable, resolved to an absolute path if it's a (relative) path rather than a name to look up in PATH.
+
+    The FDM runs in its own run directory, where a relative executable path would not be found.
+    """
+    fdm_path = str(fdm_path or "new_fdm")
+    if os.sep in fdm_path or (os.altsep is not None and os.altsep in fdm_path):
+        return str(Path(fdm_path).resolve())
+    return fdm_path
+
+
+def _read_results(input_file, metrics_file, fd_params=None):
+    input_metrics = (
+        FDMInputMetric.from_fd_params(fd_params)
+        if fd_params is not None
+        else FDMInputMetric.from_fd_input(input_file)
+    )
+    flight_metrics, path_metrics, _ = parse_fd_metrics(metrics_file)
+    return input_metrics, flight_metrics, path_metrics
+
+
+_worker_executors = {}
+
+
+def _execute_in_sandbox(
+    fdm_path,
+    input_file,
+    output_file,
+    cwd,
+    metrics_file,
+    sandbox_root,
+    keep_sandbox,
+    cache=None,
+    cache_key=None,
+    fd_params=None,
+):
+    """Run a single FDM job (in a worker process) inside its own run directory."""
+    if fdm_path not in _worker_executors:
+        _worker_executors[fdm_path] = FDMExecutor(fdm_path=fdm_path)
+    executor = _worker_executors[fdm_path]
+
+    is_sandbox = cwd is None
+    run_dir = (
+        Path(tempfile.mkdtemp(prefix="fdm-", dir=sandbox_root))
+        if is_sandbox
+        else Path(cwd)
+    )
+
+    try:
+        results = executor.execute(
+            input_file, output_file, cwd=run_dir, fd_params=fd_params
+        )
+        if cache_key is not None:
+            cache.store(cache_key, results, output_file, run_dir / "metrics.out")
+        if metrics_file is not None:
+            move(str(run_dir / "metrics.out"), str(metrics_file))
+        return results
+    finally:
+        if is_sandbox and not keep_sandbox:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+
+class ParallelFDMExecutor:
+    """Execute many FDM processes at once on a bounded pool of worker processes.
+
+    Every job runs in its own run directory, so that the metrics.out (and other
+    score files) of concurrent runs never clash. Unless a run directory is
+    provided, a fresh sandbox directory is created for the job and removed
+    once its results are parsed.
+
+    Parameters
+    ----------
+    fdm_path: str, default=None
+        The path of the new_fdm.exe or new_fdm compiled on a linux system (can be none if its already in your path),
+        a relative path is resolved against the current working directory
+    max_workers: int, default=None
+        The maximum number of FDM processes to run at once, defaults to the number of CPUs
+    sandbox_root: str, pathlib.Path, default=None
+        The directory to create sandbox directories in, if None the system's temporary directory is used
+    keep_sandboxes: bool, default=False
+        If True, do not remove the sandbox directories after a job finishes (useful for debugging)
+    cache: symbench_athens_client.fdm_cache.FDMResultCache, default=None
+        If provided, results for previously executed inputs are returned from this cache (without submitting a job)
+
+    Notes
+    -----
+    The propeller performance files referenced in an input file are resolved by the
+    flight dynamics software relative to the run directory. Use absolute propeller
+    data paths when running in sandboxes, or provide the run directory (`cwd`)
+    the input file was generated for.
+    """
+
+    def __init__(
+        self,
+        fdm_path=None,
+        max_workers=None,
+        sandbox_root=None,
+        keep_sandboxes=False,
+        cache=None,
+    ):
+        self.fdm_path = _resolve_executable(fdm_path)
+        self.max_workers = max_workers or os.cpu_count()
+        self.sandbox_root = (
+            str(Path(sandbox_root).resolve()) if sandbox_root is not None else None
+        )
+        self.keep_sandboxes = keep_sandboxes
+        self.cache = cache
+        self.logger = get_logger(self.__class__.__name__)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool
+
+    def submit(
+        self, input_file, output_file, cwd=None, metrics_file=None, fd_params=None
+    ):
+        """Submit an FDM job to the pool.
+
+        Parameters
+        ----------
+        input_file: str, pathlib.Path
+            The input file path for the flight dynamics software (relative paths are resolved against `cwd`, if provided)
+        output_file: str, pathlib.Path
+            The output file path for the flight dynamics software (relative paths are resolved against `cwd`, if provided)
+        cwd: str, pathlib.Path, default=None
+            The run directory for this job, if None a sandbox directory is used.
+            No two running jobs should share a run directory.
+        metrics_file: str, pathlib.Path, default=None
+            If provided, the metrics.out of this run is moved to this location
+        fd_params: dict, default=None
+            The parameters the input file was generated from (as returned by to_fd_input),
+            used to build the input metrics without re-reading the input file
+
+        Returns
+        -------
+        concurrent.futures.Future
+            A future resolving to the (input_metrics, flight_metrics, path_metrics) tuple
+        """
+        base_dir = Path(cwd).resolve() if cwd is not None else Path(os.getcwd())
+        input_file = base_dir / input_file
+        output_file = base_dir / output_file
+        if metrics_file is not None:
+            metrics_file = base_dir / metrics_file
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(input_file, self.fdm_path, cwd=base_dir)
+            results = self.cache.load(
+                cache_key,
+                output_file,
+                metrics_file
+                if metrics_file is not None or cwd is None
+                else base_dir / "metrics.out",
+            )
+            if results is not None:
+                self.logger.info(f"Using cached FDM results for {input_file}")
+                future = Future()
+                future.set_result(results)
+                return future
+
+        self.logger.debug(f"Submitting FDM job for {input_file}")
+        return self._get_pool().submit(
+            _execute_in_sandbox,
+            self.fdm_path,
+            str(input_file),
+            str(output_file),
+            str(base_dir) if cwd is not None else None,
+            str(metrics_file) if metrics_file is not None else None,
+            self.sandbox_root,
+            self.keep_sandboxes,
+            self.cache,
+            cache_key,
+            fd_params,
+        )
+
+    def execute(
+        self, input_file, output_file, cwd=None, metrics_file=None, fd_params=None
+    ):
+        """Execute a single FDM job and wait for its results (same as FDMExecutor.execute)."""
+        return self.submit(
+            input_file,
+            output_file,
+            cwd=cwd,
+            metrics_file=metrics_file,
+            fd_params=fd_params,
+        ).result()
+
+    def as_completed(self, jobs):
+        """Submit many FDM jobs and yield them as they finish.
+
+        Parameters
+        ----------
+        jobs: iterable of dict
+            The keyword arguments to `submit` for every job
+
+        Yields
+        ------
+        tuple of (dict, concurrent.futures.Future)
+            The job and its (finished) future, in the order of completion
+        """
+        futures = {self.submit(**job): job for job in jobs}
+        for future in as_completed(futures):
+            yield futures[future], future
+
+    def shutdown(self, wait=True):
+        """Shutdown the worker processes."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+
+class AsyncFDMExecutor:
+    """The asyncio executor for fdm processes.
+
+    The FDM process is spawned without a shell and the input file is fed
+    through its stdin. At most `max_concurrency` FDM processes of this
+    executor run at once (in every event loop using it), so that a single
+    event loop can drive many simulations.
+
+    Parameters
+    ----------
+    fdm_path: str, default=None
+        The full path of the new_fdm.exe or new_fdm compiled on a linux system (can be none if its already in your path)
+    max_concurrency: int, default=None
+        The maximum number of FDM processes to run at once, defaults to the number of CPUs
+    timeout: float, default=300
+        The timeout (in seconds) for a single FDM process
+    """
+
+    def __init__(self, fdm_path=None, max_concurrency=None, timeout=300):
+        self.fdm_path = _resolve_executable(fdm_path)
+        self.max_concurrency = max_concurrency or os.cpu_count()
+        self.timeout = timeout
+        self.logger = get_logger(self.__class__.__name__)
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    @property
+    def semaphore(self):
+        # A semaphore per event loop, created lazily in (so bound to) the running loop
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[loop]
+
+    async def execute(
+        self, input_file, output_file, cwd=None, timeout=None, fd_params=None
+    ):
+        """Execute the FDM process.
+
+        Parameters
+        ----------
+        input_file: str, pathlib.Path
+            The input file path for the flight dynamics software
+        output_file: str, pathlib.Path
+            The output file path for the flight dynamics software
+        cwd: str, pathlib.Path, default=None
+            The directory to run the FDM process in (relative input/output paths are resolved against it).
+            If None, the current working directory is used
+        timeout: float, default=None
+            The timeout (in seconds) for this run, if None the executor's timeout is used
+        fd_params: dict, default=None
+            The parameters the input file was generated from (as returned by to_fd_input),
+            used to build the input metrics without re-reading the input file
+
+        Notes
+        -----
+        If the task running this coroutine is cancelled (or times out), the FDM process is killed.
+        """
+        run_dir = Path(cwd) if cwd is not None else Path(os.getcwd())
+        with open(run_dir / input_file, "rb") as fd_input:
+            input_bytes = fd_input.read()
+
+        async with self.semaphore:
+            self.logger.info(
+                f"Opening the FDM execution process for {input_file} in {run_dir}"
+            )
+            with open(run_dir / output_file, "wb") as fd_output:
+                fdm_process = await asyncio.create_subprocess_exec(
+                    self.fdm_path,
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=fd_output,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=str(run_dir),
+                )
+                try:
+                    _, stderr = await asyncio.wait_for(
+                        fdm_process.communicate(input_bytes),
+                        self.timeout if timeout is None else timeout,
+                    )
+                except asyncio.TimeoutError:
+                    await self._kill(fdm_process)
+                    raise FDMFailedException("The FDM Process timed-out. Exiting.")
+                except asyncio.CancelledError:
+                    await self._kill(fdm_process)
+                    raise
+
+            if fdm_process.returncode != 0:
+                raise FDMFailedException(
+                    f"The FDM executable failed. The stderr is:\n{stderr.decode()}"
+                )
+
+        return _read_results(run_dir / input_file, run_dir / "metrics.out", fd_params)
+
+    async def run_all_paths(
+        self,
+        design,
+        testbench_path_or_formulae,
+        output_dir,
+        propellers_data=None,
+        requested_vertical_speed=-2,
+        requested_lateral_speed=10,
+    ):
+        """Execute the flight dynamics on all the flight paths of a design concurrently.
+
+        Parameters
+        ----------
+        design: QuadCopter
+            The quadCopter seed design instance
+        testbench_path_or_formulae: str, pathlib.Path, dict
+            The testbench data location or the mass formulae to compute mass properties for this design
+        output_dir: str, pathlib.Path
+            The directory to run the flight paths in (every flight path runs in its own Path<i> subdirectory)
+        propellers_data: str, pathlib.Path, default=None
+            The location for the propellers data
+        requested_vertical_speed: float, default=-2
+            The requested vertical speed for the rise and hover path
+        requested_lateral_speed: float, default=10
+            The requested lateral speed for all other paths
+
+        Returns
+        -------
+        dict
+            The metrics of all the flight paths (same as FlightDynamicsExperiment.run_for)
+        """
+        output_dir = Path(output_dir).resolve()
+        run_dirs = {i: output_dir / f"Path{i}" for i in FLIGHT_PATHS}
+        for run_dir in run_dirs.values():
+            os.makedirs(run_dir, exist_ok=True)
+
+        # Mass property estimation is CPU bound, keep it off the event loop
+        fd_params = await asyncio.get_running_loop().run_in_executor(
+            None,
+            functools.partial(
+                design.to_fd_inputs,
+                testbench_path_or_formulae,
+                flight_paths=FLIGHT_PATHS,
+                propellers_data_path=relative_path(run_dirs[1], propellers_data)
+                + os.sep
+                if propellers_data is not None
+                else None,
+                filenames={
+                    i: run_dirs[i] / f"FlightDyn_Path{i}.inp" for i in FLIGHT_PATHS
+                },
+                requested_vertical_speed=requested_vertical_speed,
+                requested_lateral_speed=requested_lateral_speed,
+            ),
+        )
+
+        tasks = [
+            asyncio.ensure_future(
+                self.execute(
+                    f"FlightDyn_Path{i}.inp",
+                    f"FlightDynReport_Path{i}.out",
+                    cwd=run_dirs[i],
+                    fd_params=fd_params[i],
+                )
+            )
+            for i in FLIGHT_PATHS
+        ]
+        try:
+            path_results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        metrics = {"AnalysisError": None}
+        update_path_metrics(metrics, path_results, design)
+        update_total_score(metrics)
+        metrics["AnalysisError"] = False
+        return metrics
+
+    @staticmethod
+    async def _kill(fdm_process):
+        if fdm_process.returncode is None:
+            fdm_process.kill()
+            await fdm_process.wait()
+
+
+def update_path_metrics(metrics, path_results, design):
+    """Merge the (input, flight, path) metrics of the flight paths of a design into metrics"""
+    for input_metrics, flight_metrics, path_metrics in path_results:
+        # Input Metrics
+        metrics.update(input_metrics.to_csv_dict())
+        other_metrics = design.parameters()
+        for key in other_metrics:
+            if key.startswith("Length"):
+                metrics[key] = other_metrics[key]
+
+        # Get the FlightPath metrics
+        metrics.update(flight_metrics.to_csv_dict())
+        metrics.update(path_metrics.to_csv_dict())
+
+
 def update_total_score(metrics):
     scores = [
         metrics["Path_score_Path1"],
@@ -71,32 +524,6 @@ def update_total_score(metrics):
     metrics["TotalPathScore"] = sum(scores) if not math.isclose(scores[2], 0.0) else 0.0
 
 
-def write_output_csv(output_dir, metrics):
-    # Note that this should be a pathlib.Path instance,
-    # but since this is an internal use function which might be
-    # refactored anyways. Its always fine to do it this way
-    output_csv = output_dir / "output.csv"
-    should_write_header = True
-
-    if output_csv.exists():
-        should_write_header = False
-
-    with open(output_csv, "a") as csv_file:
-        csv_writer = DictWriter(
-            csv_file, fieldnames=list(metrics.keys()), lineterminator="\n"
-        )
-        if should_write_header:
-            csv_writer.writeheader()
-        csv_writer.writerow(metrics)
-
-
-def cleanup_score_files():
-    out_files = glob("*.out")
-    for file in out_files:
-        if file in {"path.out", "path2.out", "namelist.out", "score.out"}:
-            os.unlink(file)
-
-
 ## ToDo: Deprecate This??
 def execute_fd_all_paths(
     design,
@@ -106,6 +533,9 @@ def execute_fd_all_paths(
     propellers_data_location=f"../data/propellers",
     fdm_path=None,
     output_dir="results",
+    executor=None,
+    results_store=None,
+    write_to_output_csv=True,
 ):
     """Execute flight dynamics on all paths for a design(only works for quadcopter).
 
@@ -125,6 +555,12 @@ def execute_fd_all_paths(
         The fdm executable path (If None, it is assumed that fdm is in your path)
     output_dir: str, patlib.Path, default="results"
         Where to save the output to
+    executor: FDMExecutor or ParallelFDMExecutor, default=None
+        The executor to run the flight dynamics software with, if None a FDMExecutor is used
+    results_store: ResultsStore, default=None
+        The store to record the metrics in, if None the results store in output_dir
+    write_to_output_csv: bool, default=True
+        If True, export the results in the store to output_dir's output.csv
 
     Returns
     -------
@@ -154,25 +590,34 @@ def execute_fd_all_paths(
     # Keep a .generated mark
     (output_dir / ".generated").touch()
 
-    executor = FDMExecutor(fdm_path=fdm_path)
+    executor = executor or FDMExecutor(fdm_path=fdm_path)
+
+    propellers_data_location = Path(propellers_data_location).resolve()
 
     metrics = {"GUID": run_guid, "AnalysisError": None}
     try:
-        for i in [1, 3, 4, 5]:
+        for i in FLIGHT_PATHS:
             fd_input_path = f"FlightDyn_Path{i}.inp"
             fd_output_path = f"FlightDynReport_Path{i}.out"
+            # Every flight path executes in its own directory, the working directory is left as is
+            run_dir = fd_files_base_path / f"Path{i}"
+            os.makedirs(run_dir, exist_ok=True)
 
-            design.to_fd_input(
+            fd_params = design.to_fd_input(
                 testbench_path_or_formulae=str(tb_data_location),
                 requested_vertical_speed=0 if i != 4 else requested_vertical_speed,
                 requested_lateral_speed=0 if i == 4 else int(requested_lateral_speed),
                 flight_path=i,
-                propellers_data_path=str(propellers_data_location),
-                filename=fd_input_path,
+                propellers_data_path=relative_path(run_dir, propellers_data_location)
+                + os.sep,
+                filename=run_dir / fd_input_path,
             )
 
             input_metrics, flight_metrics, path_metrics = executor.execute(
-                str(fd_input_path), str(fd_output_path)
+                fd_input_path,
+                fd_output_path,
+                cwd=run_dir,
+                fd_params=fd_params,
             )
 
             # Input Metrics
@@ -182,12 +627,14 @@ def execute_fd_all_paths(
             metrics.update(flight_metrics.to_csv_dict())
             metrics.update(path_metrics.to_csv_dict())
 
-            # Move input and output files to necessary locations
-            move(fd_input_path, fd_files_base_path)
-            move(fd_output_path, fd_files_base_path)
-
-            # Remove metrics.out, score.out namemap.out
-            cleanup_score_files()
+            # Move input, output and metrics files to necessary locations
+            move(str(run_dir / fd_input_path), fd_files_base_path)
+            move(str(run_dir / fd_output_path), fd_files_base_path)
+            move(
+                str(run_dir / "metrics.out"),
+                fd_files_base_path / f"metrics_Path{i}.out",
+            )
+            shutil.rmtree(run_dir)
 
         # Update the total score
         update_total_score(metrics)
@@ -197,6 +644,14 @@ def execute_fd_all_paths(
         metrics["AnalysisError"] = True
         raise e
 
-    write_output_csv(output_dir=output_dir, metrics=metrics)
+    results = results_store or ResultsStore(output_dir / RESULTS_FILE)
+    try:
+        results.append(metrics)
+        results.flush()
+        if write_to_output_csv:
+            results.update_csv(output_dir / "output.csv")
+    finally:
+        if results_store is None:
+            results.close()
 
     return metrics
@@ -1,34 +1,48 @@
 import json
 import os
+import shutil
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 from shutil import move
 from uuid import uuid4
 
+import numpy as np
 from uav_analysis.mass_properties_hackathon1 import (
     quad_copter_batt_prop,
     quad_copter_fixed_bemp2,
 )
 from uav_analysis.testbench_data import TestbenchData
 
-from symbench_athens_client.exceptions import PropellerAssignmentError
 from symbench_athens_client.fdm_executor import (
+    FLIGHT_PATHS,
     FDMExecutor,
-    cleanup_score_files,
+    ParallelFDMExecutor,
+    update_path_metrics,
     update_total_score,
-    write_output_csv,
 )
-from symbench_athens_client.models.component import Battery
+from symbench_athens_client.hover_estimates import HoverEstimator
+from symbench_athens_client.models import uam_components, uav_components
+from symbench_athens_client.models.component import Battery, ComponentsRepository
 from symbench_athens_client.models.uav_components import Batteries, Motors, Propellers
 from symbench_athens_client.models.uav_designs import QuadCopter
+from symbench_athens_client.results_store import RESULTS_FILE, ResultsStore
+from symbench_athens_client.session_manifest import SessionManifest
 from symbench_athens_client.utils import (
     assign_propellers_quadcopter,
     estimate_mass_formulae,
     extract_from_zip,
     get_logger,
+    get_mass_parameters_for_quadcopter,
+    get_propeller_pairs,
+    get_runnable_propellers,
     relative_path,
 )
 
+MANIFEST_FILE = "manifest.sqlite"
+
 
 class FlightDynamicsExperiment:
     """The symbench athens client's experiment class.
@@ -58,6 +72,8 @@ class FlightDynamicsExperiment:
         The location of the fdm executable, if None, its assumed to be in PATH
     estimator: function, optional, default=None
         The estimator function from uav_analyisis library to use, If None, quadcopter_fixed_bemp2 is used.
+    executor: FDMExecutor or ParallelFDMExecutor, optional, default=None
+        The executor to run the flight dynamics software with, If None, a FDMExecutor for fdm_path is used.
 
     Attributes
     ----------
@@ -83,6 +99,7 @@ class FlightDynamicsExperiment:
         valid_requirements,
         fdm_path=None,
         estimator=None,
+        executor=None,
     ):
         self.testbenches, self.propellers_data = self._validate_files(
             testbenches, propellers_data
@@ -92,10 +109,12 @@ class FlightDynamicsExperiment:
         self.valid_requirements = valid_requirements
         self.logger = get_logger(self.__class__.__name__)
         self.session_id = f"e-{datetime.now().isoformat()}".replace(":", "-")
-        self.executor = FDMExecutor(fdm_path=fdm_path)
-        self.results_dir = Path(
-            f"results/{self.design.__class__.__name__}/{self.session_id}"
-        ).resolve()
+        self.executor = executor or FDMExecutor(fdm_path=fdm_path)
+        self._parallel_executor = None
+        self._parallel_executor_lock = threading.Lock()
+        self.results_dir = self._session_results_dir(self.session_id)
+        self.manifest = None
+        self.results = None
         self.formulae = estimate_mass_formulae(
             frozenset(self.testbenches),
             estimator=estimator or quad_copter_fixed_bemp2,
@@ -126,10 +145,11 @@ class FlightDynamicsExperiment:
 
         self._customize_components()
 
-    def _customize_components(self, out_dir=None):
+    def _customize_components(self, out_dir=None, design=None):
+        design = design or self.design
         with (self.results_dir / "componentMap.json").open("r") as components_file:
             components = json.load(components_file)
-            design_components = self.design.components(by_alias=True)
+            design_components = design.components(by_alias=True)
             for component in components:
                 if component["FROM_COMP"] in design_components:
                     component["LIB_COMPONENT"] = design_components[
@@ -142,10 +162,26 @@ class FlightDynamicsExperiment:
         with (out_dir / "componentMap.json").open("w") as components_file:
             json.dump(components, components_file)
 
-        self.design.swap_list = {}
+        design.swap_list = {}
 
     def start(self):
         self._create_results_dir()
+        if self.manifest is not None:
+            self.manifest.close()
+            self.results.close()
+        self.manifest = SessionManifest(self.results_dir / MANIFEST_FILE)
+        self.results = ResultsStore(self.results_dir / RESULTS_FILE)
+
+    def stop(self):
+        """Close the session's manifest and results store and shutdown the worker processes for parallel paths"""
+        with self._parallel_executor_lock:
+            parallel_executor, self._parallel_executor = self._parallel_executor, None
+        if parallel_executor is not None:
+            parallel_executor.shutdown()
+        if self.manifest is not None:
+            self.manifest.close()
+            self.results.close()
+            self.manifest = self.results = None
 
     def run_for(
         self,
@@ -153,15 +189,42 @@ class FlightDynamicsExperiment:
         requirements=None,
         change_dir=False,
         write_to_output_csv=False,
+        parallel_paths=False,
     ):
-        """Run the flight dynamics for the given parameters and requirements"""
+        """Run the flight dynamics for the given parameters and requirements
+
+        The metrics of the run are recorded in the session's results store.
+
+        Parameters
+        ----------
+        parameters: dict, default=None
+            The design parameters to set before running the flight dynamics
+        requirements: dict, default=None
+            The requested vertical/lateral speeds for the flight paths
+        change_dir: bool, default=False
+            Deprecated, the flight paths always execute in their own directories (in the
+            run's artifacts directory), without changing the working directory
+        write_to_output_csv: bool, default=False
+            If True, export the session's results (including this run) to its output.csv
+        parallel_paths: bool, default=False
+            If True, generate the inputs for all the flight paths at once and execute them
+            concurrently, each in its own directory. The resulting metrics are identical
+            to the ones from the serial execution. The worker processes (and the executor's
+            cache) are shared by the runs of the experiment, until `stop`.
+        """
+
+        if change_dir:
+            warnings.warn(
+                "change_dir is deprecated and ignored, the flight paths always execute "
+                "in their own directories",
+                DeprecationWarning,
+                stacklevel=2,
+            )
 
         parameters = self._validate_dict(parameters, "parameters")
         requirements = self._validate_dict(requirements, "requirements")
 
-        for key, value in parameters.items():
-            if key in self.valid_parameters:
-                setattr(self.design, key, value)
+        self._set_parameters(self.design, parameters)
 
         self.logger.info(
             f"About to execute FDM on {self.design.__class__.__name__}, "
@@ -170,6 +233,12 @@ class FlightDynamicsExperiment:
         )
 
         run_guid = str(uuid4())
+        run_key = self.manifest.submit(
+            self._run_parameters(self.design, parameters),
+            requirements,
+            self.design.components(by_alias=True),
+        )
+        self.manifest.mark_running(run_key, run_guid)
 
         fd_files_base_path = self.results_dir / "artifacts" / run_guid
         os.makedirs(fd_files_base_path, exist_ok=True)
@@ -179,78 +248,339 @@ class FlightDynamicsExperiment:
 
         metrics = {"GUID": run_guid, "AnalysisError": None}
         try:
-            current_dir = os.getcwd()
-            if change_dir:
-                os.chdir(fd_files_base_path)
-
-            for i in [1, 3, 4, 5]:
-                fd_input_path = f"FlightDyn_Path{i}.inp"
-                fd_output_path = f"FlightDynReport_Path{i}.out"
-
-                self.design.to_fd_input(
-                    testbench_path_or_formulae=self.formulae,
-                    requested_vertical_speed=0
-                    if i != 4
-                    else requirements.get("requested_vertical_speed", -2),
-                    requested_lateral_speed=0
-                    if i == 4
-                    else int(requirements.get("requested_lateral_speed", 10)),
-                    flight_path=i,
-                    propellers_data_path=relative_path(
-                        os.getcwd(), self.propellers_data
-                    )
-                    + os.sep,
-                    filename=fd_input_path,
+            if parallel_paths:
+                path_results = self._execute_paths_concurrently(
+                    fd_files_base_path, requirements
                 )
-
-                input_metrics, flight_metrics, path_metrics = self.executor.execute(
-                    str(fd_input_path), str(fd_output_path)
+            else:
+                path_results = self._execute_paths_in_dirs(
+                    fd_files_base_path, requirements, self.design
                 )
 
-                # Input Metrics
-                metrics.update(input_metrics.to_csv_dict())
-                other_metrics = self.design.parameters()
-                for key in other_metrics:
-                    if key.startswith("Length"):
-                        metrics[key] = other_metrics[key]
-
-                # Get the FlightPath metrics
-                metrics.update(flight_metrics.to_csv_dict())
-                metrics.update(path_metrics.to_csv_dict())
-
-                # Move input and output files to necessary locations
-                if not change_dir:
-                    move(fd_input_path, fd_files_base_path)
-                    move(fd_output_path, fd_files_base_path)
-
-                move("./metrics.out", fd_files_base_path / f"metrics_Path{i}.out")
-
-                # Remove metrics.out, score.out namemap.out
-                cleanup_score_files()
+            update_path_metrics(metrics, path_results, self.design)
 
             # Update the total score
             update_total_score(metrics)
             metrics["AnalysisError"] = False
 
-            if change_dir:
-                os.chdir(current_dir)
-
         except Exception as e:
             metrics["AnalysisError"] = True
+            self.manifest.mark_failed(run_key, f"{e.__class__.__name__}: {e}")
             raise e
 
+        self.results.append(metrics)
+        self.results.flush()
+        self.manifest.mark_done(run_key, run_guid)
         if write_to_output_csv:
-            write_output_csv(output_dir=self.results_dir, metrics=metrics)
+            self.export_output_csv()
+
+        return metrics
+
+    def run_many(
+        self,
+        parameter_sets,
+        requirements=None,
+        workers=None,
+        write_to_output_csv=True,
+    ):
+        """Run the flight dynamics for many parameter sets, on a pool of workers.
+
+        Every parameter set runs on its own copy of the design (the experiment's design is
+        left as is), with the flight paths of a run executed in its own directory. The
+        metrics of the runs are yielded as they complete and written, in batches, to the
+        session's results store (see ResultsStore). A failing run doesn't abort the
+        others, its metrics have AnalysisError set and the error message in Error.
+
+        The runs are recorded in the session's manifest, keyed by all the design's parameters
+        (its current ones, with the parameter set's overrides), requirements and components.
+        Runs which are already done in this session are skipped and an interrupted session
+        can be resumed (see `resume`). The runs are submitted to the manifest once the
+        returned iterator is first advanced, so a call whose iterator is never consumed
+        leaves no pending runs behind.
+
+        Parameters
+        ----------
+        parameter_sets: iterable of dict
+            The design parameters of every run
+        requirements: dict, default=None
+            The requested vertical/lateral speeds for the flight paths (of every run)
+        workers: int, default=None
+            The number of runs to execute concurrently, if None the number of CPUs
+        write_to_output_csv: bool, default=True
+            If True, export the session's results (including these runs) to its output.csv
+
+        Returns
+        -------
+        iterator of dict
+            The metrics of every run (including its parameters), in the order they complete
+        """
+        parameter_sets = [
+            self._validate_dict(parameters, "parameters")
+            for parameters in parameter_sets
+        ]
+        requirements = self._validate_dict(requirements, "requirements")
+        components = self.design.components(by_alias=True)
+
+        runs = []
+        for parameters in parameter_sets:
+            run_parameters = self._run_parameters(self.design, parameters)
+            runs.append(
+                {
+                    "key": SessionManifest.key(
+                        run_parameters, requirements, components
+                    ),
+                    "parameters": run_parameters,
+                    "requirements": requirements,
+                    "components": components,
+                }
+            )
+
+        return self._run_many(runs, workers, write_to_output_csv, submit=True)
+
+    def resume(self, session_id, workers=None, write_to_output_csv=True):
+        """Resume a session, rerunning the runs that were pending, interrupted or failed.
+
+        The session's manifest keeps the state of every run submitted with `run_many`
+        or `run_for`, so a session that crashed (or was killed) can carry on, skipping
+        the runs which are done. The runs are executed like `run_many` does.
+
+        Parameters
+        ----------
+        session_id: str
+            The id of the session to resume (the name of its results directory)
+        workers: int, default=None
+            The number of runs to execute concurrently, if None the number of CPUs
+        write_to_output_csv: bool, default=True
+            If True, export the session's results (including these runs) to its output.csv
+
+        Returns
+        -------
+        iterator of dict
+            The metrics of the runs, in the order they complete
+        """
+        results_dir = self._session_results_dir(session_id)
+        if not (results_dir / MANIFEST_FILE).exists():
+            raise FileNotFoundError(
+                f"The session {session_id} has no manifest in {results_dir}"
+            )
+
+        self.session_id = session_id
+        self.results_dir = results_dir
+        self.start()
+
+        runs = self.manifest.unfinished()
+        self.logger.info(
+            f"Resuming session {session_id}, {len(runs)} runs to execute "
+            f"({self.manifest.counts()})"
+        )
+        return self._run_many(runs, workers, write_to_output_csv)
+
+    def _run_many(self, runs, workers, write_to_output_csv, submit=False):
+        if submit:
+            runs = self._submit_runs(runs)
+        workers = workers or os.cpu_count() or 1
+        num_runs, num_failed, futures = 0, 0, []
+        # Runs are marked done once their metrics are written to the results store
+        done_runs = []
+        pool = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = {pool.submit(self._run_design_copy, run): run for run in runs}
+            for future in as_completed(futures):
+                metrics = future.result()
+                num_runs += 1
+                self.results.append(metrics)
+                if metrics["AnalysisError"]:
+                    num_failed += 1
+                else:
+                    done_runs.append((futures[future]["key"], metrics["GUID"]))
+                if self.results.num_buffered == 0:
+                    self._mark_done(done_runs)
+                yield metrics
+        finally:
+            for future in futures:
+                future.cancel()
+            pool.shutdown(wait=True)
+            self.results.flush()
+            self._mark_done(done_runs)
+            if write_to_output_csv and num_runs:
+                self.export_output_csv()
+            self.logger.info(
+                f"Executed FDM on {num_runs} parameter sets, {num_failed} failed"
+            )
+
+    def _submit_runs(self, runs):
+        """Record the runs in the manifest, returning the ones which aren't done in this session"""
+        for run in runs:
+            self.manifest.submit(
+                run["parameters"], run["requirements"], run["components"]
+            )
+        pending = [
+            run
+            for run in runs
+            if self.manifest.state(run["key"]) != SessionManifest.DONE
+        ]
+        self.logger.info(
+            f"About to execute FDM on {len(pending)} parameter sets of "
+            f"{self.design.__class__.__name__} "
+            f"({len(runs) - len(pending)} already done in this session)"
+        )
+        return pending
+
+    def _run_parameters(self, design, parameters):
+        """All the design's parameters (by field name) for a run, with the run's valid parameters overriding the design's"""
+        run_parameters = design.dict(include=design.__design_vars__)
+        run_parameters.update(
+            (key, value)
+            for key, value in parameters.items()
+            if key in self.valid_parameters
+        )
+        return run_parameters
+
+    def _mark_done(self, done_runs):
+        for key, guid in done_runs:
+            self.manifest.mark_done(key, guid)
+        done_runs.clear()
+
+    def export_output_csv(self, filename=None, rewrite=False):
+        """Export the results of the session (in its results store) to a CSV file, output.csv in the results directory by default
+
+        Only the results added since the last export are appended to the file, it is rewritten
+        if the results have new columns (metrics) since, or if rewrite is True (see ResultsStore.update_csv).
+        """
+        self.results.update_csv(
+            filename or self.results_dir / "output.csv", rewrite=rewrite
+        )
+
+    def _run_design_copy(self, run):
+        """Run the flight dynamics for a copy of the design (with the run's components and parameters), recording any failure"""
+        parameters, requirements = run["parameters"], run["requirements"]
+        run_guid = str(uuid4())
+        metrics = {"GUID": run_guid, "AnalysisError": None}
+        self.manifest.mark_running(run["key"], run_guid)
+        try:
+            design = self.design.copy(deep=True)
+            _restore_components(design, run["components"])
+            _restore_parameters(design, parameters)
+            metrics.update(design.parameters())
+
+            fd_files_base_path = self.results_dir / "artifacts" / run_guid
+            os.makedirs(fd_files_base_path, exist_ok=True)
+            if design.swap_list != dict():
+                self._customize_components(fd_files_base_path, design)
+
+            path_results = self._execute_paths_in_dirs(
+                fd_files_base_path, requirements, design
+            )
+            update_path_metrics(metrics, path_results, design)
+            update_total_score(metrics)
+            metrics["AnalysisError"] = False
+        except Exception as e:
+            self.logger.error(f"FDM run {run_guid} for {parameters} failed: {e}")
+            metrics["AnalysisError"] = True
+            metrics["Error"] = f"{e.__class__.__name__}: {e}"
+            self.manifest.mark_failed(run["key"], metrics["Error"])
 
         return metrics
 
+    def _set_parameters(self, design, parameters):
+        for key, value in parameters.items():
+            if key in self.valid_parameters:
+                setattr(design, key, value)
+
+    def _write_path_inputs(self, fd_files_base_path, requirements, design):
+        """Write the input file of every flight path in its own directory, returning the directories and the inputs' parameters"""
+        run_dirs = {i: fd_files_base_path / f"Path{i}" for i in FLIGHT_PATHS}
+        for run_dir in run_dirs.values():
+            os.makedirs(run_dir, exist_ok=True)
+
+        # All the run directories are siblings, so they share the relative propellers path
+        fd_params = design.to_fd_inputs(
+            testbench_path_or_formulae=self.formulae,
+            flight_paths=FLIGHT_PATHS,
+            propellers_data_path=relative_path(run_dirs[1], self.propellers_data)
+            + os.sep,
+            filenames={i: run_dirs[i] / f"FlightDyn_Path{i}.inp" for i in FLIGHT_PATHS},
+            requested_vertical_speed=requirements.get("requested_vertical_speed", -2),
+            requested_lateral_speed=int(
+                requirements.get("requested_lateral_speed", 10)
+            ),
+        )
+
+        return run_dirs, fd_params
+
+    def _execute_paths_in_dirs(self, fd_files_base_path, requirements, design):
+        """Execute the flight paths of a design one after another (each in its own directory), returning their metrics in order"""
+        run_dirs, fd_params = self._write_path_inputs(
+            fd_files_base_path, requirements, design
+        )
+
+        path_results = []
+        for i, run_dir in run_dirs.items():
+            path_results.append(
+                self.executor.execute(
+                    f"FlightDyn_Path{i}.inp",
+                    f"FlightDynReport_Path{i}.out",
+                    cwd=run_dir,
+                    fd_params=fd_params[i],
+                )
+            )
+            move(
+                str(run_dir / "metrics.out"),
+                fd_files_base_path / f"metrics_Path{i}.out",
+            )
+            move(str(run_dir / f"FlightDyn_Path{i}.inp"), fd_files_base_path)
+            move(str(run_dir / f"FlightDynReport_Path{i}.out"), fd_files_base_path)
+            shutil.rmtree(run_dir)
+
+        return path_results
+
+    def _execute_paths_concurrently(self, fd_files_base_path, requirements):
+        """Execute all the flight paths at once (each in its own directory), returning their metrics in order"""
+        run_dirs, fd_params = self._write_path_inputs(
+            fd_files_base_path, requirements, self.design
+        )
+
+        executor = self._get_parallel_executor()
+        futures = [
+            executor.submit(
+                f"FlightDyn_Path{i}.inp",
+                f"FlightDynReport_Path{i}.out",
+                cwd=run_dirs[i],
+                metrics_file=fd_files_base_path / f"metrics_Path{i}.out",
+                fd_params=fd_params[i],
+            )
+            for i in FLIGHT_PATHS
+        ]
+        path_results = [future.result() for future in futures]
+
+        for i, run_dir in run_dirs.items():
+            move(str(run_dir / f"FlightDyn_Path{i}.inp"), fd_files_base_path)
+            move(str(run_dir / f"FlightDynReport_Path{i}.out"), fd_files_base_path)
+            shutil.rmtree(run_dir)
+
+        return path_results
+
+    def _get_parallel_executor(self):
+        """The executor for parallel paths, the experiment's executor or one (sharing its cache) created once and reused until `stop`"""
+        if isinstance(self.executor, ParallelFDMExecutor):
+            return self.executor
+        with self._parallel_executor_lock:
+            if self._parallel_executor is None:
+                self._parallel_executor = ParallelFDMExecutor(
+                    fdm_path=self.executor.fdm_path,
+                    max_workers=len(FLIGHT_PATHS),
+                    cache=getattr(self.executor, "cache", None),
+                )
+            return self._parallel_executor
+
     def start_new_session(self):
         self.session_id = f"e-{datetime.now().isoformat()}".replace(":", "-")
-        self.results_dir = Path(
-            f"results/{self.design.__class__.__name__}/{self.session_id}"
-        ).resolve()
+        self.results_dir = self._session_results_dir(self.session_id)
         self.start()
 
+    def _session_results_dir(self, session_id):
+        return Path(f"results/{self.design.__class__.__name__}/{session_id}").resolve()
+
     @staticmethod
     def _validate_dict(var, name):
         if var and not isinstance(var, dict):
@@ -296,6 +626,8 @@ class QuadCopterVariableBatteryPropExperiment(FlightDynamicsExperiment):
         The propellers data path
     fdm_path: str, pathlib.Path
         The location of the fdm executable, if None, its assumed to be in PATH
+    executor: FDMExecutor or ParallelFDMExecutor, optional, default=None
+        The executor to run the flight dynamics software with
     """
 
     def __init__(
@@ -303,6 +635,7 @@ class QuadCopterVariableBatteryPropExperiment(FlightDynamicsExperiment):
         testbenches,
         propellers_data,
         fdm_path=None,
+        executor=None,
     ):
         design = QuadCopter()
         valid_parameters = design.__design_vars__
@@ -315,9 +648,9 @@ class QuadCopterVariableBatteryPropExperiment(FlightDynamicsExperiment):
             valid_requirements,
             fdm_path=fdm_path,
             estimator=quad_copter_batt_prop,
+            executor=executor,
         )
-        self._run_tester = self.design.copy(deep=True)
-        self._available_propellers = None
+        self._hover_estimator = None
 
     @property
     def battery(self):
@@ -343,11 +676,88 @@ class QuadCopterVariableBatteryPropExperiment(FlightDynamicsExperiment):
 
     @property
     def available_propellers(self):
-        if self._available_propellers is None:
-            self._available_propellers = list(
-                filter(lambda p: self.can_run_for(p), Propellers.all)
+        return get_runnable_propellers()
+
+    @property
+    def hover_estimator(self):
+        if self._hover_estimator is None:
+            self._hover_estimator = HoverEstimator(self.propellers_data)
+        return self._hover_estimator
+
+    def prescreen(
+        self, batteries=None, propellers=None, parameters=None, min_thrust_to_weight=1.0
+    ):
+        """Find the battery/propeller combinations that can hover, without running the FDM.
+
+        The static thrust of every combination is estimated (see HoverEstimator) for
+        the mass estimated by this experiment's mass formulae, to prune the combinations
+        worth running the flight dynamics for.
+
+        Parameters
+        ----------
+        batteries: list of str or Battery, default=None
+            The batteries to screen, if None all the available batteries
+        propellers: list of str or Propeller, default=None
+            The propellers to screen, if None all the available propellers
+        parameters: dict, default=None
+            The design parameters (e.g. arm_length) to estimate the mass for, the design's current
+            parameters otherwise. As in `run_for`, the parameters not in valid_parameters are ignored
+        min_thrust_to_weight: float, default=1.0
+            The minimum estimated thrust to weight ratio for a combination to pass
+
+        Returns
+        -------
+        list of tuple
+            The (battery, propeller) names of the combinations that pass
+        """
+        batteries = [
+            Batteries[battery] if isinstance(battery, str) else battery
+            for battery in (batteries or self.available_batteries)
+        ]
+        propellers = [
+            Propellers[propeller] if isinstance(propeller, str) else propeller
+            for propeller in (propellers or self.available_propellers)
+        ]
+        combinations = [
+            (battery, propeller) for battery in batteries for propeller in propellers
+        ]
+        if not combinations:
+            return []
+
+        mass_parameters = get_mass_parameters_for_quadcopter(self.design)
+        for key, value in (parameters or {}).items():
+            if key in self.valid_parameters:
+                mass_parameters[self.design.__fields__[key].alias] = value
+        for name, component, attribute in (
+            ("Battery_0_Weight", 0, "weight"),
+            ("Battery_0_Length", 0, "length"),
+            ("Battery_0_Width", 0, "width"),
+            ("Battery_0_Thickness", 0, "thickness"),
+            ("Prop_0_Weight", 1, "weight"),
+            ("Prop_0_Diameter", 1, "diameter"),
+            ("Prop_0_Thickness", 1, "hub_thickness"),
+        ):
+            mass_parameters[name] = np.array(
+                [
+                    getattr(combination[component], attribute)
+                    for combination in combinations
+                ],
+                dtype=float,
             )
-        return self._available_propellers
+        mass = self.formulae.evaluate_batch(mass_parameters)["aircraft.mass"]
+
+        estimates = self.hover_estimator.estimate(
+            [propeller for _, propeller in combinations],
+            Motors.t_motor_MN5208KV340,
+            [battery for battery, _ in combinations],
+            mass=mass,
+        )
+        passes = estimates["thrust_to_weight"] >= min_thrust_to_weight
+        return [
+            (battery.name, propeller.name)
+            for (battery, propeller), passed in zip(combinations, passes)
+            if passed
+        ]
 
     def run_for(
         self,
@@ -357,6 +767,7 @@ class QuadCopterVariableBatteryPropExperiment(FlightDynamicsExperiment):
         requirements=None,
         change_dir=False,
         write_to_output_csv=False,
+        parallel_paths=False,
     ):
         if isinstance(battery, str):
             assert battery in self.available_batteries, "Battery name is not valid"
@@ -378,15 +789,14 @@ class QuadCopterVariableBatteryPropExperiment(FlightDynamicsExperiment):
             requirements=requirements,
             change_dir=change_dir,
             write_to_output_csv=write_to_output_csv,
+            parallel_paths=parallel_paths,
         )
 
     def can_run_for(self, propeller):
         """Given a propeller, find if the design will fly based on components available."""
-        try:
-            assign_propellers_quadcopter(self._run_tester, propeller)
-            return True
-        except PropellerAssignmentError:
-            return False
+        if not isinstance(propeller, str):
+            propeller = propeller.name
+        return propeller in get_propeller_pairs()
 
     @staticmethod
     def _assign_battery(design, battery):
@@ -394,3 +804,37 @@ class QuadCopterVariableBatteryPropExperiment(FlightDynamicsExperiment):
             battery, Battery
         ), f"Provided {battery} is not a Battery component"
         design.battery_0 = battery
+
+
+def _restore_components(design, components):
+    """Assign the components (by alias and name) a run was submitted with, where the design's differ"""
+    current = dict(design.iter_components(by_alias=True))
+    swaps = {
+        alias: _find_component(current[alias], name)
+        for alias, name in components.items()
+        if current[alias].name != name
+    }
+    if swaps:
+        design.assign_components(**swaps)
+
+
+def _restore_parameters(design, parameters):
+    """Set the design variables a run was submitted with"""
+    for key, value in parameters.items():
+        if key in design.__design_vars__:
+            setattr(design, key, value)
+
+
+def _find_component(like, name):
+    """Find a component by name in the library of components of the same class (and corpus) as `like`"""
+    library = uav_components if like.corpus == "uav" else uam_components
+    for repository in vars(library).values():
+        if (
+            isinstance(repository, ComponentsRepository)
+            and repository.creator is type(like)
+            and name in repository.components
+        ):
+            return repository[name]
+    raise KeyError(
+        f"{type(like).__name__} {name} is missing from the {like.corpus} corpus"
+    )
@@ -0,0 +1,316 @@
+import numpy as np
+
+from symbench_athens_client.propeller_db import PropellerDatabase
+
+__all__ = ["HoverEstimator"]
+
+AIR_DENSITY = 1.225  # kg/m^3
+GRAVITY = 9.80665  # m/s^2
+
+
+class HoverEstimator:
+    """Vectorized static thrust and hover power estimates from the propellers' performance tables.
+
+    The thrust (Ct) and power (Cp) coefficients of the propellers are interpolated
+    (bilinearly, in RPM and the advance ratio J) from their performance tables. A
+    motor turns its propeller at the RPM where its torque (limited by its maximum
+    current and its share of the battery's continuous current) matches the propeller's
+    torque, which gives the static thrust. The hover RPM is where the propellers'
+    thrust equals the weight, from which the electrical power drawn from the battery
+    follows. Every estimate is computed for many propeller/motor/battery combinations
+    at once, to cheaply prune designs which can't hover before running the FDM.
+
+    ..note::
+        These are estimates for screening designs, not a substitute for the FDM.
+        The battery voltage is its nominal voltage (no voltage drop) and the
+        coefficients beyond the tabulated RPMs are those at the nearest RPM.
+
+    Parameters
+    ----------
+    propeller_db: PropellerDatabase, str or pathlib.Path
+        The propeller performance database, or the directory of the performance files (see PropellerDatabase.for_directory)
+    num_bisections: int, default=40
+        The number of bisection steps in solving for the RPMs
+    """
+
+    def __init__(self, propeller_db, num_bisections=40):
+        if not isinstance(propeller_db, PropellerDatabase):
+            propeller_db = PropellerDatabase.for_directory(propeller_db)
+        self.propeller_db = propeller_db
+        self.num_bisections = num_bisections
+        self._tables = {}
+        self._rpm = self._j = self._ct = self._cp = self._num_rpms = None
+        self._static_ct = self._static_cp = None
+
+    def coefficients(self, propellers, rpm, j=0.0):
+        """Interpolate the thrust and power coefficients of propellers.
+
+        Parameters
+        ----------
+        propellers: Propeller, str or sequence thereof
+            The propellers (or their performance files)
+        rpm: float or array_like
+            The RPMs, broadcast with the propellers
+        j: float or array_like, default=0.0
+            The advance ratios, broadcast with the propellers (0 for static thrust)
+
+        Returns
+        -------
+        tuple of (numpy.ndarray, numpy.ndarray)
+            The thrust (Ct) and power (Cp) coefficients
+        """
+        return self._interpolate(self._table_indices(propellers), rpm, j)
+
+    def estimate(self, propellers, motors, batteries, mass=None, num_propellers=4):
+        """Estimate the static thrust and hover performance of designs.
+
+        Parameters
+        ----------
+        propellers: Propeller or sequence of Propeller
+            The propeller of every design
+        motors: Motor or sequence of Motor
+            The motor of every design
+        batteries: Battery or sequence of Battery
+            The battery of every design
+        mass: float or array_like, default=None
+            The mass (kg) of every design, if None the mass of its battery, propellers and motors is used (a lower bound)
+        num_propellers: int, default=4
+            The number of propellers (and motors) of every design
+
+        Returns
+        -------
+        dict of numpy.ndarray
+            The max_rpm, thrust (total static thrust, N), thrust_to_weight, hover_rpm, hover_current
+            (A, from the battery), hover_power (W, from the battery) and hover_time (s) of every design.
+            The hover estimates are NaN for designs that can't hover.
+        """
+        table_indices = self._table_indices(propellers)
+        diameter = _attribute(propellers, "diameter") / 1000.0
+        kv = _attribute(motors, "kv")
+        kt = _attribute(motors, "kt")
+        idle_current = _attribute(motors, "io_idle_current_at_10V")
+        resistance = _attribute(motors, "internal_resistance") / 1000.0
+        voltage = _attribute(batteries, "voltage")
+        capacity = _attribute(batteries, "capacity") / 1000.0
+        max_current = np.fmin(
+            _attribute(motors, "max_current"),
+            capacity * _attribute(batteries, "cont_discharge_rate") / num_propellers,
+        )
+        if mass is None:
+            mass = _attribute(batteries, "weight") + num_propellers * (
+                _attribute(motors, "weight") + _attribute(propellers, "weight")
+            )
+        mass = np.asarray(mass, dtype=float)
+
+        def propeller_torque(rpm):
+            _, cp = self._interpolate_static(table_indices, rpm)
+            return cp * AIR_DENSITY * (rpm / 60) ** 2 * diameter**5 / (2 * np.pi)
+
+        def propeller_thrust(rpm):
+            ct, _ = self._interpolate_static(table_indices, rpm)
+            return ct * AIR_DENSITY * (rpm / 60) ** 2 * diameter**4
+
+        def motor_current(rpm):
+            back_emf_current = (voltage - rpm / kv) / resistance
+            return np.minimum(back_emf_current, max_current)
+
+        # The motor's torque decreases and the propeller's increases with the RPM
+        max_rpm = self._bisect(
+            lambda rpm: kt * (motor_current(rpm) - idle_current)
+            - propeller_torque(rpm),
+            kv * voltage,
+        )
+        thrust = num_propellers * propeller_thrust(max_rpm)
+        weight = mass * GRAVITY
+
+        hover_rpm = self._bisect(
+            lambda rpm: weight / num_propellers - propeller_thrust(rpm), max_rpm
+        )
+        can_hover = thrust >= weight
+        hover_rpm = np.where(can_hover, hover_rpm, np.nan)
+        hover_motor_current = propeller_torque(hover_rpm) / kt + idle_current
+        motor_power = (
+            hover_rpm / kv + hover_motor_current * resistance
+        ) * hover_motor_current
+        hover_power = num_propellers * motor_power
+        hover_current = hover_power / voltage
+
+        return {
+            "max_rpm": max_rpm,
+            "thrust": thrust,
+            "thrust_to_weight": thrust / weight,
+            "hover_rpm": hover_rpm,
+            "hover_current": hover_current,
+            "hover_power": hover_power,
+            "hover_time": capacity * 3600 / hover_current,
+        }
+
+    def estimate_quadcopter(self, quad_copter, mass=None):
+        """Estimate the static thrust and hover performance of a QuadCopter (see `estimate`)
+
+        The mass properties, propellers and motors are those of the first arm (propeller_0, motor_0).
+        """
+        estimates = self.estimate(
+            quad_copter.propeller_0,
+            quad_copter.motor_0,
+            quad_copter.battery_0,
+            mass=mass,
+            num_propellers=4,
+        )
+        return {key: float(value) for key, value in estimates.items()}
+
+    def _bisect(self, func, upper):
+        """Find the root of a (vectorized) decreasing function in [0, upper], upper if positive there"""
+        upper = np.asarray(upper, dtype=float)
+        low = np.zeros_like(upper)
+        high = upper.copy()
+        for _ in range(self.num_bisections):
+            mid = (low + high) / 2
+            positive = func(mid) > 0
+            low = np.where(positive, mid, low)
+            high = np.where(positive, high, mid)
+        return np.where(func(upper) > 0, upper, (low + high) / 2)
+
+    def _table_indices(self, propellers):
+        performance_files = _attribute(propellers, "performance_file", dtype=object)
+        missing = sorted(set(performance_files.flat) - set(self._tables))
+        if missing:
+            self._add_tables(missing)
+        indices = [self._tables[pf] for pf in performance_files.flat]
+        return np.array(indices, dtype=int).reshape(performance_files.shape)
+
+    def _add_tables(self, performance_files):
+        performances = [
+            np.sort(self.propeller_db[pf], order="rpm", kind="stable")
+            for pf in performance_files
+        ]
+        rpms = [np.unique(performance["rpm"]) for performance in performances]
+        num_rpms = max(len(rpm) for rpm in rpms)
+        num_j = max(
+            len(performance) // len(rpm) for performance, rpm in zip(performances, rpms)
+        )
+        if self._rpm is not None:
+            num_rpms = max(num_rpms, self._rpm.shape[1])
+            num_j = max(num_j, self._j.shape[2])
+
+        shape = (len(performance_files), num_rpms, num_j)
+        rpm_table = np.full(shape[:2], np.nan)
+        j_table, ct_table, cp_table = (np.full(shape, np.nan) for _ in range(3))
+        for i, (performance, rpm) in enumerate(zip(performances, rpms)):
+            rows = performance.reshape(len(rpm), -1)
+            rpm_table[i, : len(rpm)] = rpm
+            j_table[i, : len(rpm), : rows.shape[1]] = rows["j"]
+            ct_table[i, : len(rpm), : rows.shape[1]] = rows["ct"]
+            cp_table[i, : len(rpm), : rows.shape[1]] = rows["cp"]
+
+        tables = [rpm_table, j_table, ct_table, cp_table]
+        if self._rpm is not None:
+            old_tables = [self._rpm, self._j, self._ct, self._cp]
+            tables = [
+                _concatenate_padded(old, new) for old, new in zip(old_tables, tables)
+            ]
+
+        offset = len(self._tables)
+        for i, performance_file in enumerate(performance_files):
+            self._tables[performance_file] = offset + i
+        self._rpm, self._j, self._ct, self._cp = tables
+        self._num_rpms = np.sum(~np.isnan(self._rpm), axis=1)
+
+        # The static (J=0) coefficients of every RPM, to only interpolate in RPM for the static thrust
+        all_rows = np.indices(self._rpm.shape)
+        self._static_ct, self._static_cp = self._interpolate_j(
+            all_rows[0], all_rows[1], np.zeros(self._rpm.shape)
+        )
+
+    def _interpolate(self, table_indices, rpm, j):
+        table_indices, rpm, j = np.broadcast_arrays(
+            table_indices, np.asarray(rpm, dtype=float), np.asarray(j, dtype=float)
+        )
+        lower, upper, weight = self._rpm_rows(table_indices, rpm)
+        lower_ct, lower_cp = self._interpolate_j(table_indices, lower, j)
+        upper_ct, upper_cp = self._interpolate_j(table_indices, upper, j)
+        return (
+            lower_ct + weight * (upper_ct - lower_ct),
+            lower_cp + weight * (upper_cp - lower_cp),
+        )
+
+    def _interpolate_static(self, table_indices, rpm):
+        table_indices, rpm = np.broadcast_arrays(
+            table_indices, np.asarray(rpm, dtype=float)
+        )
+        lower, upper, weight = self._rpm_rows(table_indices, rpm)
+        values = []
+        for table in (self._static_ct, self._static_cp):
+            lower_value = table[table_indices, lower]
+            values.append(
+                lower_value + weight * (table[table_indices, upper] - lower_value)
+            )
+        return values
+
+    def _rpm_rows(self, table_indices, rpm):
+        """The rows of the RPMs around rpm (clipped to the tabulated RPMs) and the weight of the upper row"""
+        rpms = self._rpm[table_indices]
+        num_rpms = self._num_rpms[table_indices]
+        lowest_rpm = rpms[..., 0]
+        highest_rpm = np.take_along_axis(rpms, (num_rpms - 1)[..., None], -1)[..., 0]
+        rpm = np.clip(rpm, lowest_rpm, highest_rpm)
+
+        lower = np.clip(
+            np.sum(rpms <= rpm[..., None], axis=-1) - 1, 0, np.maximum(num_rpms - 2, 0)
+        )
+        upper = np.minimum(lower + 1, num_rpms - 1)
+        lower_rpm = np.take_along_axis(rpms, lower[..., None], -1)[..., 0]
+        upper_rpm = np.take_along_axis(rpms, upper[..., None], -1)[..., 0]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = np.where(
+                upper_rpm > lower_rpm, (rpm - lower_rpm) / (upper_rpm - lower_rpm), 0.0
+            )
+        return lower, upper, weight
+
+    def _interpolate_j(self, table_indices, rpm_rows, j):
+        js = self._j[table_indices, rpm_rows]
+        num_j = np.maximum(np.sum(~np.isnan(js), axis=-1), 2)
+        j = np.clip(
+            j, js[..., 0], np.take_along_axis(js, (num_j - 1)[..., None], -1)[..., 0]
+        )
+        lower = np.clip(np.sum(js <= j[..., None], axis=-1) - 1, 0, num_j - 2)
+        lower_j = np.take_along_axis(js, lower[..., None], -1)[..., 0]
+        upper_j = np.take_along_axis(js, (lower + 1)[..., None], -1)[..., 0]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = np.where(
+                upper_j > lower_j, (j - lower_j) / (upper_j - lower_j), 0.0
+            )
+
+        values = []
+        for table in (self._ct, self._cp):
+            rows = table[table_indices, rpm_rows]
+            lower_value = np.take_along_axis(rows, lower[..., None], -1)[..., 0]
+            upper_value = np.take_along_axis(rows, (lower + 1)[..., None], -1)[..., 0]
+            values.append(lower_value + weight * (upper_value - lower_value))
+        return values
+
+
+def _attribute(components, name, dtype=float):
+    """The values of an attribute of a component (or a sequence of components) as an array"""
+    if isinstance(components, (list, tuple, np.ndarray)):
+        values = [_value(component, name) for component in components]
+    else:
+        values = _value(components, name)
+    return np.array(values, dtype=dtype)
+
+
+def _value(component, name):
+    if name == "performance_file" and isinstance(component, str):
+        return component
+    value = getattr(component, name)
+    return np.nan if value is None else value
+
+
+def _concatenate_padded(old, new):
+    """Concatenate two tables (along the first axis), padding the smaller with NaN"""
+    shape = tuple(max(o, n) for o, n in zip(old.shape[1:], new.shape[1:]))
+    padded = []
+    for table in (old, new):
+        padding = [(0, 0)] + [(0, s - t) for s, t in zip(shape, table.shape[1:])]
+        padded.append(np.pad(table, padding, constant_values=np.nan))
+    return np.concatenate(padded)
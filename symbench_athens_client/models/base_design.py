@@ -1,6 +1,6 @@
 from typing import ClassVar, Dict, List, Tuple, Union
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, ValidationError, validator
 
 from symbench_athens_client.utils import dict_to_design_vars
 
@@ -85,6 +85,60 @@ class SeedDesign(BaseModel):
                     name = self.__fields__[field_key].alias
                 yield name, v
 
+    def assign_components(self, **components):
+        """Assign many components at once, e.g. a propeller to every arm.
+
+        Every component is validated against its field (instances of the field's type are
+        assigned as is) and the design is updated in a single step, recording the swaps in
+        the swap_list just like assigning the components one at a time.
+
+        Parameters
+        ----------
+        **components:
+            The components to assign, keyed by their field names or aliases
+
+        Raises
+        ------
+        ValueError
+            If a key is not a component of this design
+        pydantic.ValidationError
+            If a component is not valid for its field
+        """
+        aliases = {field.alias: name for name, field in self.__fields__.items()}
+        values, errors = {}, []
+        for key, value in components.items():
+            name = key if key in self.__fields__ else aliases.get(key)
+            if (
+                name is None
+                or name in self.__design_vars__
+                or name in {"name", "swap_list"}
+            ):
+                raise ValueError(
+                    f"{key} is not a component of {self.__class__.__name__}"
+                )
+            field = self.__fields__[name]
+            if not isinstance(value, field.type_):
+                value, error = field.validate(
+                    value, self.__dict__, loc=name, cls=self.__class__
+                )
+                if error:
+                    errors.append(error)
+            values[name] = value
+
+        if errors:
+            raise ValidationError(errors, self.__class__)
+
+        for name, value in values.items():
+            current = getattr(self, name)
+            if current != value:
+                alias = self.__fields__[name].alias
+                if not self.swap_list.get(alias):
+                    self.swap_list[alias] = [current.name]
+                self.swap_list[alias].append(value.name)
+
+        self.__dict__.update(values)
+        self.__fields_set__.update(values)
+
     def __setattr__(self, key, value):
         if key not in self.__design_vars__ and (key != "name" and key != "swap_list"):
             if getattr(self, key) != value:
@@ -1,11 +1,21 @@
 import csv
+import hashlib
 import json
+import os
+import pickle
+from collections.abc import Mapping
+from functools import lru_cache
+from pathlib import Path
 from typing import ClassVar, Dict, Optional, Tuple, Union
 
+import numpy as np
+import pydantic
 from pydantic import BaseModel, Field, root_validator, validator
 
 from symbench_athens_client.utils import (
+    get_cache_dir,
     get_data_file_path,
+    get_logger,
     inject_none_for_missing_fields_and_nans,
 )
 
@@ -1117,19 +1127,195 @@ class NACA_Port_Connector(Component):
     thickness: float = Field(default=12, description="THICKNESS", alias="THICKNESS")
 
 
+class ComponentArrays(Mapping):
+    """A columnar view of components, mapping field names to NumPy arrays.
+
+    Parameters
+    ----------
+    creator: type
+        The component class, whose fields are the columns
+    components: iterable of Component
+        The components, in the order of the rows
+
+    Attributes
+    ----------
+    components: list of Component
+        The component of every row
+    categories: dict
+        The categories of every string field, the code of a value is its position
+    """
+
+    def __init__(self, creator, components):
+        self.components = list(components)
+        self.categories = {}
+        self._columns = {}
+
+        for name, field in creator.__fields__.items():
+            values = [getattr(component, name) for component in self.components]
+            if field.outer_type_ in (float, int, bool):
+                self._columns[name] = np.array(
+                    [np.nan if value is None else value for value in values],
+                    dtype=float,
+                )
+            elif field.outer_type_ is str:
+                codes = {}
+                self._columns[name] = np.array(
+                    [
+                        -1 if value is None else codes.setdefault(value, len(codes))
+                        for value in values
+                    ],
+                    dtype=np.int32,
+                )
+                self.categories[name] = list(codes)
+
+    def code(self, field, value):
+        """The code of a category of a string field (-1 if no component has it)"""
+        try:
+            return self.categories[field].index(value)
+        except ValueError:
+            return -1
+
+    def select(self, mask):
+        """The components in the rows selected by a boolean mask (or an array of row indices)"""
+        mask = np.asarray(mask)
+        rows = np.flatnonzero(mask) if mask.dtype == bool else mask
+        return [self.components[row] for row in rows]
+
+    def __getitem__(self, field):
+        return self._columns[field]
+
+    def __iter__(self):
+        return iter(self._columns)
+
+    def __len__(self):
+        return len(self._columns)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}, Rows: {len(self.components)}, Columns: {len(self)}>"
+
+
 class ComponentsRepository:
-    """The components repository builder class"""
+    """The components repository builder class
+
+    The components are indexed by name and position. Secondary indexes on
+    the fields queried with `find` (e.g. performance_file, direction) are
+    built on their first query.
+
+    The components are validated on first access. For repositories built from
+    a corpus (with a snapshot name), the validated components are saved in a
+    snapshot (in the user's cache directory), which later processes load instead
+    of validating the corpus again.
+    A snapshot is invalidated when the corpus (or the component class) changes.
+
+    Parameters
+    ----------
+    creator: type
+        The component class
+    components: iterable of dict
+        The properties of every component (consumed on first access)
+    corpus: str
+        The corpus the components belong to
+    snapshot: str, default=None
+        The name of the snapshot for these components, if None the components are not snapshotted
+    """
 
-    def __init__(self, creator, components, corpus):
+    def __init__(self, creator, components, corpus, snapshot=None):
         self.creator = creator
         self.corpus = corpus
-        self.components = self._initialize_components(components)
+        self.snapshot = snapshot
+        self._source = components
+        self._components = None
+        self._positions = None
+        self._indexes = {}
+        self._arrays = None
+
+    @property
+    def components(self):
+        if self._components is None:
+            self._components = self._load_components()
+            self._source = None
+        return self._components
+
+    def find(self, **criteria):
+        """Find the components whose fields equal the criteria.
+
+        Parameters
+        ----------
+        **criteria:
+            The values of the fields to match (by field name), e.g. performance_file="PER3_8x6.dat", direction=-1
+
+        Returns
+        -------
+        list of Component
+            The matching components, in the repository's order
+
+        Raises
+        ------
+        AttributeError
+            If a criterion is not a field of the components
+        """
+        if not criteria:
+            return list(self)
+
+        candidates = None
+        for field, value in criteria.items():
+            matches = self.index(field).get(value, ())
+            if candidates is None or len(matches) < len(candidates):
+                candidates = matches
+            if not candidates:
+                return []
+
+        return [
+            component
+            for component in candidates
+            if all(getattr(component, key) == value for key, value in criteria.items())
+        ]
+
+    @property
+    def columns(self):
+        """The columnar (NumPy) view of these components, see `to_arrays`"""
+        return self.to_arrays()
+
+    def to_arrays(self):
+        """Return a columnar view of these components, with a NumPy array per field (cached).
+
+        Numeric fields are float arrays (NaN for missing values) and string fields are
+        integer codes (-1 for missing values) into their categories.
+
+        Returns
+        -------
+        ComponentArrays
+            The columns of these components
+
+        Examples
+        --------
+        >>> arrays = Batteries.to_arrays()
+        >>> light_batteries = arrays.select((arrays["capacity"] > 5000) & (arrays["weight"] < 0.5))
+        """
+        if self._arrays is None:
+            self._arrays = ComponentArrays(self.creator, self.components.values())
+        return self._arrays
+
+    def index(self, field):
+        """The index of these components on a field, a mapping from the field's values to the components"""
+        if field not in self._indexes:
+            if field not in self.creator.__fields__:
+                raise AttributeError(
+                    f"{self.creator.__name__} has no field {field} to index"
+                )
+            index = {}
+            for component in self.components.values():
+                index.setdefault(getattr(component, field), []).append(component)
+            self._indexes[field] = index
+        return self._indexes[field]
 
     @property
     def all(self):
         return list(self.components.keys())
 
     def __getattr__(self, item):
+        if item.startswith("_"):
+            raise AttributeError(item)
         if item in self.components:
             return self.components[item]
         else:
@@ -1139,15 +1325,12 @@ class ComponentsRepository:
 
     def __getitem__(self, item):
         if isinstance(item, int):
-            components = list(self.components.values())
-            return components[item]
+            if self._positions is None:
+                self._positions = list(self.components.values())
+            return self._positions[item]
         else:
-            component_names = {
-                component.name: component for component in self.components.values()
-            }
-
-            if item in component_names:
-                return component_names[item]
+            if item in self.components:
+                return self.components[item]
             else:
                 raise KeyError(
                     f"{self.creator.__name__} {item} is missing from the repository"
@@ -1179,6 +1362,31 @@ class ComponentsRepository:
             for component in self.components.values():
                 dict_writer.writerow(component.dict(by_alias=True))
 
+    def _load_components(self):
+        if self.snapshot is None:
+            return self._initialize_components(self._source)
+
+        snapshot_name, snapshot_key = _snapshot_name_and_key(
+            self.creator, self.corpus, self.snapshot
+        )
+        snapshot_dir = _snapshot_dir()
+        if snapshot_dir is None:
+            return self._initialize_components(self._source)
+
+        try:
+            with open(
+                snapshot_dir / f"{snapshot_name}.{snapshot_key}.pickle", "rb"
+            ) as snapshot_file:
+                return pickle.load(snapshot_file)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring the unreadable snapshot of {snapshot_name}: {e}")
+
+        components = self._initialize_components(self._source)
+        _save_snapshot(components, snapshot_dir, snapshot_name, snapshot_key)
+        return components
+
     def _initialize_components(self, components):
         component_instances = {}
 
@@ -1323,23 +1531,32 @@ class Cylinder_Flip(Component):
     diameter: float = Field(default=0, description="DIAMETER", alias="DIAMETER")
 
 
-all_uav_components = get_data_file_path("all_uav_components.json")
-with open(all_uav_components) as json_file:
-    all_uav_components = json.load(json_file)
+logger = get_logger(__name__)
+
+
+@lru_cache(maxsize=None)
+def _load_corpus(corpus):
+    with open(get_data_file_path(f"all_{corpus}_components.json")) as json_file:
+        return json.load(json_file)
 
-all_uam_components = get_data_file_path("all_uam_components.json")
-with open(all_uam_components) as json_file:
-    all_uam_components = json.load(json_file)
+
+@lru_cache(maxsize=None)
+def _corpus_digest(corpus):
+    with open(get_data_file_path(f"all_{corpus}_components.json"), "rb") as json_file:
+        return hashlib.sha256(json_file.read()).hexdigest()
+
+
+def __getattr__(name):
+    # The corpora are loaded on first access
+    if name in {"all_uav_components", "all_uam_components"}:
+        return get_corpus_components(name.split("_")[1])
+    raise AttributeError(f"module {__name__} has no attribute {name}")
 
 
 def get_corpus_components(corpus):
-    if corpus == "uav":
-        all_components = all_uav_components
-    elif corpus == "uam":
-        all_components = all_uam_components
-    else:
+    if corpus not in {"uav", "uam"}:
         raise ValueError("corpus can only be either `uav` or `uam`")
-    return all_components
+    return _load_corpus(corpus)
 
 
 def get_all_components_of_class(cls, corpus):
@@ -1352,7 +1569,10 @@ def get_all_components_of_class(cls, corpus):
 
 def build_components(cls, corpus):
     return ComponentsRepository(
-        creator=cls, components=get_all_components_of_class(cls, corpus), corpus=corpus
+        creator=cls,
+        components=get_all_components_of_class(cls, corpus),
+        corpus=corpus,
+        snapshot=cls.__name__,
     )
 
 
@@ -1368,15 +1588,78 @@ def build_components_of_class(cls, names, corpus):
             for comp_name in names
         ),
         corpus=corpus,
+        snapshot=_snapshot_of_names(cls, names),
     )
 
 
 def build_tubes(names, corpus):
-    for tube_name in names:
+    def tubes():
         corpus_components = get_corpus_components(corpus)
-        if "para_Length_[]AssignedValue" not in corpus_components[tube_name]:
-            corpus_components[tube_name][
-                "para_Length_[]AssignedValue"
-            ] = corpus_components[tube_name].pop("LENGTH", 200.0)
+        for tube_name in names:
+            tube = corpus_components[tube_name]
+            if "para_Length_[]AssignedValue" not in tube:
+                tube = {key: value for key, value in tube.items() if key != "LENGTH"}
+                tube["para_Length_[]AssignedValue"] = corpus_components[tube_name].get(
+                    "LENGTH", 200.0
+                )
+            yield {"Name": tube_name, **tube, "Classification": Tube.__name__}
+
+    return ComponentsRepository(
+        creator=Tube,
+        components=tubes(),
+        corpus=corpus,
+        snapshot=_snapshot_of_names(Tube, names),
+    )
+
+
+def _snapshot_of_names(cls, names):
+    names_digest = hashlib.sha256("\n".join(names).encode()).hexdigest()
+    return f"{cls.__name__}-{names_digest[:8]}"
+
+
+def _snapshot_dir():
+    """The directory to load (and save) snapshots in, the user's cache directory (never the package's data directory).
+
+    $SYMBENCH_ATHENS_COMPONENT_SNAPSHOTS overrides it with a directory, or disables snapshots (None) if set to 0 (or off/false).
+    """
+    snapshot_dir = os.environ.get("SYMBENCH_ATHENS_COMPONENT_SNAPSHOTS")
+    if snapshot_dir in {"0", "off", "false"}:
+        return None
+    if snapshot_dir:
+        return Path(snapshot_dir)
+    return get_cache_dir("component_snapshots")
+
+
+def _snapshot_name_and_key(creator, corpus, snapshot):
+    """The file name and the key (of the corpus and the component class) of a snapshot"""
+    fields = [
+        (name, field.alias, str(field.outer_type_), repr(field.default))
+        for name, field in creator.__fields__.items()
+    ]
+    digest = hashlib.sha256()
+    digest.update(_corpus_digest(corpus).encode())
+    digest.update(f"{creator.__module__}.{creator.__qualname__}".encode())
+    digest.update(repr(fields).encode())
+    digest.update(pydantic.VERSION.encode())
+    return f"{corpus}_{snapshot}", digest.hexdigest()[:16]
+
+
+def _save_snapshot(components, snapshot_dir, snapshot_name, snapshot_key):
+    """Save a snapshot (removing its stale versions), return False if the directory isn't writable"""
+    snapshot_file = snapshot_dir / f"{snapshot_name}.{snapshot_key}.pickle"
+    try:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        tmp_file = snapshot_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "wb") as snapshot:
+            pickle.dump(components, snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, snapshot_file)
+    except OSError:
+        return False
 
-    return build_components_of_class(Tube, names, corpus=corpus)
+    for stale_snapshot in snapshot_dir.glob(f"{snapshot_name}.*.pickle"):
+        if stale_snapshot != snapshot_file:
+            try:
+                os.unlink(stale_snapshot)
+            except OSError:
+                pass
+    return True
@@ -0,0 +1,198 @@
+from operator import itemgetter
+
+__all__ = ["FDInputTemplate"]
+
+
+class FDInputTemplate:
+    """A compiled layout of SWRi's flight dynamics input file (a Fortran namelist).
+
+    The layout of an input file (its sections, keys and the propellers it describes)
+    depends only on the design, not on the values of its parameters. It is compiled
+    once into a single format string along with the list of fields to fill it with,
+    so that rendering an input file is a single `str.format` call.
+
+    Parameters
+    ----------
+    fd_params: dict
+        The parameters of an input file (as returned by to_fd_input) to compile the layout of
+
+    Attributes
+    ----------
+    fields: list of tuple
+        The (section, index, key) of every value in the input file, in order. The index
+        is the propeller's position for propellers, the value's position for aircraft
+        entries with many values (lists) and None otherwise.
+    """
+
+    def __init__(self, fd_params):
+        self.layout = self.layout_of(fd_params)
+        lines, self.fields, controls_start = self._compile(self.layout)
+        self._format = "\n".join(lines)
+        # The controls are the last section, so that inputs differing only in their controls share the rest
+        self._body_format = "\n".join(lines[:controls_start])
+        self._controls_format = "\n".join(lines[controls_start:])
+        self._num_body_fields = len(self.fields) - len(self.layout[3])
+        self._positions = {field: j for j, field in enumerate(self.fields)}
+
+        aircraft_layout, propellers_layout, battery_layout, controls = self.layout
+        self._aircraft_getter = _tuple_getter(key for key, _ in aircraft_layout)
+        self._aircraft_lists = [
+            j for j, (_, num_values) in enumerate(aircraft_layout) if num_values
+        ]
+        self._aircraft_duplicates = [
+            (key, index)
+            for section, index, key in self.fields[len(aircraft_layout) :]
+            if section == "aircraft"
+        ]
+        self._propeller_getters = [_tuple_getter(keys) for _, keys in propellers_layout]
+        self._battery_getter = _tuple_getter(battery_layout)
+        self._controls_getter = _tuple_getter(controls)
+
+    @staticmethod
+    def layout_of(fd_params):
+        """The layout of the input file for these parameters (hashable)"""
+        return (
+            tuple(
+                (key, len(value) if isinstance(value, list) else None)
+                for key, value in fd_params["aircraft"].items()
+            ),
+            tuple(
+                (prop["for"], tuple(key for key in prop if key != "for"))
+                for prop in fd_params["propellers"]
+            ),
+            tuple(fd_params["battery"]),
+            tuple(fd_params["controls"]),
+        )
+
+    def values(self, fd_params):
+        """The values of these parameters, in the order of `fields`"""
+        aircraft = fd_params["aircraft"]
+        values = list(self._aircraft_getter(aircraft))
+        for position in self._aircraft_lists:
+            values[position] = values[position][0]
+        for key, j in self._aircraft_duplicates:
+            values.append(aircraft[key][j])
+        for getter, propeller in zip(self._propeller_getters, fd_params["propellers"]):
+            values.extend(getter(propeller))
+        values.extend(self._battery_getter(fd_params["battery"]))
+        values.extend(self._controls_getter(fd_params["controls"]))
+        return values
+
+    def render(self, fd_params):
+        """Render the input file for these parameters"""
+        return self._format.format(*self.values(fd_params))
+
+    def render_controls(self, fd_params, controls):
+        """Render many input files that differ from fd_params only in their controls (e.g. the flight paths of a design).
+
+        Parameters
+        ----------
+        fd_params: dict
+            The parameters shared by all the input files
+        controls: iterable of dict
+            The controls of every input file
+
+        Yields
+        ------
+        str
+            The contents of every input file
+        """
+        body = self._body_format.format(
+            *self.values(fd_params)[: self._num_body_fields]
+        )
+        for path_controls in controls:
+            yield body + "\n" + self._controls_format.format(
+                *self._controls_getter(path_controls)
+            )
+
+    def render_batch(self, fd_params, overrides, num_rows):
+        """Render many input files that differ from fd_params only in some fields.
+
+        Parameters
+        ----------
+        fd_params: dict
+            The parameters shared by all the input files
+        overrides: dict
+            The values of the fields which vary, as a mapping from (section, index, key) to a sequence of values
+        num_rows: int
+            The number of input files to render
+
+        Yields
+        ------
+        str
+            The contents of every input file
+        """
+        base_values = self.values(fd_params)
+        columns = [
+            (self._positions[field], values) for field, values in overrides.items()
+        ]
+        for row in range(num_rows):
+            values = base_values.copy()
+            for position, column in columns:
+                values[position] = column[row]
+            yield self._format.format(*values)
+
+    @staticmethod
+    def _compile(layout):
+        aircraft_layout, propellers_layout, battery_layout, controls_layout = layout
+        lines, fields = [], []
+
+        def add(line, field=None, convert=""):
+            line = line.replace("{", "{{").replace("}", "}}")
+            if field is not None:
+                line = line + "{" + convert + "}"
+                fields.append(field)
+            lines.append(line)
+
+        lines.append("&aircraft_data")
+        duplicate_entries = []
+        for key, num_values in aircraft_layout:
+            add(
+                f"   aircraft%{key}     = ",
+                ("aircraft", None if num_values is None else 0, key),
+            )
+            for j in range(1, num_values or 0):
+                duplicate_entries.append((f"   aircraft%{key}     = ", key, j))
+
+        for line, key, j in duplicate_entries:
+            add(line, ("aircraft", j, key))
+
+        lines.append("\n")
+
+        for index, (for_components, keys) in enumerate(propellers_layout):
+            add(
+                f"!   Propeller({for_components+1}) uses components named "
+                f"Prop_{for_components}, Motor_{for_components}, ESC_{for_components}"
+            )
+            for key in keys:
+                add(
+                    f"   propeller({for_components+1})%{key}   = ",
+                    ("propellers", index, key),
+                    "!s",
+                )
+            lines.append("\n")
+
+        lines.append("!\t Battery(1) is component named: Battery_0")
+        for key in battery_layout:
+            add(f"   battery(1)%{key}    = ", ("battery", None, key))
+
+        lines.append("\n")
+
+        controls_start = len(lines)
+        lines.append("!\t Controls")
+        for key in controls_layout:
+            add(f"   control%{key} = ", ("controls", None, key))
+        lines.append("/\n\n")
+
+        return lines, fields, controls_start
+
+
+def _tuple_getter(keys):
+    """An itemgetter which always returns a tuple (even for a single key)"""
+    keys = tuple(keys)
+    if len(keys) == 1:
+        key = keys[0]
+        return lambda mapping: (mapping[key],)
+    if not keys:
+        return lambda mapping: ()
+    return itemgetter(*keys)
@@ -1,3 +1,6 @@
+import io
+import os
+
 from pydantic import BaseModel, Field
 
 
@@ -81,6 +84,30 @@ class FDMInputMetric(BaseModel):
 
         return cls(**input_metrics)
 
+    @classmethod
+    def from_fd_params(cls, fd_params):
+        """Return an instance of input metrics from the parameters of an input file (as returned by to_fd_input)"""
+        aircraft, controls = fd_params["aircraft"], fd_params["controls"]
+        input_metrics = {
+            "Ixx": aircraft["Ixx"],
+            "iyy": aircraft["Iyy"],
+            "Izz": aircraft["Izz"],
+            "MassEstimate": aircraft["mass"],
+            "Flight_Path": controls["i_flight_path"],
+            "Requested_Lateral_Speed": controls["requested_lateral_speed"],
+            "Requested_Vertical_Speed": controls["requested_vertical_speed"],
+            "Q_Position": controls["Q_position"],
+            "Q_Velocity": controls["Q_velocity"],
+            "Q_Angular_Velocity": controls["Q_angular_velocity"],
+            "Q_Angles": controls["Q_angles"],
+            "R": controls["R"],
+        }
+        # Round trip through the input file's text, so that the values match what the FDM reads
+        input_metrics = {key: float(str(value)) for key, value in input_metrics.items()}
+        input_metrics["Interferences"] = 0
+
+        return cls(**input_metrics)
+
     class Config:
         allow_mutation = False
         allow_population_by_field_name = True
@@ -150,36 +177,8 @@ class FDMFlightMetric(BaseModel):
 
     @classmethod
     def from_fd_metrics(cls, metrics_file):
-        fields = {
-            "Battery_amps_to_max_amps_ratio_at_Max_Flight_Distance": "batt_amps_ratio_mfd",
-            "Battery_amps_to_max_amps_ratio_at_Max_Speed": "batt_amps_ratio_max_speed",
-            "Distance_at_Max_Speed_(m)": "distance_max_speed",
-            "Max_Flight_Distance_(m)": "max_flight_distance",
-            "Max_Hover_Time_(s)": "max_hover_time",
-            "Max_Lateral_Speed_(m/s)": "max_lateral_speed",
-            "Max_uc_at_Max_Flight_Distance": "max_uc_at_mfd",
-            "Motor_amps_to_max_amps_ratio_at_Max_Flight_Distance": "motor_amps_ratio_mfd",
-            "Motor_amps_to_max_amps_ratio_at_Max_Speed": "motor_amps_ratio_max_speed",
-            "Motor_power_to_max_power_ratio_at_Max_Flight_Distance": "mot_power_ratio_mfd",
-            "Power_at_Max_Flight_Distance_(W)": "power_at_mfd",
-            "Power_at_Max_Speed_(W)": "power_max_speed",
-            "Speed_at_Max_Flight_Distance_(m/s)": "speed_at_mfd",
-            "Motor_power_to_max_power_ratio_at_Max_Speed": "motor_power_ratio_max_speed",
-        }
-        flight_metrics_dict = {}
-        with open(metrics_file) as metrics_fp:
-            lines = metrics_fp.readlines()
-            for line in lines:
-                line_splited = line.strip().split()
-                if line.strip().startswith("No trim conditions were found"):
-                    flight_metrics_dict = {entry: 0.0 for entry in fields.values()}
-                    break
-                if line_splited and line_splited[0] in fields:
-                    flight_metrics_dict[
-                        fields[line_splited[0]]
-                    ] = cls.get_float_from_line(line)
-
-        return cls(**flight_metrics_dict)
+        flight_metrics, _, _ = parse_fd_metrics(metrics_file)
+        return flight_metrics
 
     @staticmethod
     def get_float_from_line(line):
@@ -226,33 +225,8 @@ class FDMFlightPathMetric(BaseModel):
     @classmethod
     def from_fd_metrics(cls, metrics_file):
         """Return an instance of path metrics from this metrics file"""
-        with open(metrics_file) as metrics_fp:
-            lines = metrics_fp.readlines()
-            for line in lines:
-                if line.strip().startswith("Path performance"):
-                    flight_path = int(line.strip().split()[-1])
-                if line.strip().startswith("Flight_distance"):
-                    flight_distance = cls.get_float_from_line(line)
-                if line.strip().startswith("Time_to_traverse_path"):
-                    time = cls.get_float_from_line(line)
-                if line.strip().startswith("Average_speed_to_traverse_path"):
-                    average_speed = cls.get_float_from_line(line)
-                if line.strip().startswith("Maximimum_error_distance_during_flight"):
-                    maximum_error_distance_during_flight = cls.get_float_from_line(line)
-                if line.strip().startswith("Spatial_average_distance_error"):
-                    average_error = cls.get_float_from_line(line)
-                if line.strip().startswith("Path_traverse_score_based_on_requirements"):
-                    path_score = cls.get_float_from_line(line)
-
-        return cls(
-            flight_path=flight_path,
-            flight_distance=flight_distance,
-            time_to_traverse_path=time,
-            maximum_error_distance_during_flight=maximum_error_distance_during_flight,
-            average_error=average_error,
-            path_score=path_score,
-            average_speed=average_speed,
-        )
+        _, path_metrics, _ = parse_fd_metrics(metrics_file)
+        return path_metrics
 
     @staticmethod
     def get_float_from_line(line):
@@ -261,3 +235,109 @@ class FDMFlightPathMetric(BaseModel):
     class Config:
         allow_mutation = False
         allow_population_by_field_name = True
+
+
+FLIGHT_METRICS_FIELDS = {
+    "Battery_amps_to_max_amps_ratio_at_Max_Flight_Distance": "batt_amps_ratio_mfd",
+    "Battery_amps_to_max_amps_ratio_at_Max_Speed": "batt_amps_ratio_max_speed",
+    "Distance_at_Max_Speed_(m)": "distance_max_speed",
+    "Max_Flight_Distance_(m)": "max_flight_distance",
+    "Max_Hover_Time_(s)": "max_hover_time",
+    "Max_Lateral_Speed_(m/s)": "max_lateral_speed",
+    "Max_uc_at_Max_Flight_Distance": "max_uc_at_mfd",
+    "Motor_amps_to_max_amps_ratio_at_Max_Flight_Distance": "motor_amps_ratio_mfd",
+    "Motor_amps_to_max_amps_ratio_at_Max_Speed": "motor_amps_ratio_max_speed",
+    "Motor_power_to_max_power_ratio_at_Max_Flight_Distance": "mot_power_ratio_mfd",
+    "Power_at_Max_Flight_Distance_(W)": "power_at_mfd",
+    "Power_at_Max_Speed_(W)": "power_max_speed",
+    "Speed_at_Max_Flight_Distance_(m/s)": "speed_at_mfd",
+    "Motor_power_to_max_power_ratio_at_Max_Speed": "motor_power_ratio_max_speed",
+}
+
+PATH_METRICS_FIELDS = {
+    "Flight_distance": "flight_distance",
+    "Time_to_traverse_path": "time_to_traverse_path",
+    "Average_speed_to_traverse_path": "average_speed",
+    "Maximimum_error_distance_during_flight": "maximum_error_distance_during_flight",
+    "Spatial_average_distance_error": "average_error",
+    "Path_traverse_score_based_on_requirements": "path_score",
+}
+
+_FLIGHT, _PATH, _EXTRA, _NO_TRIM, _FLIGHT_PATH = range(5)
+
+_METRICS_DISPATCH = {
+    **{key: (_FLIGHT, field) for key, field in FLIGHT_METRICS_FIELDS.items()},
+    **{key: (_PATH, field) for key, field in PATH_METRICS_FIELDS.items()},
+    "No": (_NO_TRIM, None),
+    "Path": (_FLIGHT_PATH, None),
+}
+
+
+def _iter_lines(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.StringIO(bytes(source).decode())
+    if isinstance(source, (str, os.PathLike)):
+        return open(source)
+    if isinstance(source, (io.RawIOBase, io.BufferedIOBase)):
+        return io.TextIOWrapper(source)
+    return source
+
+
+def parse_fd_metrics(source, extra_fields=None):
+    """Parse the flight and path metrics from a metrics.out (or FD report) in a single pass.
+
+    Parameters
+    ----------
+    source: str, pathlib.Path, bytes or file-like
+        The metrics file path, its contents as bytes or an (in-memory) text/binary buffer
+    extra_fields: dict or iterable of str, default=None
+        Other metrics to extract, as a mapping from the metric's name in the file to the
+        returned key (or just the names). The value is the last number on the metric's line.
+
+    Returns
+    -------
+    tuple of (FDMFlightMetric, FDMFlightPathMetric, dict)
+        The flight metrics, the path metrics and the extra metrics
+    """
+    dispatch = _METRICS_DISPATCH
+    if extra_fields:
+        if not isinstance(extra_fields, dict):
+            extra_fields = {key: key for key in extra_fields}
+        dispatch = {
+            **dispatch,
+            **{key: (_EXTRA, field) for key, field in extra_fields.items()},
+        }
+
+    flight_metrics, path_metrics, extra_metrics = {}, {}, {}
+    no_trim = False
+    lines = _iter_lines(source)
+    try:
+        for line in lines:
+            tokens = line.split()
+            if not tokens or tokens[0] not in dispatch:
+                continue
+            kind, field = dispatch[tokens[0]]
+            if kind == _FLIGHT:
+                if not no_trim:
+                    flight_metrics[field] = float(tokens[-1])
+            elif kind == _PATH:
+                path_metrics[field] = float(tokens[-1])
+            elif kind == _EXTRA:
+                extra_metrics[field] = float(tokens[-1])
+            elif kind == _NO_TRIM:
+                if line.strip().startswith("No trim conditions were found"):
+                    no_trim = True
+            elif line.strip().startswith("Path performance"):
+                path_metrics["flight_path"] = int(tokens[-1])
+    finally:
+        if lines is not source:
+            lines.close()
+
+    if no_trim:
+        flight_metrics = {field: 0.0 for field in FLIGHT_METRICS_FIELDS.values()}
+
+    return (
+        FDMFlightMetric(**flight_metrics),
+        FDMFlightPathMetric(**path_metrics),
+        extra_metrics,
+    )
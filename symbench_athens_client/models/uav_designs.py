@@ -1,5 +1,8 @@
-from typing import Tuple, Union
+import os
+from pathlib import Path
+from typing import Mapping, Tuple, Union
 
+import numpy as np
 from pydantic import Field, validator
 
 from symbench_athens_client.models.base_design import SeedDesign
@@ -16,6 +19,7 @@ from symbench_athens_client.models.component import (
     Tube,
     Wing,
 )
+from symbench_athens_client.models.fd_inputs import FDInputTemplate
 from symbench_athens_client.models.uav_components import (
     Batteries,
     CFPs,
@@ -30,9 +34,23 @@ from symbench_athens_client.models.uav_components import (
     Wings,
 )
 
+_fd_input_templates = {}
+
 
 class UAVSeedDesign(SeedDesign):
-    pass
+    @classmethod
+    def _fd_input_template(cls, fd_params):
+        """The (compiled once per design class) flight dynamics input file template for these parameters"""
+        layout = FDInputTemplate.layout_of(fd_params)
+        template = _fd_input_templates.get(cls)
+        if template is None or template.layout != layout:
+            template = _fd_input_templates[cls] = FDInputTemplate(fd_params)
+        return template
+
+    @classmethod
+    def _to_fd_inp(cls, input_dict):
+        """Write the flight dynamics input file (from the namelist template of this design class)"""
+        return cls._fd_input_template(input_dict).render(input_dict)
 
 
 class QuadCopter(UAVSeedDesign):
@@ -50,6 +68,22 @@ class QuadCopter(UAVSeedDesign):
         "r",
     }
 
+    # The components used in the flight dynamics inputs, with their repositories
+    __fd_components__ = {
+        "battery_0": Batteries,
+        **{f"motor_{j}": Motors for j in range(4)},
+        **{f"propeller_{j}": Propellers for j in range(4)},
+    }
+
+    # The design variables which are flight dynamics controls
+    __fd_controls__ = {
+        "q_position": "Q_position",
+        "q_velocity": "Q_velocity",
+        "q_angular_velocity": "Q_angular_velocity",
+        "q_angles": "Q_angles",
+        "r": "R",
+    }
+
     def __init__(
         self,
         arm_length=220.0,
@@ -221,9 +255,9 @@ class QuadCopter(UAVSeedDesign):
 
         Returns
         -------
-        dict or None
-            if filename is None, this method will return a dictionary containing all the parameters
-            otherwise the file will be saved as filename
+        dict
+            The dictionary containing all the parameters of the input file,
+            if filename is not None, the input file is also saved as filename
         """
         masses = self._get_mass_properties(testbench_path_or_formulae)
         propeller_1 = self.propeller_0.to_fd_inp(propellers_data_path)
@@ -299,8 +333,365 @@ class QuadCopter(UAVSeedDesign):
         if filename is not None:
             with open(filename, "w") as fd_inp:
                 fd_inp.write(self._to_fd_inp(fd_params))
+
+        return fd_params
+
+    def to_fd_inputs(
+        self,
+        testbench_path_or_formulae,
+        flight_paths=(1, 3, 4, 5),
+        propellers_data_path=None,
+        filenames=None,
+        analysis_type=3,
+        requested_vertical_speed=10.0,
+        requested_lateral_speed=1,
+    ):
+        """Get SWRi's flight dynamics model's input files for multiple flight paths of this design
+
+        The mass properties of the design are estimated only once and shared by all the flight paths.
+        As in the flight dynamics experiments, the requested vertical speed only applies to the
+        rise and hover path (4) and the requested lateral speed applies to all other paths.
+
+        Parameters
+        ----------
+        testbench_path_or_formulae: str, pathlib.Path, dict
+            The location of the testbench data to use by uav_analysis.testbench_data.TestBenchData or a dictionary of formulas
+        flight_paths: iterable of int, default=(1, 3, 4, 5)
+            The flight paths to generate inputs for
+        propellers_data_path: str, pathlib.Path
+            The base directory for propellers data
+        filenames: dict, default=None
+            The input file path (should have an .inp extension) for every flight path, if None, no files are written
+        analysis_type: int, default=3
+            The analysis type for the input files (3=flight path analysis, 2=Trim Steady, 1=Initial Conditions)
+        requested_vertical_speed: float, default=10.0
+            The requested vertical speed for the FD software
+        requested_lateral_speed: int, default=1
+            The requested lateral speed for the FD software
+
+        Returns
+        -------
+        dict
+            The dictionary of parameters (as returned by to_fd_input) for every flight path
+        """
+        flight_paths = list(flight_paths)
+        base_params = self.to_fd_input(
+            testbench_path_or_formulae,
+            propellers_data_path=propellers_data_path,
+            analysis_type=analysis_type,
+            flight_path=flight_paths[0],
+        )
+
+        fd_params_by_path = {
+            flight_path: {
+                **base_params,
+                "controls": {
+                    **base_params["controls"],
+                    **self._path_controls(
+                        flight_path, requested_vertical_speed, requested_lateral_speed
+                    ),
+                },
+            }
+            for flight_path in flight_paths
+        }
+
+        if filenames is not None:
+            # The flight paths differ only in their controls, so the rest is rendered once
+            fd_inputs = self._fd_input_template(base_params).render_controls(
+                base_params,
+                (fd_params_by_path[path]["controls"] for path in flight_paths),
+            )
+            for flight_path, fd_input in zip(flight_paths, fd_inputs):
+                with open(filenames[flight_path], "w") as fd_inp:
+                    fd_inp.write(fd_input)
+
+        return fd_params_by_path
+
+    def to_fd_inputs_batch(
+        self,
+        testbench_path_or_formulae,
+        design_matrix,
+        columns=None,
+        flight_paths=(1, 3, 4, 5),
+        propellers_data_path=None,
+        paths=None,
+        analysis_type=3,
+        requested_vertical_speed=10.0,
+        requested_lateral_speed=1,
+    ):
+        """Get SWRi's flight dynamics model's input files for many variants of this design at once
+
+        Every row of the design matrix is a variant of this design, with the design variables
+        (and components) in its columns. The mass properties of all the variants are evaluated
+        in one vectorized call and the input files are rendered from a single compiled template.
+        The speeds for the flight paths are requested as in `to_fd_inputs`.
+
+        The mass formulae are always compiled (see `MassFormulae`), so the input files are
+        identical to those of `to_fd_inputs` when both are given the testbench data location or
+        the same MassFormulae. Given a plain dictionary of formulae, `to_fd_inputs` evaluates
+        them with sympy, whose Floats are written with fewer significant digits.
+
+        Parameters
+        ----------
+        testbench_path_or_formulae: str, pathlib.Path, dict
+            The location of the testbench data to use by uav_analysis.testbench_data.TestBenchData or a dictionary of formulas
+        design_matrix: numpy.ndarray, pandas.DataFrame or dict
+            The design matrix, a 2D array (with a row per design and a column per entry in `columns`),
+            a DataFrame or a dictionary of columns. The columns are the design variables (e.g. Length_0 or arm_length)
+            and the Battery_0, Motor_<i> and Prop_<i> components (instances or names), any other entry is taken from this design
+        columns: list of str, default=None
+            The names of the columns of the design matrix (required if it is an array)
+        flight_paths: iterable of int, default=(1, 3, 4, 5)
+            The flight paths to generate inputs for
+        propellers_data_path: str, pathlib.Path
+            The base directory for propellers data
+        paths: str or callable, default=None
+            Where to write the input files, a format string (e.g. "Design{row}/FlightDyn_Path{flight_path}.inp")
+            or a function of (row, flight_path). If None, the input files are not written but yielded
+        analysis_type: int, default=3
+            The analysis type for the input files (3=flight path analysis, 2=Trim Steady, 1=Initial Conditions)
+        requested_vertical_speed: float, default=10.0
+            The requested vertical speed for the FD software
+        requested_lateral_speed: int, default=1
+            The requested lateral speed for the FD software
+
+        Returns
+        -------
+        generator or list of pathlib.Path
+            if paths is None, a generator of (row, flight_path, input file contents) tuples,
+            otherwise the list of input files written
+        """
+        design_columns, num_rows = self._design_matrix_columns(design_matrix, columns)
+        fd_inputs = self._iter_fd_inputs_batch(
+            testbench_path_or_formulae,
+            design_columns,
+            num_rows,
+            list(flight_paths),
+            propellers_data_path,
+            analysis_type,
+            requested_vertical_speed,
+            requested_lateral_speed,
+        )
+        if paths is None:
+            return fd_inputs
+
+        filenames = []
+        for row, flight_path, fd_input in fd_inputs:
+            filename = Path(
+                paths(row, flight_path)
+                if callable(paths)
+                else str(paths).format(row=row, flight_path=flight_path)
+            )
+            os.makedirs(filename.parent, exist_ok=True)
+            with open(filename, "w") as fd_inp:
+                fd_inp.write(fd_input)
+            filenames.append(filename)
+        return filenames
+
+    def _iter_fd_inputs_batch(
+        self,
+        testbench_path_or_formulae,
+        design_columns,
+        num_rows,
+        flight_paths,
+        propellers_data_path,
+        analysis_type,
+        requested_vertical_speed,
+        requested_lateral_speed,
+    ):
+        from symbench_athens_client.utils import (
+            MassFormulae,
+            estimate_mass_formulae,
+            get_mass_parameters_for_quadcopter,
+        )
+
+        if num_rows == 0:
+            return
+
+        if isinstance(testbench_path_or_formulae, (str, Path)):
+            formulae = estimate_mass_formulae(testbench_path_or_formulae)
         else:
-            return fd_params
+            formulae = (
+                testbench_path_or_formulae
+                if isinstance(testbench_path_or_formulae, MassFormulae)
+                else MassFormulae(testbench_path_or_formulae)
+            )
+
+        # The mass properties, for every row
+        mass_parameters = get_mass_parameters_for_quadcopter(self)
+        if "battery_0" in design_columns or "propeller_0" in design_columns:
+            parameters_by_components = {}
+            rows_parameters = []
+            for battery, propeller in zip(
+                design_columns.get("battery_0", [self.battery_0] * num_rows),
+                design_columns.get("propeller_0", [self.propeller_0] * num_rows),
+            ):
+                if (battery.name, propeller.name) not in parameters_by_components:
+                    parameters_by_components[
+                        (battery.name, propeller.name)
+                    ] = get_mass_parameters_for_quadcopter(
+                        self.copy(
+                            update={"battery_0": battery, "propeller_0": propeller}
+                        )
+                    )
+                rows_parameters.append(
+                    parameters_by_components[(battery.name, propeller.name)]
+                )
+            mass_parameters = {
+                name: [parameters[name] for parameters in rows_parameters]
+                for name in mass_parameters
+            }
+        for field in self.__design_vars__.intersection(design_columns):
+            mass_parameters[self.__fields__[field].alias] = design_columns[field]
+
+        estimates = formulae.evaluate_batch(
+            {name: mass_parameters[name] for name in formulae.symbols}
+        )
+        masses = self._split_mass_properties(
+            {
+                key.replace("aircraft.", ""): np.broadcast_to(
+                    value, (num_rows,)
+                ).tolist()
+                for key, value in estimates.items()
+            }
+        )
+
+        # The fields of the input files which differ between the rows
+        overrides = {
+            ("aircraft", None, key): values
+            for key, values in masses["aircraft"].items()
+        }
+        for j in range(4):
+            for key, values in masses[f"propeller_{j}"].items():
+                overrides[("propellers", j, key)] = values
+            for field, section, index in (
+                (f"propeller_{j}", "propellers", j),
+                (f"motor_{j}", "propellers", j),
+                ("battery_0", "battery", None),
+            ):
+                if field in design_columns:
+                    overrides.update(
+                        self._component_overrides(
+                            design_columns[field],
+                            section,
+                            index,
+                            propellers_data_path,
+                        )
+                    )
+        for field, key in self.__fd_controls__.items():
+            if field in design_columns:
+                overrides[("controls", None, key)] = design_columns[field].tolist()
+
+        base_params = self.to_fd_input(
+            formulae,
+            propellers_data_path=propellers_data_path,
+            analysis_type=analysis_type,
+            flight_path=flight_paths[0],
+        )
+        template = self._fd_input_template(base_params)
+        renderers = [
+            template.render_batch(
+                {
+                    **base_params,
+                    "controls": {
+                        **base_params["controls"],
+                        **self._path_controls(
+                            flight_path,
+                            requested_vertical_speed,
+                            requested_lateral_speed,
+                        ),
+                    },
+                },
+                overrides,
+                num_rows,
+            )
+            for flight_path in flight_paths
+        ]
+        for row, fd_inputs in enumerate(zip(*renderers)):
+            for flight_path, fd_input in zip(flight_paths, fd_inputs):
+                yield row, flight_path, fd_input
+
+    def _design_matrix_columns(self, design_matrix, columns):
+        """The columns of the design matrix by field name, along with its number of rows"""
+        if hasattr(design_matrix, "columns"):  # A pandas DataFrame
+            design_matrix = {
+                column: design_matrix[column].to_numpy()
+                for column in design_matrix.columns
+            }
+        elif not isinstance(design_matrix, Mapping):
+            design_matrix = np.asarray(design_matrix)
+            if design_matrix.ndim != 2 or columns is None:
+                raise ValueError(
+                    "The design matrix should be a 2D array along with the names of its columns"
+                )
+            if design_matrix.shape[1] != len(columns):
+                raise ValueError(
+                    f"Expected {len(columns)} columns in the design matrix, got {design_matrix.shape[1]}"
+                )
+            design_matrix = {
+                column: design_matrix[:, j] for j, column in enumerate(columns)
+            }
+
+        fields_by_alias = {field.alias: name for name, field in self.__fields__.items()}
+        design_columns = {}
+        for column, values in design_matrix.items():
+            field = fields_by_alias.get(column, column)
+            if field in self.__design_vars__:
+                design_columns[field] = np.asarray(values, dtype=float)
+            elif field in self.__fd_components__:
+                repository = self.__fd_components__[field]
+                design_columns[field] = [
+                    repository[value] if isinstance(value, str) else value
+                    for value in values
+                ]
+            else:
+                raise ValueError(
+                    f"{column} is not a design variable or a component used in the flight dynamics inputs"
+                )
+
+        num_rows = {len(values) for values in design_columns.values()}
+        if len(num_rows) > 1:
+            raise ValueError(
+                "All the columns of the design matrix should be equally long"
+            )
+
+        return design_columns, num_rows.pop() if num_rows else 0
+
+    @staticmethod
+    def _component_overrides(components, section, index, propellers_data_path):
+        """The values of the fields of the components (in a column of the design matrix) for every row"""
+        fd_inputs = {}
+        rows_fd_inputs = []
+        for component in components:
+            if component.name not in fd_inputs:
+                fd_input = (
+                    component.to_fd_inp(propellers_data_path)
+                    if isinstance(component, Propeller)
+                    else component.to_fd_inp()
+                )
+                # Placeholders (filled in by to_fd_input) are not a property of the component
+                fd_inputs[component.name] = {
+                    key: value for key, value in fd_input.items() if value is not None
+                }
+            rows_fd_inputs.append(fd_inputs[component.name])
+
+        return {
+            (section, index, key): [fd_input[key] for fd_input in rows_fd_inputs]
+            for key in rows_fd_inputs[0]
+        }
+
+    @staticmethod
+    def _path_controls(flight_path, requested_vertical_speed, requested_lateral_speed):
+        """The controls for a flight path, only the rise and hover path (4) requests a vertical speed"""
+        return {
+            "i_flight_path": flight_path,
+            "requested_lateral_speed": 0
+            if flight_path == 4
+            else int(requested_lateral_speed),
+            "requested_vertical_speed": 0
+            if flight_path != 4
+            else requested_vertical_speed,
+        }
 
     def _get_mass_properties(self, testbench_path_or_formulae):
         """Get estimated mass properties for the quadcopter(works only for single parameters for now)"""
@@ -316,6 +707,11 @@ class QuadCopter(UAVSeedDesign):
         property_estimates = get_mass_estimates_for_quadcopter(
             testbench_path_or_formulae, self
         )
+        return self._split_mass_properties(property_estimates)
+
+    @staticmethod
+    def _split_mass_properties(property_estimates):
+        """Split the mass property estimates into the properties of the aircraft and every propeller"""
         property_estimates["x_fuse"] = property_estimates["x_cm"]
         property_estimates["y_fuse"] = property_estimates["y_cm"]
         property_estimates["z_fuse"] = property_estimates["z_cm"]
@@ -353,47 +749,6 @@ class QuadCopter(UAVSeedDesign):
             inp_dict["icontrol"] = i + 1
             inp_dict["ibattery"] = 1
 
-    @staticmethod
-    def _to_fd_inp(input_dict):
-        """Write the flight dynamics input file (Clean refactorable implementation)"""
-        inp_lines = ["&aircraft_data"]
-        duplicate_entries = []
-        for key, value in input_dict["aircraft"].items():
-            if isinstance(value, list):
-                for j in range(1, len(value)):
-                    duplicate_entries.append(f"   aircraft%{key}     = {value[j]}")
-                inp_lines.append(f"   aircraft%{key}     = {value[0]}")
-            else:
-                inp_lines.append(f"   aircraft%{key}     = {value}")
-
-        for entry in duplicate_entries:
-            inp_lines.append(entry)
-
-        inp_lines.append("\n")
-
-        for propeller_dict in input_dict["propellers"]:
-            for_components = propeller_dict.pop("for")
-            comment_line = f"!   Propeller({for_components+1}) uses components named Prop_{for_components}, Motor_{for_components}, ESC_{for_components}"
-            inp_lines.append(comment_line)
-            for key, value in propeller_dict.items():
-                inp_lines.append(
-                    f"   propeller({for_components+1})%{key}   = {str(value)}"
-                )
-
-            inp_lines.append("\n")
-
-        inp_lines.append("!\t Battery(1) is component named: Battery_0")
-        for key, value in input_dict["battery"].items():
-            inp_lines.append(f"   battery(1)%{key}    = {value}")
-
-        inp_lines.append("\n")
-
-        inp_lines.append("!\t Controls")
-        for key, value in input_dict["controls"].items():
-            inp_lines.append(f"   control%{key} = {value}")
-        inp_lines.append("/\n\n")
-        return "\n".join(inp_lines)
-
     def validate_propellers_directions(self):
         assert (
             self.propeller_0.direction + self.propeller_1.direction == 0
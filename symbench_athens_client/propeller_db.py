@@ -0,0 +1,256 @@
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+
+from symbench_athens_client.utils import get_cache_dir, get_logger
+
+__all__ = [
+    "PROPELLER_PERFORMANCE_DTYPE",
+    "PropellerDatabase",
+    "compile_propeller_database",
+    "parse_propeller_performance",
+]
+
+# The performance of a propeller at an RPM and an advance ratio, in SI units
+PROPELLER_PERFORMANCE_DTYPE = np.dtype(
+    [
+        ("rpm", "f8"),
+        ("speed", "f8"),  # m/s
+        ("j", "f8"),
+        ("efficiency", "f8"),
+        ("ct", "f8"),
+        ("cp", "f8"),
+        ("power", "f8"),  # W
+        ("torque", "f8"),  # N-m
+        ("thrust", "f8"),  # N
+    ]
+)
+
+# The unit conversions of the (imperial) columns of the PER3 files, in the order of the dtype
+_PER3_TO_SI = np.array(
+    [0.44704, 1.0, 1.0, 1.0, 1.0, 745.69987158227, 0.1129848290276167, 4.4482216152605]
+)
+
+_PER3_NUMBER = re.compile(r"-?NaN|-?\d+\.?\d*(?:[eE][-+]?\d+)?")
+
+DB_VERSION = 1
+
+logger = get_logger(__name__)
+
+
+def parse_propeller_performance(filename):
+    """Parse a propeller's performance file (PER3_*.dat) into a structured array.
+
+    The files have a table (versus the advance ratio) per RPM, with imperial units
+    in the first eight columns. Newer files have six more columns (SI units, mach
+    and Reynolds number), which are ignored. Values missing in the file are NaN.
+
+    Parameters
+    ----------
+    filename: str, pathlib.Path
+        The performance file to parse
+
+    Returns
+    -------
+    numpy.ndarray
+        The performance of the propeller, with the PROPELLER_PERFORMANCE_DTYPE
+    """
+    rows = []
+    rpm = None
+    with open(filename) as performance_file:
+        for line in performance_file:
+            stripped = line.lstrip()
+            if not stripped or not (stripped[0].isdigit() or stripped[0] == "-"):
+                if stripped.startswith("PROP RPM"):
+                    rpm = float(stripped.split("=")[1])
+                continue
+            if rpm is None:
+                continue
+            values = _PER3_NUMBER.findall(stripped)
+            if len(values) < 8:
+                continue
+            rows.append([rpm] + values[:8])
+
+    columns = np.array(rows, dtype=float).reshape(-1, 9)
+    columns[:, 1:] *= _PER3_TO_SI
+    performance = np.empty(len(columns), dtype=PROPELLER_PERFORMANCE_DTYPE)
+    for j, name in enumerate(PROPELLER_PERFORMANCE_DTYPE.names):
+        performance[name] = columns[:, j]
+    return performance
+
+
+def compile_propeller_database(propellers_dir, db_dir=None):
+    """Compile the performance files of the propellers in a directory into a propeller database.
+
+    The database is a single (memory-mappable) .npy file with the performance of
+    every propeller, along with a JSON index of the rows of every propeller.
+
+    Parameters
+    ----------
+    propellers_dir: str, pathlib.Path
+        The directory with the performance files (PER3_*.dat)
+    db_dir: str, pathlib.Path, default=None
+        The directory to save the database in, if None the user's cache directory is used
+
+    Returns
+    -------
+    PropellerDatabase
+        The compiled database
+    """
+    propellers_dir = Path(propellers_dir).resolve()
+    db_dir = Path(db_dir or _default_db_dir(propellers_dir))
+    os.makedirs(db_dir, exist_ok=True)
+
+    performances, files, start = [], {}, 0
+    for performance_file, stat in _performance_files(propellers_dir):
+        performance = parse_propeller_performance(propellers_dir / performance_file)
+        performances.append(performance)
+        files[performance_file] = {
+            "start": start,
+            "stop": start + len(performance),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        start += len(performance)
+
+    data = (
+        np.concatenate(performances)
+        if performances
+        else np.empty(0, dtype=PROPELLER_PERFORMANCE_DTYPE)
+    )
+    index = {
+        "version": DB_VERSION,
+        "source": str(propellers_dir),
+        "files": files,
+    }
+
+    tmp_suffix = f".{os.getpid()}.tmp"
+    with open(db_dir / f"{PropellerDatabase.DATA_FILE}{tmp_suffix}", "wb") as data_file:
+        np.save(data_file, data)
+    with open(
+        db_dir / f"{PropellerDatabase.INDEX_FILE}{tmp_suffix}", "w"
+    ) as index_file:
+        json.dump(index, index_file)
+    # The index is replaced last, so that an index always refers to a complete data file
+    os.replace(
+        db_dir / f"{PropellerDatabase.DATA_FILE}{tmp_suffix}",
+        db_dir / PropellerDatabase.DATA_FILE,
+    )
+    os.replace(
+        db_dir / f"{PropellerDatabase.INDEX_FILE}{tmp_suffix}",
+        db_dir / PropellerDatabase.INDEX_FILE,
+    )
+    logger.info(
+        f"Compiled the performance of {len(files)} propellers ({len(data)} rows) into {db_dir}"
+    )
+
+    return PropellerDatabase(db_dir)
+
+
+class PropellerDatabase:
+    """The compiled performance of propellers, keyed by their performance files.
+
+    The performance data is memory mapped, so the performance of a propeller is a
+    (read only) view into the database, without parsing or copying.
+
+    Parameters
+    ----------
+    db_dir: str, pathlib.Path
+        The directory of the database (see compile_propeller_database)
+
+    Examples
+    --------
+    >>> db = PropellerDatabase.for_directory("data/propellers")
+    >>> performance = db[Propellers[0]]
+    >>> performance[performance["rpm"] == 5000]["thrust"]
+    """
+
+    DATA_FILE = "propellers.npy"
+    INDEX_FILE = "propellers.json"
+
+    def __init__(self, db_dir):
+        self.db_dir = Path(db_dir)
+        with open(self.db_dir / self.INDEX_FILE) as index_file:
+            index = json.load(index_file)
+        if index.get("version") != DB_VERSION:
+            raise ValueError(
+                f"The propeller database in {self.db_dir} has an unsupported version, please recompile it"
+            )
+        self.source = index["source"]
+        self._files = index["files"]
+        self._data = np.load(self.db_dir / self.DATA_FILE, mmap_mode="r")
+
+    @classmethod
+    def for_directory(cls, propellers_dir, db_dir=None):
+        """Load the database of the propellers in a directory, compiling it if it is missing or stale"""
+        propellers_dir = Path(propellers_dir).resolve()
+        db_dir = Path(db_dir or _default_db_dir(propellers_dir))
+        try:
+            db = cls(db_dir)
+        except (FileNotFoundError, ValueError):
+            return compile_propeller_database(propellers_dir, db_dir)
+
+        if db.is_stale(propellers_dir):
+            return compile_propeller_database(propellers_dir, db_dir)
+        return db
+
+    def is_stale(self, propellers_dir):
+        """Check whether the performance files in a directory differ from the compiled ones"""
+        current = {
+            performance_file: (stat.st_size, stat.st_mtime_ns)
+            for performance_file, stat in _performance_files(Path(propellers_dir))
+        }
+        compiled = {
+            performance_file: (entry["size"], entry["mtime_ns"])
+            for performance_file, entry in self._files.items()
+        }
+        return current != compiled
+
+    def get(self, propeller, default=None):
+        try:
+            return self[propeller]
+        except KeyError:
+            return default
+
+    def rpms(self, propeller):
+        """The RPMs with performance data for this propeller"""
+        return np.unique(self[propeller]["rpm"])
+
+    def __getitem__(self, propeller):
+        performance_file = getattr(propeller, "performance_file", propeller)
+        if performance_file not in self._files:
+            raise KeyError(
+                f"The performance of {performance_file} is missing from the database"
+            )
+        entry = self._files[performance_file]
+        return self._data[entry["start"] : entry["stop"]]
+
+    def __contains__(self, propeller):
+        return getattr(propeller, "performance_file", propeller) in self._files
+
+    def __iter__(self):
+        return iter(self._files)
+
+    def __len__(self):
+        return len(self._files)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}, Propellers: {len(self)}, Location: {self.db_dir}>"
+
+
+def _performance_files(propellers_dir):
+    with os.scandir(propellers_dir) as entries:
+        return sorted(
+            (entry.name, entry.stat())
+            for entry in entries
+            if entry.name.endswith(".dat") and entry.is_file()
+        )
+
+
+def _default_db_dir(propellers_dir):
+    source_digest = hashlib.sha256(str(propellers_dir).encode()).hexdigest()
+    return get_cache_dir("propeller_db", source_digest[:16])
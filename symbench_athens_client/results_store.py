@@ -0,0 +1,356 @@
+import os
+import sqlite3
+import threading
+from csv import DictWriter
+from math import nan
+
+import numpy as np
+
+__all__ = ["RESULTS_FILE", "ResultsStore"]
+
+RESULTS_FILE = "results.sqlite"
+
+# The declared types of the columns, by the type of their first (non missing) value
+_SQL_TYPES = {bool: "BOOLEAN", int: "INTEGER", float: "REAL", str: "TEXT"}
+
+
+class ResultsStore:
+    """The results (metrics) of flight dynamics runs, in an SQLite table with a column per metric.
+
+    Rows are buffered and written in batches, a single transaction per batch. The
+    table's schema evolves with the rows, a metric missing from the table is added
+    as a new column (left empty, NULL, for the rows written before it). The results
+    can be read back as rows or columns, projected to some of the metrics and
+    filtered with an SQL expression, without parsing the whole table.
+
+    The type of a column (e.g. BOOLEAN, for the values to be read back as bools) is
+    the type of its first value. A column whose first values are missing (None) is
+    typed by its first value that isn't, this type is kept in the TYPES_TABLE.
+
+    Parameters
+    ----------
+    path: str, pathlib.Path
+        The location of the store's database (created if it doesn't exist)
+    batch_size: int, default=64
+        The number of rows to buffer before writing them
+
+    Examples
+    --------
+    >>> with ResultsStore("results/results.sqlite") as results:
+    ...     results.extend(experiment.run_many(parameter_sets))
+    ...     scores = results.to_arrays(
+    ...         ["arm_length", "TotalPathScore"], where='"AnalysisError" = ?', parameters=(False,)
+    ...     )
+    """
+
+    TABLE = "results"
+    TYPES_TABLE = "results_types"
+
+    def __init__(self, path, batch_size=64):
+        self.path = path
+        self.batch_size = batch_size
+        self._buffer = []
+        self._csv_exports = {}
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(
+            str(path), check_same_thread=False, isolation_level=None
+        )
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.TABLE} "
+                "(_id INTEGER PRIMARY KEY AUTOINCREMENT)"
+            )
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.TYPES_TABLE} "
+                "(name TEXT PRIMARY KEY, type TEXT NOT NULL)"
+            )
+            self._types = self._table_types()
+
+    @property
+    def columns(self):
+        """The columns (metrics) in the store, in the order they were added"""
+        with self._lock:
+            return [column for column in self._types if column != "_id"]
+
+    @property
+    def num_buffered(self):
+        """The number of rows waiting to be written"""
+        return len(self._buffer)
+
+    def append(self, row):
+        """Add a row (a run's metrics), writing the buffered rows if the buffer is full"""
+        with self._lock:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.batch_size:
+                self.flush()
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def flush(self):
+        """Write the buffered rows, returning the number of rows written"""
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+            if not rows:
+                return 0
+
+            new_columns, typed_columns = {}, {}
+            for row in rows:
+                for column, value in row.items():
+                    if column not in self._types and column not in new_columns:
+                        new_columns[column] = None
+                    if (
+                        self._types.get(column) is None
+                        and typed_columns.get(column) is None
+                    ):
+                        typed_columns[column] = _sql_type(value)
+
+            inserts = {}
+            for row in rows:
+                inserts.setdefault(tuple(row), []).append(
+                    tuple(_to_sql(value) for value in row.values())
+                )
+
+            self._connection.execute("BEGIN")
+            try:
+                for column in new_columns:
+                    self._connection.execute(
+                        f"ALTER TABLE {self.TABLE} ADD COLUMN {_quote(column)} "
+                        f"{typed_columns[column] or ''}"
+                    )
+                for column, sql_type in typed_columns.items():
+                    # A column can't be altered, the types of existing untyped columns are kept apart
+                    if sql_type is not None and column not in new_columns:
+                        self._connection.execute(
+                            f"INSERT OR REPLACE INTO {self.TYPES_TABLE} (name, type) "
+                            "VALUES (?, ?)",
+                            (column, sql_type),
+                        )
+                for columns, values in inserts.items():
+                    self._connection.executemany(
+                        f"INSERT INTO {self.TABLE} ({', '.join(map(_quote, columns))}) "
+                        f"VALUES ({', '.join('?' * len(columns))})",
+                        values,
+                    )
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                self._types = self._table_types()
+                raise
+            self._types.update(new_columns)
+            self._types.update(
+                (column, sql_type)
+                for column, sql_type in typed_columns.items()
+                if sql_type is not None
+            )
+            return len(rows)
+
+    def select(self, columns=None, where=None, parameters=(), limit=None):
+        """Read the rows in the store (flushing the buffered ones first).
+
+        Parameters
+        ----------
+        columns: list of str, default=None
+            The columns to read, if None all of them
+        where: str, default=None
+            An SQL expression to filter the rows with, e.g. '"TotalPathScore" > ?'
+        parameters: tuple, default=()
+            The parameters of the placeholders in `where`
+        limit: int, default=None
+            The maximum number of rows to read
+
+        Returns
+        -------
+        list of dict
+            The rows, in the order they were added
+        """
+        columns, rows = self._query(columns, where, parameters, limit)
+        decoders = self._decoders(columns)
+        return [
+            {
+                column: decode(value)
+                for column, decode, value in zip(columns, decoders, row)
+            }
+            for row in rows
+        ]
+
+    def to_arrays(self, columns=None, where=None, parameters=(), limit=None):
+        """Read the columns in the store as arrays (see `select` for the parameters).
+
+        Returns
+        -------
+        dict of str to numpy.ndarray
+            The columns, numeric columns are float arrays (with NaN for missing values)
+            and the others object arrays
+        """
+        columns, rows = self._query(columns, where, parameters, limit)
+        values = list(zip(*rows)) or [()] * len(columns)
+        arrays = {}
+        for column, column_values in zip(columns, values):
+            if self._types.get(column) in {"INTEGER", "REAL", "BOOLEAN"}:
+                arrays[column] = np.array(
+                    [nan if value is None else value for value in column_values],
+                    dtype=float,
+                )
+            else:
+                arrays[column] = np.array(column_values, dtype=object)
+        return arrays
+
+    def to_csv(self, filename, columns=None, where=None, parameters=()):
+        """Export the rows in the store (optionally projected and filtered) to a CSV file"""
+        columns, rows = self._query(columns, where, parameters, None)
+        self._write_csv(filename, "w", columns, rows)
+
+    def update_csv(self, filename, rewrite=False):
+        """Keep a CSV export of the whole store up to date, appending the rows added since its last update.
+
+        The file is rewritten (as with `to_csv`) on its first update by this store, if the
+        store's columns changed since the last update or if rewrite is True.
+
+        Parameters
+        ----------
+        filename: str, pathlib.Path
+            The CSV file to update
+        rewrite: bool, default=False
+            If True, rewrite the file with all the rows
+        """
+        export_key = os.path.abspath(filename)
+        self.flush()
+        with self._lock:
+            columns = self.columns
+            (last_id,) = self._connection.execute(
+                f"SELECT COALESCE(MAX(_id), 0) FROM {self.TABLE}"
+            ).fetchone()
+            exported = self._csv_exports.get(export_key)
+            if (
+                rewrite
+                or exported is None
+                or exported[0] != columns
+                or not os.path.exists(filename)
+            ):
+                _, rows = self._query(columns, "_id <= ?", (last_id,), None)
+                self._write_csv(filename, "w", columns, rows)
+            else:
+                _, rows = self._query(
+                    columns, "_id > ? AND _id <= ?", (exported[1], last_id), None
+                )
+                self._write_csv(filename, "a", columns, rows)
+            self._csv_exports[export_key] = (columns, last_id)
+
+    def create_index(self, *columns):
+        """Index the store on these columns, to speed up filtering on them"""
+        self.flush()
+        with self._lock:
+            self._connection.execute(
+                f"CREATE INDEX IF NOT EXISTS {_quote('_'.join(('index',) + columns))} "
+                f"ON {self.TABLE} ({', '.join(map(_quote, columns))})"
+            )
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._connection.close()
+
+    def _query(self, columns, where, parameters, limit):
+        self.flush()
+        with self._lock:
+            if columns is None:
+                columns = self.columns
+            else:
+                missing = [column for column in columns if column not in self._types]
+                if missing:
+                    raise KeyError(f"The columns {missing} are missing from the store")
+            query = (
+                f"SELECT {', '.join(map(_quote, columns)) or '_id'} FROM {self.TABLE}"
+            )
+            if where:
+                query += f" WHERE {where}"
+            query += " ORDER BY _id"
+            if limit is not None:
+                query += f" LIMIT {int(limit)}"
+            return (
+                list(columns),
+                self._connection.execute(query, tuple(parameters)).fetchall(),
+            )
+
+    def _write_csv(self, filename, mode, columns, rows):
+        decoders = self._decoders(columns)
+        with open(filename, mode, newline="") as csv_file:
+            csv_writer = DictWriter(
+                csv_file, fieldnames=columns, restval="", lineterminator="\n"
+            )
+            if mode == "w":
+                csv_writer.writeheader()
+            for row in rows:
+                csv_writer.writerow(
+                    {
+                        column: "" if value is None else decode(value)
+                        for column, decode, value in zip(columns, decoders, row)
+                    }
+                )
+
+    def _decoders(self, columns):
+        return [
+            _to_bool if self._types.get(column) == "BOOLEAN" else _identity
+            for column in columns
+        ]
+
+    def _table_types(self):
+        types = {
+            name: sql_type or None
+            for _, name, sql_type, *_ in self._connection.execute(
+                f"PRAGMA table_info({self.TABLE})"
+            )
+        }
+        types.update(
+            (name, sql_type)
+            for name, sql_type in self._connection.execute(
+                f"SELECT name, type FROM {self.TYPES_TABLE}"
+            )
+            if name in types
+        )
+        return types
+
+    def __len__(self):
+        self.flush()
+        with self._lock:
+            return self._connection.execute(
+                f"SELECT COUNT(*) FROM {self.TABLE}"
+            ).fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}, Location: {self.path}, Columns: {len(self.columns)}>"
+
+
+def _quote(identifier):
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+
+def _sql_type(value):
+    if isinstance(value, np.generic):
+        value = value.item()
+    return _SQL_TYPES.get(type(value)) if value is not None else None
+
+
+def _to_sql(value):
+    if value is None or isinstance(value, (int, float, str, bytes)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _to_bool(value):
+    return value if value is None else bool(value)
+
+
+def _identity(value):
+    return value
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+__all__ = ["SessionManifest"]
+
+
+class SessionManifest:
+    """A record of the runs submitted in an experiment's session, in an SQLite database.
+
+    Every run (a parameter set along with its requirements and the design's components)
+    is keyed by a hash of its contents and goes through the states pending -> running -> done (or failed). The
+    manifest is updated as the runs progress, so an interrupted session can be resumed,
+    skipping the runs which are done.
+
+    Parameters
+    ----------
+    path: str, pathlib.Path
+        The location of the manifest's database (created if it doesn't exist)
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            str(path), check_same_thread=False, isolation_level=None
+        )
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                "key TEXT PRIMARY KEY, "
+                "parameters TEXT NOT NULL, "
+                "requirements TEXT NOT NULL, "
+                "components TEXT NOT NULL, "
+                "state TEXT NOT NULL, "
+                "guid TEXT, "
+                "error TEXT, "
+                "attempts INTEGER NOT NULL DEFAULT 0, "
+                "submitted_at TEXT NOT NULL, "
+                "updated_at TEXT NOT NULL)"
+            )
+
+    @staticmethod
+    def key(parameters, requirements=None, components=None):
+        """The key (hash) of a run"""
+        contents = json.dumps(
+            {
+                "parameters": parameters,
+                "requirements": requirements or {},
+                "components": components or {},
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(contents.encode()).hexdigest()
+
+    def submit(self, parameters, requirements=None, components=None):
+        """Record a run as pending (unless it was already submitted), returning its key
+
+        Parameters
+        ----------
+        parameters: dict
+            The design parameters of the run
+        requirements: dict, default=None
+            The requirements of the run
+        components: dict, default=None
+            The names of the design's components (by alias), as returned by SeedDesign.components
+        """
+        key = self.key(parameters, requirements, components)
+        now = _now()
+        self._execute(
+            "INSERT OR IGNORE INTO runs "
+            "(key, parameters, requirements, components, state, submitted_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                json.dumps(parameters, default=str),
+                json.dumps(requirements or {}, default=str),
+                json.dumps(components or {}),
+                self.PENDING,
+                now,
+                now,
+            ),
+        )
+        return key
+
+    def mark_running(self, key, guid=None):
+        self._execute(
+            "UPDATE runs SET state = ?, guid = ?, error = NULL, "
+            "attempts = attempts + 1, updated_at = ? WHERE key = ?",
+            (self.RUNNING, guid, _now(), key),
+        )
+
+    def mark_done(self, key, guid=None):
+        self._execute(
+            "UPDATE runs SET state = ?, guid = COALESCE(?, guid), updated_at = ? WHERE key = ?",
+            (self.DONE, guid, _now(), key),
+        )
+
+    def mark_failed(self, key, error=None):
+        self._execute(
+            "UPDATE runs SET state = ?, error = ?, updated_at = ? WHERE key = ?",
+            (self.FAILED, error, _now(), key),
+        )
+
+    def state(self, key):
+        """The state of a run, None if it wasn't submitted"""
+        rows = self._execute("SELECT state FROM runs WHERE key = ?", (key,))
+        return rows[0][0] if rows else None
+
+    def runs(self, states=None):
+        """The runs (in the order they were submitted), optionally only the ones in some states
+
+        Returns
+        -------
+        list of dict
+            The key, parameters, requirements, components, state, guid, error and attempts of every run
+        """
+        query = (
+            "SELECT key, parameters, requirements, components, state, guid, error, attempts "
+            "FROM runs"
+        )
+        arguments = ()
+        if states is not None:
+            states = list(states)
+            query += f" WHERE state IN ({', '.join('?' * len(states))})"
+            arguments = tuple(states)
+        query += " ORDER BY rowid"
+
+        return [
+            {
+                "key": key,
+                "parameters": json.loads(parameters),
+                "requirements": json.loads(requirements),
+                "components": json.loads(components),
+                "state": state,
+                "guid": guid,
+                "error": error,
+                "attempts": attempts,
+            }
+            for (
+                key,
+                parameters,
+                requirements,
+                components,
+                state,
+                guid,
+                error,
+                attempts,
+            ) in self._execute(query, arguments)
+        ]
+
+    def unfinished(self):
+        """The runs to (re)run on resuming a session, the pending, running (interrupted) and failed ones"""
+        return self.runs(states=(self.PENDING, self.RUNNING, self.FAILED))
+
+    def counts(self):
+        """The number of runs in every state"""
+        return dict(self._execute("SELECT state, COUNT(*) FROM runs GROUP BY state"))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _execute(self, query, arguments=()):
+        with self._lock:
+            return self._connection.execute(query, arguments).fetchall()
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__}, Location: {self.path}, Runs: {self.counts()}>"
+        )
+
+
+def _now():
+    return datetime.now().isoformat()
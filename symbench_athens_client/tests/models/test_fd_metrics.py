@@ -1,5 +1,17 @@
-from symbench_athens_client.models.fd_metrics import FDMFlightMetric
-from symbench_athens_client.tests.utils import get_test_file_path
+import io
+
+from symbench_athens_client.models.fd_metrics import (
+    FLIGHT_METRICS_FIELDS,
+    FDMFlightMetric,
+    FDMFlightPathMetric,
+    FDMInputMetric,
+    parse_fd_metrics,
+)
+from symbench_athens_client.models.uav_designs import QuadCopter
+from symbench_athens_client.tests.utils import (
+    get_test_file_path,
+    get_test_mass_formulae,
+)
 
 
 class TestFDMetrics:
@@ -8,3 +20,61 @@ class TestFDMetrics:
         fdm_flight_metric = FDMFlightMetric.from_fd_metrics(non_existent_file_loc)
         fdm_flight_metric_dict = fdm_flight_metric.dict()
         assert all(val == 0.0 for val in fdm_flight_metric_dict.values())
+
+    def test_path_metrics(self):
+        path_metrics = FDMFlightPathMetric.from_fd_metrics(
+            get_test_file_path("no_trim_state_metrics.out")
+        )
+        assert path_metrics.flight_path == 1
+        assert path_metrics.maximum_error_distance_during_flight == 200.0
+        assert path_metrics.average_error == 200.0
+        assert path_metrics.path_score == 0.0
+
+    def test_parse_fd_metrics_sources(self):
+        metrics_file = get_test_file_path("no_trim_state_metrics.out")
+        with open(metrics_file, "rb") as metrics_fp:
+            contents = metrics_fp.read()
+
+        expected = parse_fd_metrics(metrics_file)
+        assert parse_fd_metrics(contents) == expected
+        assert parse_fd_metrics(io.BytesIO(contents)) == expected
+        assert parse_fd_metrics(io.StringIO(contents.decode())) == expected
+
+    def test_parse_fd_metrics_trimmed(self):
+        contents = "\n".join(
+            [" #Metrics"]
+            + [f" {key}    {i}.5" for i, key in enumerate(FLIGHT_METRICS_FIELDS)]
+            + [
+                "  Path performance, flight path            3",
+                " Flight_distance    1.0",
+                " Time_to_traverse_path    2.0",
+                " Average_speed_to_traverse_path    3.0",
+                " Maximimum_error_distance_during_flight    4.0",
+                " Spatial_average_distance_error    5.0",
+                " Maximum_ground_impact_speed    6.0",
+                " Path_traverse_score_based_on_requirements    7.0",
+            ]
+        ).encode()
+
+        flight_metrics, path_metrics, extra_metrics = parse_fd_metrics(
+            contents, extra_fields={"Maximum_ground_impact_speed": "impact_speed"}
+        )
+        assert flight_metrics.batt_amps_ratio_mfd == 0.5
+        assert flight_metrics.motor_power_ratio_max_speed == 13.5
+        assert path_metrics.flight_path == 3
+        assert path_metrics.path_score == 7.0
+        assert extra_metrics == {"impact_speed": 6.0}
+
+    def test_input_metrics_from_fd_params(self, tmp_path):
+        design = QuadCopter(arm_length=310.5, support_length=42.0)
+        fd_params = design.to_fd_input(
+            get_test_mass_formulae(),
+            propellers_data_path="../propellers/",
+            filename=tmp_path / "FlightDyn_Path4.inp",
+            flight_path=4,
+            requested_vertical_speed=-2,
+            requested_lateral_speed=0,
+        )
+        assert FDMInputMetric.from_fd_params(fd_params) == FDMInputMetric.from_fd_input(
+            tmp_path / "FlightDyn_Path4.inp"
+        )
@@ -5,6 +5,13 @@ import math
 
 import pytest
 
+from symbench_athens_client.models.component import (
+    Battery,
+    ComponentsRepository,
+    Tube,
+    build_components,
+    build_tubes,
+)
 from symbench_athens_client.models.uav_components import (
     Autopilots,
     Batteries,
@@ -214,3 +221,108 @@ class TestComponents:
             reader = csv.DictReader(batt_csv)
             assert "IO_IDLE_CURRENT_10V" not in reader.fieldnames
             assert "IO_IDLE_CURRENT@10V" in reader.fieldnames
+
+    def test_find(self):
+        propeller = Propellers[0]
+        same_performance = Propellers.find(performance_file=propeller.performance_file)
+        assert propeller in same_performance
+        assert same_performance == [
+            prop
+            for prop in Propellers
+            if prop.performance_file == propeller.performance_file
+        ]
+        assert Propellers.find(
+            performance_file=propeller.performance_file,
+            direction=propeller.direction,
+        ) == [
+            prop for prop in same_performance if prop.direction == propeller.direction
+        ]
+        assert Propellers.find(direction=2) == []
+        assert Propellers.find(name=propeller.name) == [Propellers[propeller.name]]
+        assert len(Batteries.find()) == len(Batteries)
+
+        with pytest.raises(AttributeError):
+            Propellers.find(diameter_in_parsecs=1)
+
+    def test_lookups(self):
+        assert Propellers[-1] is list(Propellers)[-1]
+        assert Propellers[Propellers[3].name] is Propellers[3]
+        with pytest.raises(KeyError):
+            Propellers["not_a_propeller"]
+
+    def test_to_arrays(self):
+        arrays = Batteries.to_arrays()
+        assert arrays is Batteries.columns
+        assert len(arrays["capacity"]) == len(Batteries)
+        assert arrays["capacity"].dtype == float
+
+        mask = (arrays["capacity"] > 3000) & (arrays["weight"] < 0.5)
+        assert arrays.select(mask) == [
+            battery
+            for battery in Batteries
+            if battery.capacity > 3000
+            and battery.weight is not None
+            and battery.weight < 0.5
+        ]
+
+        directions = Propellers.to_arrays()["direction"]
+        assert Propellers.to_arrays().select(directions == -1) == Propellers.find(
+            direction=-1
+        )
+
+        propeller = Propellers[5]
+        prop_arrays = Propellers.to_arrays()
+        code = prop_arrays.code("performance_file", propeller.performance_file)
+        assert prop_arrays.select(
+            prop_arrays["performance_file"] == code
+        ) == Propellers.find(performance_file=propeller.performance_file)
+        assert prop_arrays.code("performance_file", "missing.dat") == -1
+
+
+class TestComponentSnapshots:
+    def test_snapshot_reused(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("SYMBENCH_ATHENS_COMPONENT_SNAPSHOTS", str(tmp_path))
+        batteries = build_components(Battery, "uav")
+        assert len(batteries) == 34
+        (snapshot,) = tmp_path.glob("uav_Battery.*.pickle")
+
+        def fail(self, components):
+            raise AssertionError("The components were validated again")
+
+        monkeypatch.setattr(ComponentsRepository, "_initialize_components", fail)
+        snapshotted = build_components(Battery, "uav")
+        assert snapshotted.all == batteries.all
+        assert snapshotted[batteries.all[0]] == batteries[batteries.all[0]]
+
+        tubes = build_tubes(["0394OD_para_tube"], "uav")
+        with pytest.raises(AssertionError):
+            len(tubes)
+
+    def test_snapshot_key_changes_with_corpus(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("SYMBENCH_ATHENS_COMPONENT_SNAPSHOTS", str(tmp_path))
+        from symbench_athens_client.models import component
+
+        _, key = component._snapshot_name_and_key(Battery, "uav", "Battery")
+        _, tube_key = component._snapshot_name_and_key(Tube, "uav", "Battery")
+        assert tube_key != key
+
+        monkeypatch.setattr(component, "_corpus_digest", lambda corpus: "changed")
+        _, changed_key = component._snapshot_name_and_key(Battery, "uav", "Battery")
+        assert changed_key != key
+
+    def test_snapshots_disabled(self, monkeypatch):
+        from symbench_athens_client.models import component
+
+        def fail(*args):
+            raise AssertionError("A snapshot was saved")
+
+        monkeypatch.setenv("SYMBENCH_ATHENS_COMPONENT_SNAPSHOTS", "0")
+        monkeypatch.setattr(component, "_save_snapshot", fail)
+        assert len(build_components(Battery, "uav")) == 34
+
+    def test_snapshots_in_cache_dir(self, tmp_path, monkeypatch):
+        from symbench_athens_client.models import component
+
+        monkeypatch.delenv("SYMBENCH_ATHENS_COMPONENT_SNAPSHOTS", raising=False)
+        monkeypatch.setenv("SYMBENCH_ATHENS_CACHE_DIR", str(tmp_path))
+        assert component._snapshot_dir() == tmp_path / "component_snapshots"
@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 from pydantic import ValidationError
 
@@ -16,6 +17,41 @@ from symbench_athens_client.models.uav_designs import (
     QuadCopter,
     QuadSpiderCopter,
 )
+from symbench_athens_client.tests.utils import get_test_mass_formulae
+from symbench_athens_client.utils import MassFormulae
+
+
+def legacy_to_fd_inp(input_dict):
+    """The string concatenation renderer FDInputTemplate replaced (consumes the propeller dictionaries)"""
+    inp_lines = ["&aircraft_data"]
+    duplicate_entries = []
+    for key, value in input_dict["aircraft"].items():
+        if isinstance(value, list):
+            for j in range(1, len(value)):
+                duplicate_entries.append(f"   aircraft%{key}     = {value[j]}")
+            inp_lines.append(f"   aircraft%{key}     = {value[0]}")
+        else:
+            inp_lines.append(f"   aircraft%{key}     = {value}")
+    inp_lines.extend(duplicate_entries)
+    inp_lines.append("\n")
+    for propeller_dict in input_dict["propellers"]:
+        for_components = propeller_dict.pop("for")
+        inp_lines.append(
+            f"!   Propeller({for_components+1}) uses components named Prop_{for_components}, "
+            f"Motor_{for_components}, ESC_{for_components}"
+        )
+        for key, value in propeller_dict.items():
+            inp_lines.append(f"   propeller({for_components+1})%{key}   = {str(value)}")
+        inp_lines.append("\n")
+    inp_lines.append("!\t Battery(1) is component named: Battery_0")
+    for key, value in input_dict["battery"].items():
+        inp_lines.append(f"   battery(1)%{key}    = {value}")
+    inp_lines.append("\n")
+    inp_lines.append("!\t Controls")
+    for key, value in input_dict["controls"].items():
+        inp_lines.append(f"   control%{key} = {value}")
+    inp_lines.append("/\n\n")
+    return "\n".join(inp_lines)
 
 
 class TestDesigns:
@@ -123,6 +159,148 @@ class TestDesigns:
         design = QuadCopter()
         assert design.swap_list == {}
 
+    def test_assign_components(self):
+        design = QuadCopter()
+        expected = QuadCopter()
+        prop_0, prop_1 = Propellers.apc_propellers_6x4EP, Propellers.apc_propellers_6x4E
+        design.assign_components(
+            propeller_0=prop_0,
+            propeller_1=prop_1,
+            Prop_2=prop_0,
+            propeller_3=prop_1,
+        )
+        expected.propeller_0 = prop_0
+        expected.propeller_1 = prop_1
+        expected.propeller_2 = prop_0
+        expected.propeller_3 = prop_1
+
+        assert design == expected
+        assert design.swap_list == expected.swap_list
+        assert design.__fields_set__ == expected.__fields_set__
+
+        with pytest.raises(ValidationError):
+            design.assign_components(propeller_0=Batteries[0])
+        assert design.propeller_0 == prop_0
+
+        with pytest.raises(ValueError):
+            design.assign_components(arm_length=100)
+
     def test_hplane_wings(self, h_plane):
         assert h_plane.left_wing == Wings["left_NACA_0006"]
         assert h_plane.right_wing == Wings["right_NACA_0006"]
+
+    def test_fd_inputs_all_paths(self, tmp_path):
+        design = QuadCopter(arm_length=300.0, support_length=40.0)
+        formulae = get_test_mass_formulae()
+        design.to_fd_inputs(
+            formulae,
+            propellers_data_path="../propellers/",
+            filenames={i: tmp_path / f"all_{i}.inp" for i in (1, 3, 4, 5)},
+            requested_vertical_speed=-2,
+            requested_lateral_speed=20,
+        )
+        for i in (1, 3, 4, 5):
+            design.to_fd_input(
+                formulae,
+                propellers_data_path="../propellers/",
+                filename=tmp_path / f"single_{i}.inp",
+                flight_path=i,
+                requested_vertical_speed=0 if i != 4 else -2,
+                requested_lateral_speed=0 if i == 4 else 20,
+            )
+            assert (tmp_path / f"all_{i}.inp").read_text() == (
+                tmp_path / f"single_{i}.inp"
+            ).read_text()
+
+    def test_fd_inputs_batch(self, tmp_path):
+        formulae = MassFormulae(get_test_mass_formulae())
+        design = QuadCopter(support_length=40.0)
+        rows = [
+            (200.0, 1.0, "apc_propellers_6x4EP", "apc_propellers_6x4E"),
+            (300.0, 0.5, "apc_propellers_7x5EP", "apc_propellers_7x5E"),
+            (350.0, 2.0, "apc_propellers_6x4EP", "apc_propellers_6x4E"),
+        ]
+        columns = ["Length_0", "Q_Position", "Prop_0", "propeller_1"]
+        batch_inputs = list(
+            design.to_fd_inputs_batch(
+                formulae,
+                np.array(rows, dtype=object),
+                columns=columns,
+                propellers_data_path="../propellers/",
+                requested_vertical_speed=-2,
+                requested_lateral_speed=20,
+            )
+        )
+        assert [(row, path) for row, path, _ in batch_inputs] == [
+            (row, path) for row in range(3) for path in (1, 3, 4, 5)
+        ]
+
+        for row, (arm_length, q_position, prop_0, prop_1) in enumerate(rows):
+            variant = QuadCopter(arm_length=arm_length, support_length=40.0)
+            variant.q_position = q_position
+            variant.propeller_0 = Propellers[prop_0]
+            variant.propeller_1 = Propellers[prop_1]
+            variant.to_fd_inputs(
+                formulae,
+                propellers_data_path="../propellers/",
+                filenames={i: tmp_path / f"{row}_{i}.inp" for i in (1, 3, 4, 5)},
+                requested_vertical_speed=-2,
+                requested_lateral_speed=20,
+            )
+            for batch_row, path, fd_input in batch_inputs:
+                if batch_row == row:
+                    assert fd_input == (tmp_path / f"{row}_{path}.inp").read_text()
+
+        written = design.to_fd_inputs_batch(
+            formulae,
+            {"arm_length": [210.0, 220.0]},
+            flight_paths=(4,),
+            paths=str(
+                tmp_path / "batch" / "Design{row}" / "FlightDyn_Path{flight_path}.inp"
+            ),
+        )
+        assert written == [
+            tmp_path / "batch" / f"Design{row}" / "FlightDyn_Path4.inp"
+            for row in (0, 1)
+        ]
+
+        with pytest.raises(ValueError):
+            design.to_fd_inputs_batch(formulae, {"Arm_0": ["0394OD_para_tube"]})
+
+        # The formulae (and their compiled evaluator) are used as is, not copied
+        calls = []
+        evaluate_batch = formulae.evaluate_batch
+        formulae.evaluate_batch = lambda p: calls.append(p) or evaluate_batch(p)
+        list(design.to_fd_inputs_batch(formulae, {"arm_length": [230.0]}))
+        assert calls
+
+    def test_fd_input_template(self):
+        design = QuadCopter(arm_length=260.0)
+        # sympy evaluated (non MassFormulae) estimates, as formatted by the legacy renderer
+        fd_params = design.to_fd_input(
+            get_test_mass_formulae(), propellers_data_path="../propellers/"
+        )
+        propellers = [dict(prop) for prop in fd_params["propellers"]]
+        fd_input = QuadCopter._to_fd_inp(fd_params)
+        assert fd_params["propellers"] == propellers
+        assert QuadCopter._to_fd_inp(fd_params) == fd_input
+        assert fd_input == legacy_to_fd_inp(
+            {**fd_params, "propellers": [dict(prop) for prop in propellers]}
+        )
+
+        # A different layout, for another design class
+        fd_params = {
+            "aircraft": {"cname": "'{UAV}'", "uc_initial": ["0.4d0", "0.5d0"]},
+            "propellers": [
+                {"for": 1, "cname": "'prop_1'", "x": 1.5},
+                {"for": 0, "cname": "'prop_0'", "x": -1.5},
+            ],
+            "battery": {"voltage": 11.1},
+            "controls": {"i_flight_path": 3, "R": 1.0},
+        }
+        assert HPlane._to_fd_inp(fd_params) == legacy_to_fd_inp(
+            {
+                **fd_params,
+                "propellers": [dict(prop) for prop in fd_params["propellers"]],
+            }
+        )
@@ -0,0 +1,223 @@
+import asyncio
+import os
+import stat
+import sys
+from pathlib import Path
+
+import pytest
+
+from symbench_athens_client.exceptions import FDMFailedException
+from symbench_athens_client.fdm_cache import FDMResultCache
+from symbench_athens_client.fdm_executor import (
+    AsyncFDMExecutor,
+    FDMExecutor,
+    ParallelFDMExecutor,
+)
+from symbench_athens_client.models.uav_designs import QuadCopter
+from symbench_athens_client.tests.utils import (
+    get_test_mass_formulae,
+    write_fake_fdm,
+)
+
+FD_INPUT = """&aircraft_data
+   aircraft%mass     = 1.5
+   aircraft%Ixx     = 0.1
+   aircraft%Iyy     = 0.2
+   aircraft%Izz     = 0.3
+!\t Controls
+   control%i_flight_path = {path}
+   control%requested_lateral_speed = 10
+   control%requested_vertical_speed = 0
+   control%Q_position = 1.0
+   control%Q_velocity = 1.0
+   control%Q_angular_velocity = 1.0
+   control%Q_angles = 1.0
+   control%R = 1.0
+/
+"""
+
+
+@pytest.fixture(scope="module")
+def fake_fdm(tmp_path_factory):
+    return write_fake_fdm(tmp_path_factory.mktemp("bin") / "new_fdm")
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Uses a shell script as FDM")
+class TestFDMExecutor:
+    @staticmethod
+    def _write_inputs(directory, paths=(1, 3, 4, 5)):
+        inputs = []
+        for path in paths:
+            input_file = Path(directory) / f"FlightDyn_Path{path}.inp"
+            input_file.write_text(FD_INPUT.format(path=path))
+            inputs.append(input_file)
+        return inputs
+
+    def test_execute_in_cwd(self, fake_fdm, tmp_path):
+        (input_file,) = self._write_inputs(tmp_path, paths=(1,))
+        executor = FDMExecutor(fdm_path=fake_fdm)
+        input_metrics, flight_metrics, path_metrics = executor.execute(
+            input_file.name, "FlightDynReport_Path1.out", cwd=tmp_path
+        )
+        assert input_metrics.flight_path == 1
+        assert flight_metrics.max_hover_time == 0.0
+        assert path_metrics.flight_path == 1
+        assert (tmp_path / "metrics.out").exists()
+        assert (tmp_path / "FlightDynReport_Path1.out").read_text() == "FDM Report\n"
+
+    def test_execute_relative_fdm_path(self, fake_fdm, tmp_path, monkeypatch):
+        (input_file,) = self._write_inputs(tmp_path, paths=(3,))
+        monkeypatch.chdir(Path(fake_fdm).parent)
+        relative_fdm = os.path.join(".", "new_fdm")
+        for executor in (
+            FDMExecutor(fdm_path=relative_fdm),
+            ParallelFDMExecutor(fdm_path=relative_fdm, max_workers=1),
+        ):
+            assert executor.fdm_path == fake_fdm
+            input_metrics, _, _ = executor.execute(
+                input_file.name, "FlightDynReport_Path3.out", cwd=tmp_path
+            )
+            assert input_metrics.flight_path == 3
+        executor.shutdown()
+        assert FDMExecutor(fdm_path="new_fdm").fdm_path == "new_fdm"
+
+    def test_parallel_execute_sandboxes(self, fake_fdm, tmp_path):
+        inputs = self._write_inputs(tmp_path)
+        sandbox_root = tmp_path / "sandboxes"
+        sandbox_root.mkdir()
+        jobs = [
+            {
+                "input_file": input_file,
+                "output_file": input_file.with_suffix(".out"),
+                "metrics_file": input_file.with_suffix(".metrics"),
+            }
+            for input_file in inputs
+        ]
+        with ParallelFDMExecutor(
+            fdm_path=fake_fdm, max_workers=2, sandbox_root=sandbox_root
+        ) as executor:
+            completed = list(executor.as_completed(jobs))
+
+        assert len(completed) == 4
+        for job, future in completed:
+            input_metrics, _, _ = future.result()
+            assert input_metrics.flight_path == int(job["input_file"].stem[-1])
+            assert job["output_file"].exists()
+            assert job["metrics_file"].exists()
+
+        assert not (tmp_path / "metrics.out").exists()
+        assert os.listdir(sandbox_root) == []
+
+    def test_parallel_execute_in_cwd(self, fake_fdm, tmp_path):
+        (input_file,) = self._write_inputs(tmp_path, paths=(4,))
+        with ParallelFDMExecutor(fdm_path=fake_fdm, max_workers=1) as executor:
+            input_metrics, _, _ = executor.execute(
+                input_file.name, "FlightDynReport_Path4.out", cwd=tmp_path
+            )
+        assert input_metrics.flight_path == 4
+        assert (tmp_path / "metrics.out").exists()
+        assert (tmp_path / "score.out").exists()
+
+    def test_execute_cached(self, fake_fdm, tmp_path):
+        (input_file,) = self._write_inputs(tmp_path, paths=(3,))
+        invocations = Path(fake_fdm).parent / "invocations"
+        cache = FDMResultCache(cache_dir=tmp_path / "cache")
+        executor = FDMExecutor(fdm_path=fake_fdm, cache=cache)
+
+        first = executor.execute(input_file.name, "report.out", cwd=tmp_path)
+        num_invocations = len(invocations.read_text().splitlines())
+        (tmp_path / "metrics.out").unlink()
+
+        second = executor.execute(input_file.name, "report_2.out", cwd=tmp_path)
+        assert first == second
+        assert len(invocations.read_text().splitlines()) == num_invocations
+        assert cache.hits == 1 and cache.misses == 1
+        assert (tmp_path / "metrics.out").exists()
+        assert (tmp_path / "report_2.out").read_text() == "FDM Report\n"
+
+        with ParallelFDMExecutor(fdm_path=fake_fdm, cache=cache) as executor:
+            third = executor.execute(input_file, tmp_path / "report_3.out")
+        assert third == first
+        assert cache.hits == 2
+
+    def test_cache_eviction(self, fake_fdm, tmp_path):
+        inputs = self._write_inputs(tmp_path)
+        cache = FDMResultCache(cache_dir=tmp_path / "cache", max_size=1)
+        executor = FDMExecutor(fdm_path=fake_fdm, cache=cache)
+        for input_file in inputs:
+            executor.execute(input_file.name, "report.out", cwd=tmp_path)
+        assert cache.stats()["entries"] == 0
+        assert cache.misses == 4
+
+    def test_cache_size(self, fake_fdm, tmp_path, monkeypatch):
+        (input_file,) = self._write_inputs(tmp_path, paths=(5,))
+        cache = FDMResultCache(cache_dir=tmp_path / "cache")
+        with ParallelFDMExecutor(fdm_path=fake_fdm, cache=cache) as executor:
+            results = executor.execute(input_file.name, "report.out", cwd=tmp_path)
+        stats = cache.stats()
+        assert stats["entries"] == 1 and stats["size"] > 0
+
+        key = cache.key(input_file.name, fake_fdm, cwd=tmp_path)
+        cache.store(key, results, tmp_path / "report.out", tmp_path / "metrics.out")
+        assert cache._size == stats["size"]
+
+        (tmp_path / "prop.dat").write_text("propeller data")
+        prop_input = tmp_path / "prop.inp"
+        prop_input.write_text("   propell(1)%prop_fname = 'prop.dat'\n")
+        prop_key = cache.key(prop_input.name, fake_fdm, cwd=tmp_path)
+        digests = []
+        monkeypatch.setattr(
+            FDMResultCache, "_file_digest", staticmethod(digests.append)
+        )
+        assert cache.key(prop_input.name, fake_fdm, cwd=tmp_path) == prop_key
+        assert digests == []
+
+    def test_async_execute(self, fake_fdm, tmp_path):
+        inputs = self._write_inputs(tmp_path, paths=(1, 3))
+        executor = AsyncFDMExecutor(fdm_path=fake_fdm, max_concurrency=1)
+
+        async def run_all():
+            return await asyncio.gather(
+                *(
+                    executor.execute(
+                        input_file.name, input_file.with_suffix(".out"), cwd=tmp_path
+                    )
+                    for input_file in inputs
+                )
+            )
+
+        results = asyncio.run(run_all())
+        assert [path_metrics.flight_path for _, _, path_metrics in results] == [1, 3]
+        assert inputs[0].with_suffix(".out").read_text() == "FDM Report\n"
+        assert (tmp_path / "metrics.out").exists()
+
+        # The executor can be reused in another event loop
+        results = asyncio.run(run_all())
+        assert len(results) == 2
+
+    def test_async_timeout(self, tmp_path):
+        (input_file,) = self._write_inputs(tmp_path, paths=(1,))
+        slow_fdm = tmp_path / "slow_fdm"
+        slow_fdm.write_text("#!/bin/sh\nexec sleep 10\n")
+        slow_fdm.chmod(slow_fdm.stat().st_mode | stat.S_IEXEC)
+        executor = AsyncFDMExecutor(fdm_path=str(slow_fdm), timeout=0.5)
+        with pytest.raises(FDMFailedException):
+            asyncio.run(executor.execute(input_file.name, "report.out", cwd=tmp_path))
+
+    def test_async_run_all_paths(self, fake_fdm, tmp_path):
+        design = QuadCopter(arm_length=300.0)
+        executor = AsyncFDMExecutor(fdm_path=fake_fdm)
+        metrics = asyncio.run(
+            executor.run_all_paths(
+                design,
+                get_test_mass_formulae(),
+                tmp_path,
+                propellers_data=tmp_path / "propellers",
+            )
+        )
+        assert metrics["AnalysisError"] is False
+        assert metrics["TotalPathScore"] == 0.0
+        assert metrics["Length_0"] == 300.0
+        for i in (1, 3, 4, 5):
+            assert f"Path_score_Path{i}" in metrics
+            assert (tmp_path / f"Path{i}" / "metrics.out").exists()
@@ -91,6 +91,28 @@ class TestFDMExperiments:
 
         assert results["TotalPathScore"] == 1582
 
+    def test_parallel_paths(self):
+        expr = get_experiments_by_name("ExperimentOnQuadCopter_5")
+        expr.start_new_session()
+        parameters = {
+            "arm_length": 324,
+            "support_length": 2.11,
+            "batt_mount_z_offset": 43.6842105263158,
+            "r": 360.0,
+        }
+        requirements = {
+            "requested_vertical_speed": -2,
+            "requested_lateral_speed": 50,
+        }
+        serial = expr.run_for(parameters=parameters, requirements=requirements)
+        parallel = expr.run_for(
+            parameters=parameters, requirements=requirements, parallel_paths=True
+        )
+        serial.pop("GUID")
+        parallel.pop("GUID")
+        assert serial == parallel
+        assert list(serial) == list(parallel)
+
     def test_fd_execution_variable_battery_quad(self):
         expr = get_experiments_by_name("QuadCopterVariableBatteryPropExperiment")
         expr.start_new_session()
@@ -1,10 +1,21 @@
 import logging
 import os
+import threading
+import time
+from concurrent.futures import Future
 
 import pytest
 
-from symbench_athens_client.athens_graphdb_client import SymbenchAthensGraphDBClient
+from symbench_athens_client.athens_graphdb_client import (
+    GraphDBClientPool,
+    SymbenchAthensGraphDBClient,
+)
+from symbench_athens_client.graphdb_queries import (
+    CLEAR_DESIGN_QUERY,
+    CLONE_DESIGN_QUERY,
+)
 from symbench_athens_client.models.uam_designs import Rake
+from symbench_athens_client.models.uav_designs import QuadCopter
 
 
 def is_uav_corpus():
@@ -41,3 +52,153 @@ class TestGraphDBClient:
         assert design.name in client.get_all_design_names()
         client.clear_design(design)
         assert design.name not in client.get_all_design_names()
+
+
+class FakeGraphDBClient:
+    def __init__(self, gremlin_url, log_level=None):
+        self.gremlin_url = gremlin_url
+        self.healthy = True
+        self.reconnects = 0
+        self.closed = False
+
+    def is_healthy(self):
+        return self.healthy
+
+    def reconnect(self):
+        self.reconnects += 1
+        self.healthy = True
+
+    def close(self):
+        self.closed = True
+
+
+class TestGraphDBClientPool:
+    @pytest.fixture
+    def pool(self):
+        pool = GraphDBClientPool(
+            "ws://localhost:8182/gremlin",
+            pool_size=2,
+            health_check_interval=60,
+            client_factory=FakeGraphDBClient,
+        )
+        yield pool
+        pool.close()
+
+    def test_reuse(self, pool):
+        with pool.client() as first:
+            pass
+        with pool.client() as second:
+            assert second is first
+            with pool.client() as third:
+                assert third is not first
+        assert pool._num_clients == 2
+
+    def test_pool_size(self, pool):
+        borrowed, lock = [], threading.Lock()
+        max_borrowed = []
+
+        def work():
+            with pool.client() as client:
+                with lock:
+                    borrowed.append(client)
+                    max_borrowed.append(len(borrowed))
+                time.sleep(0.01)
+                with lock:
+                    borrowed.remove(client)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert max(max_borrowed) <= 2
+        assert pool._num_clients <= 2
+
+    def test_reconnect(self, pool):
+        with pytest.raises(RuntimeError):
+            with pool.client() as client:
+                client.healthy = False
+                raise RuntimeError("Connection reset")
+        assert client.reconnects == 1
+
+        # Idle clients are checked before they are handed out
+        pool.health_check_interval = 0
+        client.healthy = False
+        with pool.client() as same_client:
+            assert same_client is client
+        assert client.reconnects == 2
+
+    def test_close(self, pool):
+        with pool.client() as client:
+            pass
+        pool.close()
+        assert client.closed
+        with pytest.raises(RuntimeError):
+            with pool.client():
+                pass
+
+
+class FakeResultSet:
+    def __init__(self, results):
+        self.results = results
+
+    def all(self):
+        future = Future()
+        future.set_result(self.results)
+        return future
+
+
+class FakeGremlinClient:
+    def __init__(self, url, traversal_source, pool_size=None):
+        self.designs = ["QuadCopter"]
+        self.requests = []
+
+    def submit(self, message, bindings=None, request_options=None):
+        self.requests.append((message, bindings))
+        if message == CLONE_DESIGN_QUERY:
+            self.designs.append(bindings["dst_name"])
+        elif message == CLEAR_DESIGN_QUERY:
+            self.designs.remove(bindings["src_name"])
+        return FakeResultSet(list(self.designs))
+
+    def close(self):
+        pass
+
+
+class TestDesignScripts:
+    @pytest.fixture
+    def client(self, monkeypatch):
+        monkeypatch.setattr(
+            "symbench_athens_client.athens_graphdb_client.Client", FakeGremlinClient
+        )
+        client = SymbenchAthensGraphDBClient(gremlin_url="ws://localhost:8182/gremlin")
+        yield client
+        client.close()
+
+    def test_scripts(self):
+        for script in (CLONE_DESIGN_QUERY, CLEAR_DESIGN_QUERY):
+            assert "{" not in script and "}" not in script
+            assert script.strip().endswith("g.tx().commit()")
+            assert "src_name" in script
+        assert CLEAR_DESIGN_QUERY.count('in("inside")') == 1
+
+    def test_clone_clear_round_trips(self, client):
+        design = QuadCopter()
+        client._clone("QuadCopter", "QuadCopter'1")
+        assert client.client.requests[-1] == (
+            CLONE_DESIGN_QUERY,
+            {"src_name": "QuadCopter", "dst_name": "QuadCopter'1"},
+        )
+
+        requests = len(client.client.requests)
+        client._clear("QuadCopter'1")
+        assert client.client.requests[requests:] == [
+            (CLEAR_DESIGN_QUERY, {"src_name": "QuadCopter'1"})
+        ]
+
+        client.clone_design(design)
+        assert design.name == "QuadCopter1"
+        assert [message for message, _ in client.client.requests].count(
+            CLONE_DESIGN_QUERY
+        ) == 2
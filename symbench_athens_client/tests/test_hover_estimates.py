@@ -0,0 +1,61 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from symbench_athens_client.hover_estimates import AIR_DENSITY, HoverEstimator
+from symbench_athens_client.models.uav_components import Batteries, Motors, Propellers
+from symbench_athens_client.propeller_db import compile_propeller_database
+from symbench_athens_client.tests.utils import get_test_file_path
+
+
+@pytest.fixture(scope="module")
+def estimator(tmp_path_factory):
+    propellers_dir = tmp_path_factory.mktemp("propellers")
+    for name in ("PER3_6x4.dat", "PER3_74x78C.dat"):
+        shutil.copy(get_test_file_path(name), propellers_dir / name)
+    db = compile_propeller_database(propellers_dir, propellers_dir / "db")
+    return HoverEstimator(db)
+
+
+class TestHoverEstimator:
+    def test_coefficients(self, estimator):
+        ct, cp = estimator.coefficients("PER3_6x4.dat", [1000, 1500, 2000])
+        assert ct == pytest.approx([0.1164] * 3)
+        assert cp == pytest.approx([0.0550] * 3)
+
+        ct, _ = estimator.coefficients(["PER3_6x4.dat", "PER3_74x78C.dat"], 26000)
+        assert ct[0] == pytest.approx(0.1164)  # Beyond the tabulated RPMs
+        assert ct[1] == pytest.approx(0.1707)
+
+        _, cp = estimator.coefficients("PER3_6x4.dat", 1500, 0.03)
+        assert cp == pytest.approx(0.0559)
+
+        ct, _ = estimator.coefficients("PER3_6x4.dat", 1000, [0.0, 0.015, 0.03])
+        assert ct[1] == pytest.approx((0.1164 + 0.1161) / 2)
+
+    def test_estimate(self, estimator):
+        propeller = Propellers.apc_propellers_6x4
+        motor = Motors.t_motor_AT2312KV1400
+        light, heavy = 0.05, 50.0
+        estimates = estimator.estimate(
+            [propeller, propeller],
+            motor,
+            Batteries[0],
+            mass=[light, heavy],
+        )
+        thrust_to_weight = estimates["thrust_to_weight"]
+        assert thrust_to_weight[0] > 1 > thrust_to_weight[1]
+        assert np.isnan(estimates["hover_power"][1])
+
+        ct, _ = estimator.coefficients(propeller, estimates["hover_rpm"][0])
+        hover_thrust = (
+            4
+            * ct
+            * AIR_DENSITY
+            * (estimates["hover_rpm"][0] / 60) ** 2
+            * (propeller.diameter / 1000) ** 4
+        )
+        assert hover_thrust == pytest.approx(light * 9.80665, rel=1e-6)
+        assert estimates["hover_power"][0] > 0
+        assert estimates["hover_time"][0] > 0
@@ -1,8 +1,17 @@
 import os
+import threading
+from concurrent.futures import Future
 
 import pytest
+from api4jenkins.build import WorkflowRun
+from api4jenkins.exceptions import ItemNotFoundError
 
-from symbench_athens_client.athens_jenkins_client import SymbenchAthensJenkinsClient
+from symbench_athens_client.athens_jenkins_client import (
+    BuildPoller,
+    SubmittedBuild,
+    SymbenchAthensJenkinsClient,
+)
+from symbench_athens_client.exceptions import JobFailedError
 
 
 @pytest.mark.skip
@@ -28,3 +37,194 @@ class TestSymbenchClient:
         assert "CloneDesign" in job_names
         assert "CopyComponent" in job_names
         assert "AddConnection" in job_names
+
+
+class FakeQueueItem:
+    def __init__(self, item_id):
+        self.id = item_id
+
+
+class FakeJob:
+    """A job whose builds follow a script of states, advanced on every poll of its builds.
+
+    The states are Q (queued), None (running), a result or CANCELLED (left the queue without a build)
+    """
+
+    url = "http://localhost:8080/job/UAV_Workflows/"
+
+    def __init__(self, jenkins, scripts):
+        self.jenkins = jenkins
+        self.scripts = scripts
+        self.queued = []
+        self.requests = 0
+        self.estimated_duration = -1
+
+    def build(self, **parameters):
+        if parameters.get("fail_to_queue"):
+            raise RuntimeError("Queue is full")
+        self.queued.append(
+            [100 + len(self.queued), list(self.scripts[parameters["x"]])]
+        )
+        return FakeQueueItem(self.queued[-1][0])
+
+    def queued_ids(self):
+        return [item_id for item_id, script in self.queued if script[0] == "Q"]
+
+    def api_json(self, tree="", depth=0):
+        assert tree.startswith("builds[")
+        self.requests += 1
+        builds = []
+        for number, (item_id, script) in enumerate(self.queued, start=1):
+            if len(script) > 1:
+                script.pop(0)
+            if script[0] not in {"Q", "CANCELLED"}:
+                builds.append(
+                    {
+                        "_class": "org.jenkinsci.plugins.workflow.job.WorkflowRun",
+                        "number": number,
+                        "url": f"{self.url}{number}/",
+                        "queueId": item_id,
+                        "result": script[0],
+                        "timestamp": 1000,
+                        "estimatedDuration": self.estimated_duration,
+                    }
+                )
+        return {"builds": builds}
+
+
+class FakeQueue:
+    def __init__(self, job):
+        self.job = job
+
+    def api_json(self, tree="", depth=0):
+        return {"items": [{"id": item_id} for item_id in self.job.queued_ids()]}
+
+
+class FakeJenkins:
+    def __init__(self, job):
+        self.job = job
+        self.queue = FakeQueue(job)
+
+    def get_job(self, name):
+        return self.job if name == "UAV_Workflows" else None
+
+
+class TestSubmitMany:
+    @pytest.fixture
+    def jenkins_client(self):
+        jenkins_client = SymbenchAthensJenkinsClient(
+            jenkins_url="http://localhost:8080",
+            username="user",
+            password="password",
+            min_poll_interval=0.001,
+            max_poll_interval=0.01,
+        )
+        yield jenkins_client
+        jenkins_client.close()
+
+    def use_job(self, jenkins_client, scripts):
+        job = FakeJob(jenkins_client.server, scripts)
+        jenkins_client.server = jenkins_client.poller.server = FakeJenkins(job)
+        return job
+
+    def test_submit_many(self, jenkins_client):
+        job = self.use_job(
+            jenkins_client,
+            {
+                0: ["Q", None, None, "SUCCESS"],
+                1: ["Q", None, "FAILURE"],
+                2: ["Q", "SUCCESS"],
+                3: ["Q", "Q", None, None, None, "SUCCESS"],
+                5: ["Q", "Q", "CANCELLED"],
+            },
+        )
+        parameter_sets = [{"x": x, "fail_to_queue": x == 4} for x in range(6)]
+
+        in_flight, finished = [], []
+
+        def tracked(parameter_sets):
+            for parameters in parameter_sets:
+                # The builds queued before these parameters, less the finished ones
+                in_flight.append(len(job.queued) - len(finished))
+                yield parameters
+
+        for submitted in jenkins_client.submit_many(
+            "UAV_Workflows", tracked(parameter_sets), max_in_flight=2
+        ):
+            finished.append(submitted)
+
+        assert max(in_flight) <= 2
+        assert sorted(submitted.index for submitted in finished) == list(range(6))
+        by_index = {submitted.index: submitted for submitted in finished}
+        assert [by_index[x].succeeded for x in range(6)] == [
+            True,
+            False,
+            True,
+            True,
+            False,
+            False,
+        ]
+        assert by_index[0].number == 1
+        assert by_index[0].build.url == f"{job.url}1/"
+        assert isinstance(by_index[0].build, WorkflowRun)
+        assert isinstance(by_index[1].error, JobFailedError)
+        assert by_index[1].result == "FAILURE"
+        assert isinstance(by_index[4].error, RuntimeError)
+        assert by_index[4].build is None
+        assert isinstance(by_index[5].error, JobFailedError)
+        assert by_index[5].build is None
+
+    def test_build_async(self, jenkins_client):
+        self.use_job(jenkins_client, {0: ["Q", None, "SUCCESS"], 1: ["FAILURE"]})
+        finished = threading.Event()
+        future = jenkins_client.build_async(
+            "UAV_Workflows", {"x": 0}, callback=lambda future: finished.set()
+        )
+        assert future.result(timeout=5).succeeded
+        assert finished.wait(timeout=5)
+
+        with pytest.raises(JobFailedError):
+            jenkins_client.build_and_wait("UAV_Workflows", {"x": 1})
+
+    def test_poll_overdue_build(self, jenkins_client):
+        job = self.use_job(jenkins_client, {0: [None]})
+        poller = BuildPoller(jenkins_client.server, max_interval=30.0)
+        submitted = SubmittedBuild("UAV_Workflows", {"x": 0}, 0)
+        submitted.item = job.build(x=0)
+        with poller._condition:  # Track without starting the polling thread
+            poller._tracked[job.url] = (job, [submitted])
+
+        num_changes, next_finish = poller.poll()
+        assert num_changes == 1 and next_finish is None
+
+        job.estimated_duration = 1000  # Started just after the epoch, long overdue
+        assert poller.poll() == (0, 0.0)
+
+    def test_poll_build_dropped_from_builds(self, jenkins_client, monkeypatch):
+        job = self.use_job(jenkins_client, {0: [None]})
+        poller = BuildPoller(jenkins_client.server, max_interval=30.0)
+        submitted = SubmittedBuild("UAV_Workflows", {"x": 0}, 0)
+        submitted.item = job.build(x=0)
+        submitted.future = Future()
+        with poller._condition:  # Track without starting the polling thread
+            poller._tracked[job.url] = (job, [submitted])
+        assert poller.poll() == (1, None)
+
+        # Newer builds pushed it out of the job's builds, it is polled by itself
+        job.queued.clear()
+        build_results = [None, "SUCCESS"]
+        monkeypatch.setattr(
+            submitted.build,
+            "api_json",
+            lambda tree="", depth=0: {"number": 1, "result": build_results.pop(0)},
+        )
+        assert poller.poll() == (0, None)
+        assert not submitted.future.done()
+
+        assert poller.poll() == (1, None)
+        assert submitted.future.result(timeout=5).succeeded
+
+    def test_submit_many_missing_job(self, jenkins_client):
+        self.use_job(jenkins_client, {})
+        with pytest.raises(ItemNotFoundError):
+            list(jenkins_client.submit_many("Missing", [{}]))
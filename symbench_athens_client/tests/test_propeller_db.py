@@ -0,0 +1,64 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from symbench_athens_client.propeller_db import (
+    PropellerDatabase,
+    compile_propeller_database,
+    parse_propeller_performance,
+)
+from symbench_athens_client.tests.utils import get_test_file_path
+
+
+class TestPropellerDatabase:
+    @pytest.fixture
+    def propellers_dir(self, tmp_path):
+        propellers_dir = tmp_path / "propellers"
+        propellers_dir.mkdir()
+        for name in ("PER3_6x4.dat", "PER3_5x37E-3.dat", "PER3_74x78C.dat"):
+            shutil.copy(get_test_file_path(name), propellers_dir / name)
+        return propellers_dir
+
+    def test_parse(self):
+        performance = parse_propeller_performance(get_test_file_path("PER3_6x4.dat"))
+        assert set(np.unique(performance["rpm"])) == {1000.0, 2000.0}
+        assert performance[0]["ct"] == 0.1164
+        assert performance[0]["cp"] == 0.0550
+        assert performance[0]["thrust"] == pytest.approx(0.005 * 4.4482216152605)
+
+        si_performance = parse_propeller_performance(
+            get_test_file_path("PER3_5x37E-3.dat")
+        )
+        assert si_performance[0]["ct"] == 0.2372
+        assert si_performance[0]["thrust"] == pytest.approx(0.005 * 4.4482216152605)
+
+        nan_performance = parse_propeller_performance(
+            get_test_file_path("PER3_74x78C.dat")
+        )
+        assert np.isnan(nan_performance["ct"]).sum() == 8
+        assert not np.isnan(nan_performance["j"]).any()
+
+    def test_compile_and_load(self, propellers_dir, tmp_path):
+        db = compile_propeller_database(propellers_dir, tmp_path / "db")
+        assert len(db) == 3
+        assert "PER3_6x4.dat" in db
+        performance = db["PER3_6x4.dat"]
+        assert isinstance(performance.base, np.memmap) or isinstance(
+            performance, np.memmap
+        )
+        np.testing.assert_array_equal(
+            performance, parse_propeller_performance(propellers_dir / "PER3_6x4.dat")
+        )
+        assert list(db.rpms("PER3_6x4.dat")) == [1000.0, 2000.0]
+        assert db.get("PER3_missing.dat") is None
+        with pytest.raises(KeyError):
+            db["PER3_missing.dat"]
+
+        reloaded = PropellerDatabase.for_directory(propellers_dir, tmp_path / "db")
+        assert not reloaded.is_stale(propellers_dir)
+
+        (propellers_dir / "PER3_74x78C.dat").unlink()
+        assert reloaded.is_stale(propellers_dir)
+        recompiled = PropellerDatabase.for_directory(propellers_dir, tmp_path / "db")
+        assert len(recompiled) == 2
@@ -0,0 +1,161 @@
+import csv
+import math
+
+import numpy as np
+import pytest
+
+from symbench_athens_client.results_store import ResultsStore
+
+
+class TestResultsStore:
+    @pytest.fixture
+    def results(self, tmp_path):
+        results = ResultsStore(tmp_path / "results.sqlite", batch_size=3)
+        yield results
+        results.close()
+
+    def test_batched_writes(self, results, tmp_path):
+        results.append({"GUID": "a", "TotalScore": 1.0})
+        results.append({"GUID": "b", "TotalScore": 2.0})
+        assert results.num_buffered == 2
+
+        reader = ResultsStore(tmp_path / "results.sqlite")
+        assert len(reader) == 0
+        results.append({"GUID": "c", "TotalScore": 3.0})
+        assert results.num_buffered == 0
+        assert len(reader) == 3
+        reader.close()
+
+    def test_schema_evolution(self, results):
+        results.extend(
+            [
+                {"GUID": "a", "AnalysisError": False, "TotalScore": 1.5},
+                {"GUID": "b", "AnalysisError": True, "Error": "FDM failed"},
+                {"Error": None, "GUID": "c", "AnalysisError": False, "Length_0": 200},
+            ]
+        )
+        results.append({"GUID": "d", "AnalysisError": False, "Length_0": np.int64(3)})
+        assert results.columns == [
+            "GUID",
+            "AnalysisError",
+            "TotalScore",
+            "Error",
+            "Length_0",
+        ]
+        assert results.select() == [
+            {
+                "GUID": "a",
+                "AnalysisError": False,
+                "TotalScore": 1.5,
+                "Error": None,
+                "Length_0": None,
+            },
+            {
+                "GUID": "b",
+                "AnalysisError": True,
+                "TotalScore": None,
+                "Error": "FDM failed",
+                "Length_0": None,
+            },
+            {
+                "GUID": "c",
+                "AnalysisError": False,
+                "TotalScore": None,
+                "Error": None,
+                "Length_0": 200,
+            },
+            {
+                "GUID": "d",
+                "AnalysisError": False,
+                "TotalScore": None,
+                "Error": None,
+                "Length_0": 3,
+            },
+        ]
+
+    def test_projections_and_filters(self, results):
+        results.extend(
+            {"GUID": str(i), "TotalScore": float(i), "Length_0": 200 + i}
+            for i in range(10)
+        )
+        results.create_index("TotalScore")
+
+        assert results.select(
+            ["GUID"], where='"TotalScore" >= ? AND "Length_0" < ?', parameters=(7, 209)
+        ) == [{"GUID": "7"}, {"GUID": "8"}]
+        assert results.select(["GUID"], limit=2) == [{"GUID": "0"}, {"GUID": "1"}]
+
+        arrays = results.to_arrays(["TotalScore", "GUID"], where='"Length_0" > 207')
+        assert arrays["TotalScore"].dtype == float
+        np.testing.assert_array_equal(arrays["TotalScore"], [8.0, 9.0])
+        assert list(arrays["GUID"]) == ["8", "9"]
+
+        with pytest.raises(KeyError):
+            results.select(["Missing"])
+
+    def test_to_arrays_missing_values(self, results):
+        results.extend([{"TotalScore": 1.0}, {"GUID": "b"}])
+        arrays = results.to_arrays()
+        assert arrays["TotalScore"][0] == 1.0 and math.isnan(arrays["TotalScore"][1])
+        assert list(arrays["GUID"]) == [None, "b"]
+
+    def test_to_csv(self, results, tmp_path):
+        results.extend(
+            [
+                {"GUID": "a", "AnalysisError": False},
+                {"GUID": "b", "AnalysisError": True, "Error": "FDM failed"},
+            ]
+        )
+        results.to_csv(tmp_path / "output.csv")
+        with open(tmp_path / "output.csv") as output_csv:
+            rows = list(csv.DictReader(output_csv))
+        assert rows == [
+            {"GUID": "a", "AnalysisError": "False", "Error": ""},
+            {"GUID": "b", "AnalysisError": "True", "Error": "FDM failed"},
+        ]
+
+    def test_update_csv(self, results, tmp_path):
+        output_csv = tmp_path / "output.csv"
+        writes = []
+        write_csv = results._write_csv
+        results._write_csv = lambda *args: writes.append(args[1:]) or write_csv(*args)
+
+        results.append({"GUID": "a", "TotalScore": 1.0})
+        results.update_csv(output_csv)
+        results.append({"GUID": "b", "TotalScore": 2.0})
+        results.update_csv(output_csv)
+        assert [(mode, len(rows)) for mode, _, rows in writes] == [("w", 1), ("a", 1)]
+
+        results.append({"GUID": "c", "TotalScore": 3.0, "Error": "FDM failed"})
+        results.update_csv(output_csv)
+        assert writes[-1][0] == "w" and len(writes[-1][2]) == 3
+
+        results.update_csv(output_csv, rewrite=True)
+        assert writes[-1][0] == "w"
+
+        with open(output_csv) as csv_file:
+            rows = list(csv.DictReader(csv_file))
+        assert [row["GUID"] for row in rows] == ["a", "b", "c"]
+        assert rows[2]["Error"] == "FDM failed" and rows[0]["Error"] == ""
+
+    def test_untyped_columns(self, results, tmp_path):
+        results.append({"GUID": "a", "AnalysisError": None, "TotalScore": None})
+        results.flush()
+        results.extend(
+            [
+                {"GUID": "b", "AnalysisError": True, "TotalScore": 2},
+                {"GUID": "c", "AnalysisError": False, "TotalScore": 3.5},
+            ]
+        )
+        results.flush()
+
+        expected = [type(None), bool, bool]
+        assert [type(row["AnalysisError"]) for row in results.select()] == expected
+        assert results.to_arrays(["TotalScore"])["TotalScore"][1:].tolist() == [
+            2.0,
+            3.5,
+        ]
+
+        reader = ResultsStore(tmp_path / "results.sqlite")
+        assert [type(row["AnalysisError"]) for row in reader.select()] == expected
+        reader.close()
@@ -0,0 +1,216 @@
+import csv
+import os
+import sys
+import zipfile
+
+import numpy as np
+import pytest
+
+from symbench_athens_client.fdm_cache import FDMResultCache
+from symbench_athens_client.fdm_executor import FDMExecutor
+from symbench_athens_client.fdm_experiment import (
+    FlightDynamicsExperiment,
+    QuadCopterVariableBatteryPropExperiment,
+)
+from symbench_athens_client.models.uav_components import Batteries, Propellers
+from symbench_athens_client.models.uav_designs import QuadCopter
+from symbench_athens_client.tests.utils import get_test_mass_formulae, write_fake_fdm
+
+
+class FakeTestbenchData:
+    def load(self, path):
+        pass
+
+
+def fake_estimator(tb_data):
+    return get_test_mass_formulae()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Uses a shell script as FDM")
+class TestRunMany:
+    @pytest.fixture
+    def experiment(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("SYMBENCH_ATHENS_CACHE_DIR", str(tmp_path / "cache"))
+        monkeypatch.setattr(
+            "symbench_athens_client.fdm_experiment.TestbenchData", FakeTestbenchData
+        )
+        monkeypatch.setattr(
+            "uav_analysis.testbench_data.TestbenchData", FakeTestbenchData
+        )
+
+        testbench = tmp_path / "testbench.zip"
+        with zipfile.ZipFile(testbench, "w") as zip_file:
+            zip_file.writestr("componentMap.json", "[]")
+            zip_file.writestr("connectionMap.json", "[]")
+        (tmp_path / "propellers").mkdir()
+
+        fdm_path = write_fake_fdm(tmp_path / "new_fdm")
+
+        design = QuadCopter()
+        return FlightDynamicsExperiment(
+            design,
+            str(testbench),
+            tmp_path / "propellers",
+            design.__design_vars__,
+            {"requested_vertical_speed", "requested_lateral_speed"},
+            fdm_path=str(fdm_path),
+            estimator=fake_estimator,
+        )
+
+    def test_run_many(self, experiment):
+        parameter_sets = [{"arm_length": 200.0 + 10 * i} for i in range(4)]
+        parameter_sets.append({"arm_length": "not a length"})
+
+        results = list(
+            experiment.run_many(
+                parameter_sets,
+                requirements={"requested_lateral_speed": 20},
+                workers=3,
+            )
+        )
+
+        assert len(results) == 5
+        failed = [metrics for metrics in results if metrics["AnalysisError"]]
+        succeeded = [metrics for metrics in results if not metrics["AnalysisError"]]
+        assert len(failed) == 1 and "Error" in failed[0]
+        assert sorted(metrics["Length_0"] for metrics in succeeded) == [
+            200.0,
+            210.0,
+            220.0,
+            230.0,
+        ]
+        assert experiment.design.arm_length == QuadCopter().arm_length
+
+        for metrics in succeeded:
+            artifacts = experiment.results_dir / "artifacts" / metrics["GUID"]
+            assert metrics["Path_score_Path4"] == 0.0
+            for i in (1, 3, 4, 5):
+                assert (artifacts / f"metrics_Path{i}.out").exists()
+                assert (artifacts / f"FlightDyn_Path{i}.inp").exists()
+                assert not (artifacts / f"Path{i}").exists()
+
+        with open(experiment.results_dir / "output.csv") as output_csv:
+            rows = list(csv.DictReader(output_csv))
+        assert {row["GUID"] for row in rows} == {metrics["GUID"] for metrics in results}
+        assert len(experiment.results) == 5
+        assert experiment.results.select(["GUID"], where='"AnalysisError"') == [
+            {"GUID": failed[0]["GUID"]}
+        ]
+
+    def test_resume(self, experiment):
+        parameter_sets = [{"arm_length": 200.0 + 10 * i} for i in range(3)]
+        requirements = {"requested_lateral_speed": 20}
+        list(experiment.run_many(parameter_sets, requirements=requirements))
+        assert experiment.manifest.counts() == {"done": 3}
+
+        # A rerun in the same session skips the runs which are done
+        assert (
+            list(experiment.run_many(parameter_sets, requirements=requirements)) == []
+        )
+
+        # A failed run and a run interrupted while running are rerun on resuming
+        failed, interrupted, done = experiment.manifest.runs()
+        experiment.manifest.mark_failed(failed["key"], "RuntimeError: killed")
+        experiment.manifest.mark_running(interrupted["key"], "lost-guid")
+        session_id = experiment.session_id
+
+        experiment.start_new_session()
+        assert experiment.session_id != session_id
+        results = list(experiment.resume(session_id, workers=2))
+
+        assert experiment.session_id == session_id
+        assert sorted(metrics["Length_0"] for metrics in results) == [200.0, 210.0]
+        assert experiment.manifest.counts() == {"done": 3}
+        assert {run["key"]: run["attempts"] for run in experiment.manifest.runs()} == {
+            failed["key"]: 2,
+            interrupted["key"]: 3,
+            done["key"]: 1,
+        }
+
+    def test_run_many_keys(self, experiment):
+        parameter_sets = [{"arm_length": 200.0}]
+
+        # The runs are submitted once the results are iterated
+        results = experiment.run_many(parameter_sets)
+        assert experiment.manifest.counts() == {}
+        assert len(list(results)) == 1
+
+        # The design's other parameters are part of the runs' keys
+        experiment.design.support_length = 50.0
+        (metrics,) = experiment.run_many(parameter_sets)
+        assert metrics["Length_0"] == 200.0 and metrics["Length_1"] == 50.0
+        assert experiment.manifest.counts() == {"done": 2}
+        assert list(experiment.run_many(parameter_sets)) == []
+
+    def test_parallel_paths_cached(self, experiment, tmp_path):
+        (tmp_path / "propellers" / "PER3_6x4E.dat").write_text("propeller data")
+        cache = FDMResultCache(cache_dir=tmp_path / "fdm_cache")
+        experiment.executor = FDMExecutor(
+            fdm_path=experiment.executor.fdm_path, cache=cache
+        )
+        parameters = {"arm_length": 220.0}
+        requirements = {"requested_lateral_speed": 20}
+
+        first = experiment.run_for(parameters, requirements, parallel_paths=True)
+        parallel_executor = experiment._parallel_executor
+        assert parallel_executor.cache is cache
+        assert cache.misses == 4 and cache.hits == 0
+
+        second = experiment.run_for(parameters, requirements, parallel_paths=True)
+        assert experiment._parallel_executor is parallel_executor
+        assert cache.hits == 4
+        assert second["TotalPathScore"] == first["TotalPathScore"]
+        artifacts = experiment.results_dir / "artifacts" / second["GUID"]
+        for i in (1, 3, 4, 5):
+            assert (artifacts / f"metrics_Path{i}.out").exists()
+
+        experiment.stop()
+        assert experiment._parallel_executor is None
+        assert parallel_executor._pool is None
+
+    def test_resume_missing_session(self, experiment):
+        with pytest.raises(FileNotFoundError):
+            experiment.resume("e-missing")
+
+    def test_prescreen_parameters(self, experiment, monkeypatch):
+        monkeypatch.setattr(
+            "symbench_athens_client.fdm_experiment.quad_copter_batt_prop",
+            fake_estimator,
+        )
+        experiment = QuadCopterVariableBatteryPropExperiment(
+            experiment.testbenches, experiment.propellers_data
+        )
+        masses = []
+
+        class FakeHoverEstimator:
+            def estimate(self, propellers, motor, batteries, mass):
+                masses.append(mass)
+                return {"thrust_to_weight": np.ones(len(mass))}
+
+        experiment._hover_estimator = FakeHoverEstimator()
+        combination = ([Batteries[0]], [Propellers.apc_propellers_6x4])
+        assert experiment.prescreen(*combination, parameters={"arm_length": 250.0})
+        experiment.prescreen(*combination, parameters={"arm_length": 400.0})
+        experiment.prescreen(*combination, parameters={"not_a_parameter": 400.0})
+        experiment.prescreen(*combination)
+
+        assert masses[1][0] > masses[0][0]
+        assert masses[2][0] == masses[3][0] != masses[0][0]
+
+    def test_run_for_in_run_dirs(self, experiment, tmp_path):
+        metrics = experiment.run_for(
+            parameters={"arm_length": 220.0},
+            requirements={"requested_lateral_speed": 20},
+        )
+
+        assert os.getcwd() == str(tmp_path)
+        assert not list(tmp_path.glob("*.out"))
+        artifacts = experiment.results_dir / "artifacts" / metrics["GUID"]
+        for i in (1, 3, 4, 5):
+            assert (artifacts / f"metrics_Path{i}.out").exists()
+            assert not (artifacts / f"Path{i}").exists()
+
+        with pytest.warns(DeprecationWarning):
+            experiment.run_for(change_dir=True)
+        assert os.getcwd() == str(tmp_path)
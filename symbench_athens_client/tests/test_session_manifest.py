@@ -0,0 +1,66 @@
+import pytest
+
+from symbench_athens_client.session_manifest import SessionManifest
+
+
+class TestSessionManifest:
+    @pytest.fixture
+    def manifest(self, tmp_path):
+        manifest = SessionManifest(tmp_path / "manifest.sqlite")
+        yield manifest
+        manifest.close()
+
+    def test_key(self):
+        assert SessionManifest.key({"a": 1, "b": 2}) == SessionManifest.key(
+            {"b": 2, "a": 1}, {}
+        )
+        assert SessionManifest.key({"a": 1}) != SessionManifest.key(
+            {"a": 1}, {"requested_lateral_speed": 20}
+        )
+        assert SessionManifest.key({"a": 1}) != SessionManifest.key(
+            {"a": 1}, components={"Battery_0": "TurnigyGraphene1000mAh2S75C"}
+        )
+
+    def test_states(self, manifest):
+        key = manifest.submit({"arm_length": 200.0}, {"requested_lateral_speed": 20})
+        assert manifest.state(key) == SessionManifest.PENDING
+        assert manifest.state("missing") is None
+
+        manifest.mark_running(key, "guid-1")
+        manifest.mark_failed(key, "RuntimeError: failed")
+        (run,) = manifest.runs()
+        assert run["state"] == SessionManifest.FAILED
+        assert run["error"] == "RuntimeError: failed"
+        assert run["requirements"] == {"requested_lateral_speed": 20}
+
+        manifest.mark_running(key, "guid-2")
+        manifest.mark_done(key, "guid-2")
+        (run,) = manifest.runs()
+        assert run["state"] == SessionManifest.DONE
+        assert run["guid"] == "guid-2"
+        assert run["error"] is None
+        assert run["attempts"] == 2
+
+        # Submitting a run again keeps its state
+        assert (
+            manifest.submit({"arm_length": 200.0}, {"requested_lateral_speed": 20})
+            == key
+        )
+        assert manifest.state(key) == SessionManifest.DONE
+
+    def test_unfinished(self, manifest, tmp_path):
+        keys = [manifest.submit({"arm_length": 200.0 + i}) for i in range(4)]
+        manifest.mark_running(keys[1])
+        manifest.mark_running(keys[2])
+        manifest.mark_done(keys[2])
+        manifest.mark_failed(keys[3], "failed")
+        manifest.close()
+
+        manifest = SessionManifest(tmp_path / "manifest.sqlite")
+        assert [run["key"] for run in manifest.unfinished()] == [
+            keys[0],
+            keys[1],
+            keys[3],
+        ]
+        assert manifest.counts() == {"pending": 1, "running": 1, "done": 1, "failed": 1}
+        manifest.close()
@@ -1,2 +1,117 @@
+import io
+import zipfile
+
+import pytest
+
+from symbench_athens_client.uav_workflows import UAVWorkflowRunner, convert_csv_rows
+
+
+class FakeResponse:
+    def __init__(self, content, status_code=200):
+        self.content = content
+        self.status_code = status_code
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start : start + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = responses
+        self.requested = []
+
+    def get(self, url, stream=False):
+        assert stream
+        self.requested.append(url)
+        return self.responses[url]
+
+
+class FakeBuild:
+    url = "http://localhost:8080/job/UAV_Workflows/1/"
+
+    def __init__(self, artifacts):
+        self.artifacts = artifacts
+
+    def api_json(self, tree="", depth=0):
+        return {"artifacts": [{"relativePath": path} for path in self.artifacts]}
+
+
 class TestUAVWorkflows:
-    pass  # ToDO
+    @pytest.fixture
+    def runner(self):
+        return UAVWorkflowRunner(
+            jenkins_url="http://localhost:8080",
+            username="user",
+            password="password",
+            gremlin_url="ws://localhost:8182",
+        )
+
+    def test_convert_csv_rows(self):
+        rows = [
+            {"a": "1", "b": "1.5", "c": "True", "d": "[1, 2]", "e": "", "f": "x"},
+            {"a": "2", "b": "2", "c": "False", "d": "None", "e": "3.5", "f": "y"},
+            {"a": "2.5", "b": "nan", "c": "True", "d": "(1,)", "e": "", "f": "1"},
+        ]
+        converted = list(convert_csv_rows(rows))
+        assert converted[0] == {
+            "a": 1,
+            "b": 1.5,
+            "c": True,
+            "d": [1, 2],
+            "e": "",
+            "f": "x",
+        }
+        assert converted[1] == {
+            "a": 2,
+            "b": 2.0,
+            "c": False,
+            "d": None,
+            "e": 3.5,
+            "f": "y",
+        }
+        assert converted[2]["a"] == 2.5
+        assert converted[2]["b"] != converted[2]["b"]  # NaN
+        assert converted[2]["d"] == (1,)
+        assert converted[2]["f"] == 1
+
+        # Unlike eval, expressions are left as strings
+        (row,) = convert_csv_rows([{"a": "__import__('os').getcwd()"}])
+        assert row == {"a": "__import__('os').getcwd()"}
+
+    def test_iter_build_results(self, runner):
+        artifacts = io.BytesIO()
+        with zipfile.ZipFile(artifacts, "w") as zip_file:
+            zip_file.writestr(
+                "output.csv",
+                "GUID,Length_0,AnalysisError\n"
+                + "".join(f"g{i},{200 + i},False\n" for i in range(1000)),
+            )
+        build = FakeBuild(["archive/data.zip"])
+        runner._session = FakeSession(
+            {
+                f"{build.url}artifact/archive/data.zip": FakeResponse(
+                    artifacts.getvalue()
+                )
+            }
+        )
+
+        results = runner.iter_build_results(build)
+        assert not isinstance(results, list)
+        first = next(results)
+        assert first == {"GUID": "g0", "Length_0": 200, "AnalysisError": False}
+        assert len(list(results)) == 999
+
+        assert list(runner.iter_build_results(FakeBuild([]))) == []
+
+        runner._session = FakeSession(
+            {f"{build.url}artifact/archive/data.zip": FakeResponse(b"", 404)}
+        )
+        with pytest.raises(FileNotFoundError):
+            runner.iter_build_results(build)
@@ -1,9 +1,29 @@
+import pickle
+
+import numpy as np
 import pytest
 
 from symbench_athens_client.exceptions import PropellerAssignmentError
 from symbench_athens_client.models.uav_components import Propellers
 from symbench_athens_client.models.uav_designs import QuadCopter
-from symbench_athens_client.utils import assign_propellers_quadcopter
+from symbench_athens_client.tests.utils import get_test_mass_formulae
+from symbench_athens_client.utils import (
+    MassFormulae,
+    assign_propellers_quadcopter,
+    clear_mass_formulae_cache,
+    estimate_mass_formulae,
+    get_mass_estimates_for_quadcopter,
+    get_mass_parameters_for_quadcopter,
+    get_propeller_pairs,
+    get_runnable_propellers,
+)
+
+ESTIMATOR_CALLS = []
+
+
+def counting_estimator(tb_data):
+    ESTIMATOR_CALLS.append(tb_data)
+    return get_test_mass_formulae()
 
 
 class TestUtils:
@@ -40,3 +60,146 @@ class TestUtils:
         assert (
             design.propeller_1.name == design.propeller_3.name == "apc_propellers_6x4E"
         )
+
+    def test_propeller_pairs(self):
+        pairs = get_propeller_pairs("uav")
+        assert pairs["apc_propellers_6x4EP"] == Propellers.apc_propellers_6x4E
+        assert pairs["apc_propellers_6x4E"] == Propellers.apc_propellers_6x4EP
+        assert "apc_propellers_17x10N" not in pairs
+        for name, twin in pairs.items():
+            assert twin.performance_file == Propellers[name].performance_file
+            assert twin.direction == -Propellers[name].direction
+
+        runnable = get_runnable_propellers("uav")
+        assert set(runnable) == set(pairs)
+        assert runnable == [name for name in Propellers.all if name in pairs]
+
+        with pytest.raises(ValueError):
+            get_propeller_pairs("ufo")
+
+    def test_mass_formulae_evaluate(self):
+        design = QuadCopter(
+            arm_length=250.0, support_length=30.0, batt_mount_x_offset=5.0
+        )
+        expected = get_mass_estimates_for_quadcopter(get_test_mass_formulae(), design)
+        estimates = get_mass_estimates_for_quadcopter(
+            MassFormulae(get_test_mass_formulae()), design
+        )
+        assert estimates.keys() == expected.keys()
+        for key, value in estimates.items():
+            assert isinstance(value, float)
+            assert value == pytest.approx(float(expected[key]))
+
+    def test_mass_formulae_evaluate_batch(self):
+        formulae = MassFormulae(get_test_mass_formulae())
+        designs = [QuadCopter(arm_length=length) for length in (100.0, 200.0, 300.0)]
+        parameters = [get_mass_parameters_for_quadcopter(design) for design in designs]
+
+        by_name = formulae.evaluate_batch(
+            {name: [p[name] for p in parameters] for name in formulae.symbols}
+        )
+        by_matrix = formulae.evaluate_batch(
+            np.array([[p[name] for name in formulae.symbols] for p in parameters])
+        )
+        for i, params in enumerate(parameters):
+            single = formulae.evaluate(params)
+            for key in formulae:
+                assert by_name[key].shape == (3,)
+                assert by_name[key][i] == by_matrix[key][i] == single[key]
+
+        with pytest.raises(ValueError):
+            formulae.evaluate_batch(np.zeros((3, 1)))
+
+    def test_mass_formulae_mutations(self):
+        import sympy
+
+        formulae = MassFormulae(get_test_mass_formulae())
+        x = sympy.Symbol("x")
+        mutations = [
+            lambda f: f.update({"aircraft.extra": x}),
+            lambda f: f.pop("aircraft.extra"),
+            lambda f: f.setdefault("aircraft.extra", x),
+            lambda f: f.__ior__({"aircraft.extra": 2 * x}),
+            lambda f: f.__setitem__("aircraft.extra", x),
+            lambda f: f.__delitem__("aircraft.extra"),
+            lambda f: f.clear(),
+        ]
+        for mutate in mutations:
+            formulae.symbols
+            formulae._get_compiled()
+            mutate(formulae)
+            assert formulae._compiled is None and formulae._symbols is None
+
+        formulae.update({"aircraft.extra": x})
+        formulae.evaluate_batch({"x": [1.0]})
+        formulae.popitem()
+        assert formulae._compiled is None and formulae.symbols == []
+
+    def test_mass_formulae_pickle(self):
+        formulae = MassFormulae(get_test_mass_formulae())
+        formulae.evaluate_batch(np.ones((1, len(formulae.symbols))))
+        restored = pickle.loads(pickle.dumps(formulae))
+        assert restored == formulae
+        assert restored.symbols == formulae.symbols
+
+    def test_mass_formulae_disk_cache(self, tmp_path, monkeypatch):
+        class FakeTestbenchData:
+            def load(self, path):
+                pass
+
+        monkeypatch.setenv("SYMBENCH_ATHENS_CACHE_DIR", str(tmp_path / "cache"))
+        monkeypatch.setattr(
+            "uav_analysis.testbench_data.TestbenchData", FakeTestbenchData
+        )
+        testbench = tmp_path / "testbench.zip"
+        testbench.write_bytes(b"testbench data")
+        ESTIMATOR_CALLS.clear()
+
+        try:
+            formulae = estimate_mass_formulae(str(testbench), counting_estimator)
+            assert len(ESTIMATOR_CALLS) == 1
+            assert len(list((tmp_path / "cache" / "mass_formulae").glob("*.pkl"))) == 1
+
+            estimate_mass_formulae.cache_clear()
+            cached = estimate_mass_formulae(str(testbench), counting_estimator)
+            assert len(ESTIMATOR_CALLS) == 1
+            assert isinstance(cached, MassFormulae) and cached == formulae
+
+            estimate_mass_formulae.cache_clear()
+            testbench.write_bytes(b"other testbench data")
+            estimate_mass_formulae(str(testbench), counting_estimator)
+            assert len(ESTIMATOR_CALLS) == 2
+
+            clear_mass_formulae_cache()
+            assert not (tmp_path / "cache" / "mass_formulae").exists()
+            estimate_mass_formulae(str(testbench), counting_estimator)
+            assert len(ESTIMATOR_CALLS) == 3
+        finally:
+            estimate_mass_formulae.cache_clear()
+
+    def test_mass_formulae_disk_cache_without_key(self, tmp_path, monkeypatch):
+        class FakeTestbenchData:
+            def load(self, path):
+                pass
+
+        def no_version(name):
+            raise ImportError("No module named 'importlib.metadata'")
+
+        monkeypatch.setenv("SYMBENCH_ATHENS_CACHE_DIR", str(tmp_path / "cache"))
+        monkeypatch.setattr(
+            "uav_analysis.testbench_data.TestbenchData", FakeTestbenchData
+        )
+        monkeypatch.setattr(
+            "symbench_athens_client.utils._distribution_version", no_version
+        )
+        testbench = tmp_path / "testbench.zip"
+        testbench.write_bytes(b"testbench data")
+        ESTIMATOR_CALLS.clear()
+
+        try:
+            formulae = estimate_mass_formulae(str(testbench), counting_estimator)
+            assert isinstance(formulae, MassFormulae)
+            assert len(ESTIMATOR_CALLS) == 1
+            assert not (tmp_path / "cache" / "mass_formulae").exists()
+        finally:
+            estimate_mass_formulae.cache_clear()
@@ -1,6 +1,54 @@
+import stat
 from pathlib import Path
 
 
 def get_test_file_path(filename):
     """Given a filename prepend it with the correct test data location"""
     return str(Path(__file__).resolve().parent / "assets" / filename)
+
+
+def get_test_mass_formulae():
+    """Simple sympy mass formulae for a quadcopter, with the same keys as the uav_analysis estimators"""
+    import sympy
+
+    arm_length, support_length, batt_x, batt_z = sympy.symbols(
+        "Length_0 Length_1 Length_8 Length_9"
+    )
+    battery_weight, prop_weight = sympy.symbols("Battery_0_Weight Prop_0_Weight")
+    mass = battery_weight + 4 * prop_weight + (arm_length + support_length) / 1000
+
+    formulae = {
+        "aircraft.mass": mass,
+        "aircraft.x_cm": batt_x * battery_weight / mass,
+        "aircraft.y_cm": 0.0,
+        "aircraft.z_cm": batt_z * battery_weight / mass,
+        "aircraft.Ixx": mass * arm_length**2 / 1e6,
+        "aircraft.Iyy": mass * arm_length**2 / 1e6,
+        "aircraft.Izz": 2 * mass * arm_length**2 / 1e6,
+    }
+    for i, (x, y) in enumerate([(1, 1), (-1, 1), (-1, -1), (1, -1)]):
+        formulae[f"aircraft.Prop_{i}_x"] = x * arm_length
+        formulae[f"aircraft.Prop_{i}_y"] = y * arm_length
+        formulae[f"aircraft.Prop_{i}_z"] = -support_length
+    return formulae
+
+
+def write_fake_fdm(fdm_path):
+    """Write a shell script standing in for the FDM executable, returning its path.
+
+    The script writes the test metrics.out (for the flight path of its input) and a
+    score.out in its working directory, the report to its stdout, and records every
+    run in an invocations file next to it.
+    """
+    fdm_path = Path(fdm_path)
+    fdm_path.write_text(
+        "#!/bin/sh\n"
+        "path=$(grep i_flight_path | awk '{print $3}')\n"
+        'sed "s/flight path            1/flight path            $path/" '
+        f"{get_test_file_path('no_trim_state_metrics.out')} > metrics.out\n"
+        "touch score.out\n"
+        'echo run >> "$(dirname "$0")/invocations"\n'
+        "echo 'FDM Report'\n"
+    )
+    fdm_path.chmod(fdm_path.stat().st_mode | stat.S_IEXEC)
+    return str(fdm_path)
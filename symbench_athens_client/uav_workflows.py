@@ -1,14 +1,14 @@
-import contextlib
+import ast
 import csv
 import io
 import logging
 import time
 import zipfile
-from tempfile import TemporaryDirectory
+from tempfile import SpooledTemporaryFile
 
 import requests
 
-from symbench_athens_client.athens_graphdb_client import SymbenchAthensGraphDBClient
+from symbench_athens_client.athens_graphdb_client import GraphDBClientPool
 from symbench_athens_client.athens_jenkins_client import SymbenchAthensJenkinsClient
 from symbench_athens_client.models.pipelines import SwapComponent
 from symbench_athens_client.models.uav_pipelines import (
@@ -24,6 +24,84 @@ from symbench_athens_client.models.uav_pipelines import (
 )
 from symbench_athens_client.utils import get_logger
 
+# Artifacts smaller than this are kept in memory while parsed, larger ones in a temporary file
+ARTIFACTS_SPOOL_SIZE = 32 * 1024 * 1024
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def convert_csv_rows(rows):
+    """Convert the values of csv rows (e.g. from a csv.DictReader) to python types, by column.
+
+    The type of a column (int, float, bool, None or a python literal such as a list)
+    is inferred from its first value and used to convert the rest of its values,
+    falling back to inferring the type of values which don't convert. Values which
+    aren't literals are left as strings.
+
+    Parameters
+    ----------
+    rows: iterable of dict
+        The rows to convert
+
+    Yields
+    ------
+    dict
+        The converted rows
+    """
+    converters = {}
+    for row in rows:
+        for key, value in row.items():
+            converter = converters.get(key)
+            if converter is not None:
+                try:
+                    row[key] = converter(value)
+                    continue
+                except (
+                    ValueError,
+                    SyntaxError,
+                    TypeError,
+                    MemoryError,
+                    RecursionError,
+                ):
+                    pass
+            row[key], converters[key] = _infer_value(value)
+        yield row
+
+
+def _to_bool(value):
+    if value == "True":
+        return True
+    if value == "False":
+        return False
+    raise ValueError(f"{value} is not a bool")
+
+
+def _to_none(value):
+    if value == "None":
+        return None
+    raise ValueError(f"{value} is not None")
+
+
+def _to_literal(value):
+    if not value.lstrip().startswith(("[", "(", "{", "'", '"')):
+        raise ValueError(f"{value} is not a literal")
+    return ast.literal_eval(value)
+
+
+_CONVERTERS = (int, float, _to_bool, _to_none, _to_literal)
+
+
+def _infer_value(value):
+    """Convert a value with the first converter it converts with, returning the value and the converter"""
+    if value is None:  # Missing from a short row
+        return value, None
+    for converter in _CONVERTERS:
+        try:
+            return converter(value), converter
+        except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+            continue
+    return value, None
+
 
 class UAVWorkflowRunner:
     """UAVWorkflow Runner class.
@@ -43,6 +121,8 @@ class UAVWorkflowRunner:
         The URL for the graph-database
     log_level: int, default=10
         The log verbosity
+    graphdb_pool_size: int, default=4
+        The maximum number of connections to the graph-database, shared by concurrent workflows
 
     See Also
     --------
@@ -55,26 +135,35 @@ class UAVWorkflowRunner:
     """
 
     def __init__(
-        self, jenkins_url, username, password, gremlin_url, log_level=logging.DEBUG
+        self,
+        jenkins_url,
+        username,
+        password,
+        gremlin_url,
+        log_level=logging.DEBUG,
+        graphdb_pool_size=4,
     ):
         self.jenkins_client = SymbenchAthensJenkinsClient(
             jenkins_url, username, password, log_level
         )
         self.gremlin_url = gremlin_url
         self.logger = get_logger(self.__class__.__name__, log_level)
+        # Connected on demand, and kept open across workflows
+        self.graphdb_pool = GraphDBClientPool(
+            gremlin_url, pool_size=graphdb_pool_size, log_level=log_level
+        )
+        self._session = None
 
-    @contextlib.contextmanager
-    def graphdb_client(self):  # ToDo: is this the best way to handle this?
-        """Get an instance of the graphdb client."""
-        try:
-            graphdb_client = SymbenchAthensGraphDBClient(
-                gremlin_url=self.gremlin_url, log_level=self.logger.getEffectiveLevel()
-            )
-            yield graphdb_client
-        except Exception as e:
-            raise e
-        finally:
-            graphdb_client.close()
+    def graphdb_client(self):
+        """Borrow a graphdb client from the runner's pool (a context manager)."""
+        return self.graphdb_pool.client()
+
+    def close(self):
+        """Close the connections to the graph-database and the jenkins server"""
+        self.graphdb_pool.close()
+        self.jenkins_client.close()
+        if self._session is not None:
+            self._session.close()
 
     def clone_design(self, design):
         """Clone a design from the graph database
@@ -129,38 +218,66 @@ class UAVWorkflowRunner:
 
         design.clear_swap()
 
+    @property
+    def session(self):
+        """The HTTP session (with the jenkins credentials) to download artifacts with"""
+        if self._session is None:
+            self._session = requests.Session()
+            self._session.auth = (
+                self.jenkins_client.username,
+                self.jenkins_client.password,
+            )
+        return self._session
+
+    def iter_build_results(self, build):
+        """Iterate over the results (the rows of output.csv in its artifacts) of a build
+
+        The artifacts are streamed into a spooled temporary file (in memory while small)
+        and output.csv is parsed as it is read, with the values converted by the type of
+        their column (see convert_csv_rows).
+
+        Parameters
+        ----------
+        build: api4jenkins.build.Build
+            The (finished) build to get the results of
+
+        Returns
+        -------
+        iterator of dict
+            The rows of output.csv, empty if the build has no artifacts
+        """
+        build_artifacts = build.api_json(tree="artifacts[relativePath]")["artifacts"]
+        if not len(build_artifacts):
+            return iter(())
+
+        artifact_url = f'{build.url}artifact/{build_artifacts[0]["relativePath"]}'
+        artifacts = SpooledTemporaryFile(max_size=ARTIFACTS_SPOOL_SIZE)
+        try:
+            with self.session.get(artifact_url, stream=True) as response:
+                if response.status_code != 200:
+                    raise FileNotFoundError(
+                        f"Failed to download the artifacts at {artifact_url}, "
+                        f"status: {response.status_code}"
+                    )
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    artifacts.write(chunk)
+            artifacts.seek(0)
+        except Exception:
+            artifacts.close()
+            raise
+
+        return self._iter_artifact_rows(artifacts)
+
+    @staticmethod
+    def _iter_artifact_rows(artifacts):
+        with artifacts, zipfile.ZipFile(artifacts) as zip_file:
+            with zip_file.open("output.csv") as csv_file:
+                csv_text = io.TextIOWrapper(csv_file, encoding="utf-8", newline="")
+                yield from convert_csv_rows(csv.DictReader(csv_text))
+
     def _results_from_build(self, build):
         """Return results from a particular build as a list of dictionaries"""
-        build_artifacts = build.api_json()["artifacts"]
-        if len(build_artifacts):
-            artifact_url = f'{build.url}artifact/{build_artifacts[0]["relativePath"]}'
-            with TemporaryDirectory() as tmpdir:
-                response = requests.get(
-                    artifact_url,
-                    auth=(self.jenkins_client.username, self.jenkins_client.password),
-                )
-                if response.status_code != 200:
-                    raise FileNotFoundError
-                else:
-                    artifacts_content = response.content
-                    filename = f"{tmpdir}/data.zip"
-                    with open(filename, "wb") as zip_artifact:
-                        zip_artifact.write(artifacts_content)
-
-                    with zipfile.ZipFile(filename) as zip_file:
-                        with zip_file.open("output.csv") as csv_file:
-                            csv_str = csv_file.read().decode("utf-8")
-                            rows = csv.DictReader(io.StringIO(csv_str))
-                            ops = []
-                            for row in rows:
-                                for k, v in row.items():
-                                    try:
-                                        row[k] = eval(v)
-                                    except (SyntaxError, NameError):
-                                        pass
-                                ops.append(row)
-
-                            return ops
+        return list(self.iter_build_results(build))
 
     def _run_uav_workflow(self, pipeline):
         """Run a UAV Workflow instance
@@ -178,10 +295,56 @@ class UAVWorkflowRunner:
         build = self.jenkins_client.build_and_wait(
             pipeline.pipeline_name, parameters=pipeline.to_jenkins_parameters()
         )
-        while not build.api_json()["artifacts"]:
+        return self._wait_for_results(build)
+
+    def _wait_for_results(self, build):
+        while not build.api_json(tree="artifacts[relativePath]")["artifacts"]:
             time.sleep(2)
         return self._results_from_build(build)
 
+    def run_workflows(self, pipelines, max_in_flight=4):
+        """Run many UAV Workflow instances (of the same pipeline) concurrently
+
+        Unlike the run_*/fly_* methods, the designs are not cloned, swapped or cleared,
+        which should be done beforehand. A failing workflow doesn't stop the others.
+
+        Parameters
+        ----------
+        pipelines: iterable of symbench_athens_client.models.uav_pipelines.UAVWorkflow
+            The UAV Workflow instances to run
+        max_in_flight: int, default=4
+            The maximum number of workflows queued or running at once in Jenkins
+
+        Yields
+        ------
+        tuple of (UAVWorkflow, list of dict or Exception)
+            Every workflow with its results (logged in output.csv as a list of dictionaries),
+            or the error it failed with, in the order they finish
+        """
+        pipelines = list(pipelines)
+        pipeline_names = {pipeline.pipeline_name for pipeline in pipelines}
+        if len(pipeline_names) > 1:
+            raise ValueError(
+                f"Expected the workflows of a single pipeline, got {sorted(pipeline_names)}"
+            )
+        if not pipelines:
+            return
+
+        for submitted in self.jenkins_client.submit_many(
+            pipeline_names.pop(),
+            (pipeline.to_jenkins_parameters() for pipeline in pipelines),
+            max_in_flight=max_in_flight,
+        ):
+            pipeline = pipelines[submitted.index]
+            if submitted.error is not None:
+                yield pipeline, submitted.error
+                continue
+            try:
+                results = self._wait_for_results(submitted.build)
+            except Exception as e:
+                results = e
+            yield pipeline, results
+
     def run_hover_calc(self, design, num_samples=1, clone=True, clear=True):
         """Run HoverCalc test bench on the design
 
@@ -1,17 +1,16 @@
+import hashlib
 import logging
 import os
+import pickle
 import shutil
 import zipfile
 from functools import lru_cache
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Mapping
 
-from parea.main import _calculate_projected_area
-from uav_analysis.mass_properties_hackathon1 import quad_copter_fixed_bemp2
-from uav_analysis.testbench_data import TestbenchData
+import numpy as np
 
 from symbench_athens_client.exceptions import PropellerAssignmentError
-from symbench_athens_client.models.design_state_creo import ProjectedAreas
 
 
 def get_logger(name, level=logging.DEBUG):
@@ -38,6 +37,18 @@ def get_data_file_path(filename):
     return resource_filename("symbench_athens_client", f"data/{filename}")
 
 
+def get_cache_dir(*parts):
+    """Get the full path of a directory in the package's cache directory.
+
+    The cache directory is $SYMBENCH_ATHENS_CACHE_DIR if set, ~/.cache/symbench_athens_client otherwise.
+    """
+    cache_dir = os.environ.get(
+        "SYMBENCH_ATHENS_CACHE_DIR",
+        Path.home() / ".cache" / "symbench_athens_client",
+    )
+    return Path(cache_dir, *parts)
+
+
 def inject_none_for_missing_fields_and_nans(cls, values):
     """Given a BaseModel class and a dictionary to populate its fields, inject None for missing fields."""
     for field_name, field_info in cls.__fields__.items():
@@ -62,23 +73,272 @@ def dict_to_design_vars(inp_dict, repeat_values=True):
     ).rstrip()
 
 
+class MassFormulae(dict):
+    """The mass property formulae of a design, compiled for fast numeric evaluation.
+
+    A dictionary of sympy expressions keyed by the mass property (e.g. aircraft.mass).
+    All the formulae are compiled (with sympy.lambdify) into a single NumPy function the
+    first time they are evaluated, which is much faster than evaluating each formula with
+    sympy's evalf and can evaluate the properties of many designs in one vectorized call.
+
+    The evaluated properties are Python floats, not sympy Floats, so they are written
+    to the flight dynamics input files with their full precision (repr) rather than
+    the 15 significant digits of a sympy Float.
+    """
+
+    def __init__(self, formulae=()):
+        super().__init__(formulae)
+        self._compiled = None
+        self._symbols = None
+
+    @property
+    def symbols(self):
+        """The (sorted) names of the design variables these formulae depend on"""
+        if self._symbols is None:
+            import sympy
+
+            free_symbols = set()
+            for formula in self.values():
+                free_symbols.update(sympy.sympify(formula).free_symbols)
+            self._symbols = sorted((str(symbol) for symbol in free_symbols))
+        return self._symbols
+
+    def evaluate(self, parameters):
+        """Evaluate the formulae for a single design.
+
+        Parameters
+        ----------
+        parameters: dict
+            The values of the design variables (see `symbols`)
+
+        Returns
+        -------
+        dict
+            The value of every mass property of the design
+        """
+        return {
+            key: float(value)
+            for key, value in self.evaluate_batch(
+                {name: parameters[name] for name in self.symbols}
+            ).items()
+        }
+
+    def evaluate_batch(self, parameters):
+        """Evaluate the formulae for many designs at once.
+
+        Parameters
+        ----------
+        parameters: dict or array_like
+            The values of the design variables, either as a mapping from every name in `symbols`
+            to an array of values (or a scalar) or as a 2D array with a row per design and a column per symbol
+
+        Returns
+        -------
+        dict of numpy.ndarray
+            The values of every mass property, for every design
+        """
+        if isinstance(parameters, Mapping):
+            columns = [
+                np.asarray(parameters[name], dtype=float) for name in self.symbols
+            ]
+            shape = np.broadcast(*columns).shape if columns else ()
+        else:
+            parameters = np.atleast_2d(np.asarray(parameters, dtype=float))
+            if parameters.shape[1] != len(self.symbols):
+                raise ValueError(
+                    f"Expected {len(self.symbols)} columns ({', '.join(self.symbols)}), "
+                    f"got {parameters.shape[1]} instead"
+                )
+            columns = list(parameters.T)
+            shape = parameters.shape[:1]
+
+        values = self._get_compiled()(*columns)
+
+        return {
+            key: np.broadcast_to(np.asarray(value, dtype=float), shape)
+            for key, value in zip(self.keys(), values)
+        }
+
+    def _get_compiled(self):
+        if self._compiled is None:
+            import sympy
+
+            self._compiled = sympy.lambdify(
+                [sympy.Symbol(name) for name in self.symbols],
+                [sympy.sympify(formula) for formula in self.values()],
+                modules="numpy",
+                dummify=True,
+            )
+        return self._compiled
+
+    def _invalidate(self):
+        self._compiled = None
+        self._symbols = None
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._invalidate()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._invalidate()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._invalidate()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self._invalidate()
+        return super().setdefault(key, default)
+
+    def pop(self, key, *args):
+        if key in self:
+            self._invalidate()
+        return super().pop(key, *args)
+
+    def popitem(self):
+        item = super().popitem()
+        self._invalidate()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._invalidate()
+
+    def __reduce__(self):
+        # The compiled function can't be pickled, its recompiled when needed
+        return self.__class__, (dict(self),)
+
+
 @lru_cache(maxsize=128)
-def estimate_mass_formulae(tb_data_locs, estimator=quad_copter_fixed_bemp2):
-    """Estimate mass properties of a design based on a fixed BEMP config testbench"""
+def estimate_mass_formulae(tb_data_locs, estimator=None, use_disk_cache=True):
+    """Estimate mass properties of a design based on a fixed BEMP config testbench
+
+    Fitting the formulae is slow, so they are also cached on disk (in the package's cache
+    directory), keyed by the contents of the testbench data and the estimator's name and
+    version. Use `clear_mass_formulae_cache` to invalidate the cache. If the cache key can't
+    be computed, the disk cache is skipped and the formulae are fitted.
+
+    The cached formulae are pickled, loading them unpickles whatever is in the cache
+    directory, so it must only be writable by trusted users (pass use_disk_cache=False
+    or set $SYMBENCH_ATHENS_CACHE_DIR otherwise).
+
+    Parameters
+    ----------
+    tb_data_locs: str, pathlib.Path or iterable of str, pathlib.Path
+        The testbench data (zip file) location(s) to fit the formulae with
+    estimator: function, default=None
+        The estimator function from the uav_analysis library, if None quad_copter_fixed_bemp2 is used
+    use_disk_cache: bool, default=True
+        If False, do not load (or save) the formulae from the disk cache
+
+    Returns
+    -------
+    MassFormulae
+        The mass property formulae for the design, with a compiled numeric evaluator
+    """
+    from uav_analysis.testbench_data import TestbenchData
+
     if estimator is None:
+        from uav_analysis.mass_properties_hackathon1 import quad_copter_fixed_bemp2
+
         estimator = quad_copter_fixed_bemp2
-    tb_data_loc = list(tb_data_locs)
 
-    tb_data = TestbenchData()
-    if not isinstance(tb_data_loc, (list, set, tuple)):
-        tb_data_loc = [tb_data_loc]
+    if isinstance(tb_data_locs, (str, Path)):
+        tb_data_locs = [tb_data_locs]
+    tb_data_loc = [str(Path(data_loc).resolve()) for data_loc in tb_data_locs]
 
-    tb_data_loc = [str(Path(data_loc).resolve()) for data_loc in tb_data_loc]
+    cache_file = None
+    if use_disk_cache:
+        try:
+            cache_file = get_cache_dir(
+                "mass_formulae", f"{_mass_formulae_key(tb_data_loc, estimator)}.pkl"
+            )
+        except Exception as e:
+            get_logger(__name__).warning(
+                f"Skipping the disk cache of the mass formulae, no cache key: {e}"
+            )
+
+    if cache_file is not None:
+        try:
+            with open(cache_file, "rb") as cached:
+                return pickle.load(cached)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            get_logger(__name__).warning(
+                f"Ignoring the unreadable cached formulae {cache_file}: {e}"
+            )
 
+    tb_data = TestbenchData()
     for data_path in tb_data_loc:
         tb_data.load(data_path)
 
-    return estimator(tb_data)
+    formulae = MassFormulae(estimator(tb_data))
+
+    if cache_file is not None:
+        try:
+            os.makedirs(cache_file.parent, exist_ok=True)
+            tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_file, "wb") as cached:
+                pickle.dump(formulae, cached)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            get_logger(__name__).warning(
+                f"Couldn't cache the mass formulae in {cache_file}: {e}"
+            )
+
+    return formulae
+
+
+def clear_mass_formulae_cache():
+    """Invalidate the (in memory and on disk) cached formulae of estimate_mass_formulae"""
+    estimate_mass_formulae.cache_clear()
+    shutil.rmtree(get_cache_dir("mass_formulae"), ignore_errors=True)
+
+
+def _mass_formulae_key(tb_data_locs, estimator):
+    """The hash of the testbench data contents, the estimator and its version"""
+    import sympy
+
+    estimator_version = _distribution_version("uav-analysis")
+
+    digest = hashlib.sha256()
+    digest.update(
+        f"{estimator.__module__}.{estimator.__qualname__}:{estimator_version}".encode()
+    )
+    digest.update(f"sympy:{sympy.__version__}".encode())
+    for data_loc in sorted(tb_data_locs):
+        with open(data_loc, "rb") as data_file:
+            for chunk in iter(lambda: data_file.read(1024 * 1024), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _distribution_version(name):
+    """The installed version of a distribution, "unknown" if it isn't installed"""
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:  # Python < 3.8
+        try:
+            from importlib_metadata import PackageNotFoundError, version
+        except ImportError:
+            from pkg_resources import DistributionNotFound, get_distribution
+
+            try:
+                return get_distribution(name).version
+            except DistributionNotFound:
+                return "unknown"
+
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return "unknown"
 
 
 def get_mass_estimates_for_quadcopter(testbench_path_or_formulae, quad_copter):
@@ -102,6 +362,32 @@ def get_mass_estimates_for_quadcopter(testbench_path_or_formulae, quad_copter):
         quad_copter, QuadCopter
     ), "The function estimator only works for quadcopter seed design"
 
+    aircraft_parameters = get_mass_parameters_for_quadcopter(quad_copter)
+
+    if isinstance(testbench_path_or_formulae, (str, Path)):
+        formulae = estimate_mass_formulae(testbench_path_or_formulae)
+    else:
+        formulae = testbench_path_or_formulae
+
+    if isinstance(formulae, MassFormulae):
+        return {
+            key.replace("aircraft.", ""): value
+            for key, value in formulae.evaluate(aircraft_parameters).items()
+        }
+
+    mass_properties = {}
+    for key, value in formulae.items():
+        mass_estimates_key = key.replace("aircraft.", "")
+        try:
+            mass_properties[mass_estimates_key] = value.evalf(subs=aircraft_parameters)
+        except AttributeError:
+            mass_properties[mass_estimates_key] = value
+
+    return mass_properties
+
+
+def get_mass_parameters_for_quadcopter(quad_copter):
+    """Get the values of the variables used by the mass property formulae for a quadcopter"""
     aircraft_parameters = quad_copter.dict(
         by_alias=True, include=quad_copter.__design_vars__
     )
@@ -118,21 +404,7 @@ def get_mass_estimates_for_quadcopter(testbench_path_or_formulae, quad_copter):
             "Prop_0_Thickness": quad_copter.propeller_0.hub_thickness,
         }
     )
-
-    if isinstance(testbench_path_or_formulae, (str, Path)):
-        formulae = estimate_mass_formulae(testbench_path_or_formulae)
-    else:
-        formulae = testbench_path_or_formulae
-
-    mass_properties = {}
-    for key, value in formulae.items():
-        mass_estimates_key = key.replace("aircraft.", "")
-        try:
-            mass_properties[mass_estimates_key] = value.evalf(subs=aircraft_parameters)
-        except AttributeError:
-            mass_properties[mass_estimates_key] = value
-
-    return mass_properties
+    return aircraft_parameters
 
 
 def extract_from_zip(zip_path, output_dir, files):
@@ -172,41 +444,73 @@ def assign_propellers_quadcopter(quad_design, propeller):
     if isinstance(propeller, str):
         propeller = Propellers[propeller]
 
-    propellers = list(
-        filter(lambda p: p.performance_file == propeller.performance_file, Propellers)
-    )
-    prop_0, prop_1, prop_2, prop_3 = (None,) * 4
+    opposite_propeller = get_propeller_pairs(propeller.corpus).get(propeller.name)
 
-    if propeller.direction == -1:
-        prop_0 = propeller
-        prop_2 = propeller
-        for prop in propellers:
-            if prop.direction == -1 * propeller.direction:
-                prop_1 = prop
-                prop_3 = prop
-    else:
-        prop_1 = propeller
-        prop_3 = propeller
-        for prop in propellers:
-            if prop.direction == -1 * propeller.direction:
-                prop_0 = prop
-                prop_2 = prop
-
-    if not all(isinstance(p, Propeller) for p in [prop_0, prop_1, prop_2, prop_3]):
+    if opposite_propeller is None:
         raise PropellerAssignmentError(
             "Error in assigning Propeller to the quadcopter design. "
             "Exact same propeller with opposite spin than provided propeller "
             "doesn't not exist in the database."
         )
 
-    quad_design.propeller_0 = prop_0
-    quad_design.propeller_1 = prop_1
-    quad_design.propeller_2 = prop_2
-    quad_design.propeller_3 = prop_3
+    if propeller.direction == -1:
+        prop_0, prop_1 = propeller, opposite_propeller
+    else:
+        prop_0, prop_1 = opposite_propeller, propeller
+
+    quad_design.assign_components(
+        propeller_0=prop_0,
+        propeller_1=prop_1,
+        propeller_2=prop_0,
+        propeller_3=prop_1,
+    )
 
     quad_design.validate_propellers_directions()
 
 
+@lru_cache(maxsize=None)
+def get_propeller_pairs(corpus="uav"):
+    """Map the name of every propeller to its twin with the opposite spin (with the same performance file).
+
+    Propellers without a twin are missing from the mapping. The pairs are found once per corpus.
+
+    Parameters
+    ----------
+    corpus: str, default="uav"
+        The corpus of the propellers, uav or uam
+
+    Returns
+    -------
+    dict
+        The opposite spin Propeller of every propeller (by name)
+    """
+    pairs = {}
+    for propellers in _get_propellers(corpus).index("performance_file").values():
+        for propeller in propellers:
+            opposite_propellers = [
+                other for other in propellers if other.direction == -propeller.direction
+            ]
+            if opposite_propellers:
+                pairs[propeller.name] = opposite_propellers[-1]
+    return pairs
+
+
+def get_runnable_propellers(corpus="uav"):
+    """The names of the propellers that can be assigned to a quadcopter (the ones with an opposite spin twin)"""
+    pairs = get_propeller_pairs(corpus)
+    return [name for name in _get_propellers(corpus).all if name in pairs]
+
+
+def _get_propellers(corpus):
+    if corpus == "uav":
+        from symbench_athens_client.models.uav_components import Propellers
+    elif corpus == "uam":
+        from symbench_athens_client.models.uam_components import Propellers
+    else:
+        raise ValueError("corpus can only be either `uav` or `uam`")
+    return Propellers
+
+
 def create_directory(dir_name, clear_contents=False):
     """Create a directory."""
     dir_path = Path(dir_name).resolve()
@@ -224,6 +528,10 @@ def create_directory(dir_name, clear_contents=False):
 
 def projected_areas(stl_location):
     """Calculate projected areas for a stl file using p-area."""
+    from parea.main import _calculate_projected_area
+
+    from symbench_athens_client.models.design_state_creo import ProjectedAreas
+
     projected_area_yz = _calculate_projected_area([stl_location], "x", -999)
     projected_area_xz = _calculate_projected_area([stl_location], "y", -999)
     projected_area_xy = _calculate_projected_area([stl_location], "z", -999)